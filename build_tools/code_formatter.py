@@ -29,10 +29,49 @@ try:
 except ImportError:
     # Python 2 fallback
     import __builtin__ as builtins
+import functools
 import inspect
+import io
 import os
 import re
 
+def write_if_changed(filename, contents):
+    '''Write contents to filename unless the file already holds exactly
+    those contents, so that its timestamp only changes when it has to.
+    Returns True if the file was written.
+
+    If the GEM5_CODEGEN_REPORT environment variable is set, a line with
+    the outcome is appended to the file it names so that the build can
+    report how many generated files changed.'''
+    data = contents.encode('utf-8')
+    try:
+        with open(filename, 'rb') as f:
+            changed = (f.read(len(data) + 1) != data)
+    except OSError:
+        changed = True
+    if changed:
+        with open(filename, 'wb') as f:
+            f.write(data)
+
+    report = os.environ.get('GEM5_CODEGEN_REPORT')
+    if report:
+        with open(report, 'a') as f:
+            f.write('%s %s\n' % ('changed' if changed else 'unchanged',
+                                 filename))
+    return changed
+
+class GeneratedFile(io.StringIO):
+    '''A text file which is kept in memory and written out with
+    write_if_changed() when it's closed.'''
+    def __init__(self, filename):
+        super().__init__()
+        self.name = filename
+
+    def close(self):
+        if not self.closed:
+            write_if_changed(self.name, self.getvalue())
+        super().close()
+
 class lookup(object):
     def __init__(self, formatter, frame, *args, **kwargs):
         self.frame = frame
@@ -153,7 +192,7 @@ class code_formatter(object, metaclass=code_formatter_meta):
         self._data = []
 
     def write(self, *args):
-        f = open(os.path.join(*args), "w")
+        f = GeneratedFile(os.path.join(*args))
         name, extension = os.path.splitext(f.name)
 
         # Add a comment to inform which file generated the generated file
@@ -242,64 +281,95 @@ class code_formatter(object, metaclass=code_formatter_meta):
         frame = inspect.currentframe().f_back
 
         l = lookup(self, frame, *args, **kwargs)
-        def convert(match):
-            ident = match.group('lone')
-            # check for a lone identifier
-            if ident:
-                indent = match.group('indent') # must be spaces
-                lone = '%s' % (l[ident], )
-
-                def indent_lines(gen):
-                    for line in gen:
-                        yield indent
-                        yield line
-                return ''.join(indent_lines(lone.splitlines(True)))
-
-            # check for an identifier, braced or not
-            ident = match.group('ident') or match.group('b_ident')
-            if ident is not None:
-                return '%s' % (l[ident], )
-
-            # check for a positional parameter, braced or not
-            pos = match.group('pos') or match.group('b_pos')
-            if pos is not None:
-                pos = int(pos)
-                if pos > len(args):
+        data = []
+        for kind, value in compile_format(code_formatter.pattern, format):
+            if kind == TEXT:
+                data.append(value)
+            elif kind == IDENT:
+                data.append('%s' % (l[value], ))
+            elif kind == EVAL:
+                data.append('%s' % (eval(value, {}, l), ))
+            elif kind == POS:
+                if value > len(args):
                     raise ValueError \
-                        ('Positional parameter #%d not found in pattern' % pos,
-                         code_formatter.pattern)
-                return '%s' % (args[int(pos)], )
-
-            # check for a double braced expression
-            eval_expr = match.group('eval')
-            if eval_expr is not None:
-                result = eval(eval_expr, {}, l)
-                return '%s' % (result, )
-
-            # check for an escaped delimiter
-            if match.group('escaped') is not None:
-                return '$'
-
-            # At this point, we have to match invalid
-            if match.group('invalid') is None:
-                # didn't match invalid!
-                raise ValueError('Unrecognized named group in pattern',
-                                 code_formatter.pattern)
-
-            i = match.start('invalid')
-            if i == 0:
-                colno = 1
-                lineno = 1
+                        ('Positional parameter #%d not found in pattern' %
+                         value, code_formatter.pattern)
+                data.append('%s' % (args[value], ))
             else:
-                lines = format[:i].splitlines(True)
-                colno = i - sum(len(z) for z in lines)
-                lineno = len(lines)
-
-                raise ValueError('Invalid format string: line %d, col %d' %
-                                 (lineno, colno))
-
-        d = code_formatter.pattern.sub(convert, format)
-        self._append(d)
+                # a lone identifier is indented like the line it is on
+                indent, ident = value
+                lone = '%s' % (l[ident], )
+                for line in lone.splitlines(True):
+                    data.append(indent)
+                    data.append(line)
+
+        self._append(''.join(data))
+
+# The kinds of steps a format string is broken into by compile_format().
+TEXT, IDENT, LONE, POS, EVAL = range(5)
+
+@functools.lru_cache(maxsize=16384)
+def compile_format(pattern, format):
+    '''Break a format string up into the literal text and the
+    substitutions in it, with the double braced expressions compiled.
+    Most format strings are used over and over again, so the result is
+    cached to only match the pattern against each of them once.'''
+    steps = []
+    def text(data):
+        if steps and steps[-1][0] == TEXT:
+            steps[-1] = (TEXT, steps[-1][1] + data)
+        elif data:
+            steps.append((TEXT, data))
+
+    last = 0
+    for match in pattern.finditer(format):
+        text(format[last:match.start()])
+        last = match.end()
+
+        # check for a lone identifier
+        ident = match.group('lone')
+        if ident:
+            steps.append((LONE, (match.group('indent'), ident)))
+            continue
+
+        # check for an identifier, braced or not
+        ident = match.group('ident') or match.group('b_ident')
+        if ident is not None:
+            steps.append((IDENT, ident))
+            continue
+
+        # check for a positional parameter, braced or not
+        pos = match.group('pos') or match.group('b_pos')
+        if pos is not None:
+            steps.append((POS, int(pos)))
+            continue
+
+        # check for a double braced expression
+        eval_expr = match.group('eval')
+        if eval_expr is not None:
+            # eval() would strip the spaces around the expression as well
+            code = compile(eval_expr.strip(' \t'), '<code_formatter>', 'eval')
+            steps.append((EVAL, code))
+            continue
+
+        # check for an escaped delimiter
+        if match.group('escaped') is not None:
+            text('$')
+            continue
+
+        # At this point, we have to match invalid
+        if match.group('invalid') is None:
+            # didn't match invalid!
+            raise ValueError('Unrecognized named group in pattern', pattern)
+
+        i = match.start('invalid')
+        lines = format[:i].splitlines(True)
+        colno = i - sum(len(z) for z in lines[:-1]) + 1
+        lineno = max(len(lines), 1)
+        raise ValueError('Invalid format string: line %d, col %d' %
+                         (lineno, colno))
+    text(format[last:])
+    return tuple(steps)
 
 __all__ = [ "code_formatter" ]
 
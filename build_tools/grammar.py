@@ -25,10 +25,30 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import os
+import shutil
+import threading
 
 import ply.lex
 import ply.yacc
 
+def cached_yacc(tables, **kwargs):
+    '''Build a parser with ply.yacc.yacc(), keeping its tables in the
+    pickle file tables so they only have to be generated again when the
+    grammar changes. Several parsers may be built at once (e.g., by SCons
+    jobs), so the file is only ever replaced as a whole.'''
+    tmp = '%s.%d.%d' % (tables, os.getpid(), threading.get_ident())
+    try:
+        shutil.copyfile(tables, tmp)
+    except OSError:
+        pass
+    try:
+        parser = ply.yacc.yacc(picklefile=tmp, **kwargs)
+        os.replace(tmp, tables)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return parser
+
 class ParseError(Exception):
     def __init__(self, message, token=None):
         Exception.__init__(self, message)
@@ -45,7 +65,7 @@ class Grammar(object):
             raise AttributeError("module is an illegal attribute")
 
         if 'output' in kwargs:
-            dir,tab = os.path.split(output)
+            dir,tab = os.path.split(kwargs.pop('output'))
             if not tab.endswith('.py'):
                 raise AttributeError('The output file must end with .py')
             kwargs['outputdir'] = dir
@@ -71,7 +91,14 @@ class Grammar(object):
             return self.lex
 
         if attr == 'yacc':
-            self.yacc = ply.yacc.yacc(module=self, **self.yacc_kwargs)
+            # A 'tables' argument names a pickle file to keep the parser
+            # tables in, see cached_yacc().
+            kwargs = dict(self.yacc_kwargs)
+            tables = kwargs.pop('tables', None)
+            if tables:
+                self.yacc = cached_yacc(tables, module=self, **kwargs)
+            else:
+                self.yacc = ply.yacc.yacc(module=self, **kwargs)
             return self.yacc
 
         if attr == 'current_lexer':
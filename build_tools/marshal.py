@@ -48,8 +48,8 @@ interpretters, and so the exact same interpretter should be used both to run
 this script, and to read in and execute the marshalled code later.
 """
 
+import argparse
 import marshal
-import sys
 import zlib
 
 from blob import bytesToCppArray
@@ -58,14 +58,20 @@ from code_formatter import code_formatter
 # Embed python files.  All .py files that have been indicated by a
 # PySource() call in a SConscript need to be embedded into the M5
 # library.  To do that, we compile the file to byte code, marshal the
-# byte code, compress it, and then generate a c++ file that
-# inserts the result into an array.
+# byte code, compress it (unless asked not to), and then generate a c++
+# file that inserts the result into an array.
 
-if len(sys.argv) < 4:
-    print(f"Usage: {sys.argv[0]} CPP PY MODPATH ABSPATH", file=sys.stderr)
-    sys.exit(1)
+parser = argparse.ArgumentParser()
+parser.add_argument('cpp', help='c++ file to generate')
+parser.add_argument('python', help='python file to embed')
+parser.add_argument('modpath', help='module path of the python file')
+parser.add_argument('abspath', help='absolute path of the python file')
+parser.add_argument('--uncompressed', action='store_true',
+        help='embed the marshalled code without compressing it')
 
-_, cpp, python, modpath, abspath = sys.argv
+args = parser.parse_args()
+cpp, python, modpath, abspath = \
+        args.cpp, args.python, args.modpath, args.abspath
 
 with open(python, 'r') as f:
     src = f.read()
@@ -73,7 +79,14 @@ with open(python, 'r') as f:
 compiled = compile(src, python, 'exec')
 marshalled = marshal.dumps(compiled)
 
-compressed = zlib.compress(marshalled)
+# Uncompressed code is marked by a compressed length of 0, and can be
+# unmarshalled in place without being inflated first.
+if args.uncompressed:
+    data = marshalled
+    zlen = 0
+else:
+    data = zlib.compress(marshalled)
+    zlen = len(data)
 
 code = code_formatter()
 code('''\
@@ -86,7 +99,7 @@ namespace
 
 ''')
 
-bytesToCppArray(code, 'embedded_module_data', compressed)
+bytesToCppArray(code, 'embedded_module_data', data)
 
 # The name of the EmbeddedPython object doesn't matter since it's in an
 # anonymous namespace, and it's constructor takes care of installing it into a
@@ -96,7 +109,7 @@ EmbeddedPython embedded_module_info(
     "${abspath}",
     "${modpath}",
     embedded_module_data,
-    ${{len(compressed)}},
+    ${zlen},
     ${{len(marshalled)}});
 
 } // anonymous namespace
@@ -0,0 +1,174 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Build an index of the names exported by the m5.objects modules.
+
+Each argument is a MODPATH:FILE pair for a module in the m5.objects
+package. The files are parsed (not executed) and every top level name a
+"from MODPATH import *" would bind is recorded, along with the modules
+that bind it. m5.objects uses the index to import a module only when one
+of its names is first used, instead of importing every module at startup.
+
+Names pulled in through a star import of a module outside of m5.objects
+(for example "from m5.params import *") can't be found without executing
+that module. Those modules are listed separately so that m5.objects can
+search them at run time.
+"""
+
+import argparse
+import ast
+
+from code_formatter import code_formatter
+
+parser = argparse.ArgumentParser()
+parser.add_argument('index_py', help='index file to generate')
+parser.add_argument('modules', nargs='*',
+        help='MODPATH:FILE pairs for the m5.objects modules to index')
+
+args = parser.parse_args()
+
+def resolve_module(modpath, node):
+    '''Return the absolute name of the module an ImportFrom refers to'''
+    if not node.level:
+        return node.module
+    package = modpath.split('.')[:-node.level]
+    if node.module:
+        package.append(node.module)
+    return '.'.join(package)
+
+def top_level_statements(body):
+    '''Yield the statements that run at module scope, including those
+    nested in conditionals and try blocks'''
+    for stmt in body:
+        yield stmt
+        if isinstance(stmt, (ast.If, ast.For, ast.While)):
+            yield from top_level_statements(stmt.body)
+            yield from top_level_statements(stmt.orelse)
+        elif isinstance(stmt, ast.With):
+            yield from top_level_statements(stmt.body)
+        elif isinstance(stmt, ast.Try):
+            yield from top_level_statements(stmt.body)
+            for handler in stmt.handlers:
+                yield from top_level_statements(handler.body)
+            yield from top_level_statements(stmt.orelse)
+            yield from top_level_statements(stmt.finalbody)
+
+def target_names(target):
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for elt in target.elts:
+            yield from target_names(elt)
+
+def scan_module(modpath, filename):
+    '''Return the names defined and the names imported by a module, the
+    external modules it star imports, and its __all__ (if any)'''
+    with open(filename, 'r') as f:
+        tree = ast.parse(f.read(), filename)
+
+    defined = []
+    imported = []
+    star_modules = []
+    exported = None
+    for stmt in top_level_statements(tree.body):
+        if isinstance(stmt, (ast.ClassDef, ast.FunctionDef,
+                             ast.AsyncFunctionDef)):
+            defined.append(stmt.name)
+        elif isinstance(stmt, ast.Assign):
+            for target in stmt.targets:
+                names = list(target_names(target))
+                if names == [ '__all__' ] and \
+                        isinstance(stmt.value, (ast.List, ast.Tuple)):
+                    exported = [ elt.value for elt in stmt.value.elts ]
+                defined.extend(names)
+        elif isinstance(stmt, (ast.AnnAssign, ast.AugAssign)):
+            defined.extend(target_names(stmt.target))
+        elif isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                imported.append(alias.asname or alias.name.split('.')[0])
+        elif isinstance(stmt, ast.ImportFrom):
+            module = resolve_module(modpath, stmt)
+            for alias in stmt.names:
+                if alias.name != '*':
+                    imported.append(alias.asname or alias.name)
+                elif not module.startswith('m5.objects'):
+                    # Names star imported from other m5.objects modules
+                    # are indexed under the module that binds them.
+                    star_modules.append(module)
+
+    return defined, imported, star_modules, exported
+
+modules = []
+definers = {}
+importers = {}
+star_modules = []
+for arg in args.modules:
+    modpath, filename = arg.split(':', 1)
+    index = len(modules)
+    modules.append(modpath)
+
+    defined, imported, stars, exported = scan_module(modpath, filename)
+
+    def public(name):
+        if exported is not None:
+            return name in exported
+        return not name.startswith('_')
+
+    for name in filter(public, dict.fromkeys(defined)):
+        definers.setdefault(name, []).append(index)
+    for name in filter(public, dict.fromkeys(imported)):
+        importers.setdefault(name, []).append(index)
+    for module in stars:
+        if module not in star_modules:
+            star_modules.append(module)
+
+code = code_formatter()
+code('modules = (')
+code.indent()
+for modpath in modules:
+    code('${{repr(modpath)}},')
+code.dedent()
+code(')')
+code()
+code('star_modules = ${{repr(tuple(star_modules))}}')
+code()
+# Names defined by a module are looked up first. Names which modules only
+# import are looked up after the external star imported modules, since
+# those are usually where they come from and are cheaper to get at.
+def write_names(var, names):
+    code('${var} = {')
+    code.indent()
+    for name, indices in sorted(names.items()):
+        code('${{repr(name)}} : ${{repr(tuple(indices))}},')
+    code.dedent()
+    code('}')
+
+write_names('names', definers)
+code()
+write_names('imported_names',
+        { k: v for k, v in importers.items() if k not in definers })
+
+code.write(args.index_py)
@@ -317,6 +317,7 @@ def define_constants(constants):
     constants.gem5_binary_fixture_name = 'gem5'
     constants.xml_filename = 'results.xml'
     constants.pickle_filename = 'results.pickle'
+    constants.suite_history_filename = 'suite-durations.json'
     constants.pickle_protocol = highest_pickle_protocol
 
     # The root directory which all test names will be based off of.
@@ -588,6 +589,14 @@ def define_common_args(config):
             action='store',
             help='The path to store results in.'
         ),
+        Argument(
+            '--suite-history',
+            action='store',
+            default=None,
+            help='JSON file of the duration of each suite in previous runs,'
+            ' used to run the longest suites first. Defaults to a file in'
+            ' the result path.'
+        ),
         Argument(
             '--bin-path',
             action='store',
@@ -663,6 +672,7 @@ class RunParser(ArgParser):
         common_args.bin_path.add_to(parser)
         common_args.threads.add_to(parser)
         common_args.test_threads.add_to(parser)
+        common_args.suite_history.add_to(parser)
         common_args.isa.add_to(parser)
         common_args.variant.add_to(parser)
         common_args.length.add_to(parser)
@@ -739,6 +749,7 @@ class RerunParser(ArgParser):
         common_args.bin_path.add_to(parser)
         common_args.threads.add_to(parser)
         common_args.test_threads.add_to(parser)
+        common_args.suite_history.add_to(parser)
         common_args.isa.add_to(parser)
         common_args.variant.add_to(parser)
         common_args.length.add_to(parser)
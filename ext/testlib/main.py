@@ -238,6 +238,26 @@ def do_list():
 
     return 0
 
+def report_schedule_metrics(timings, threads):
+    metrics = runner.schedule_metrics(timings, threads)
+    if metrics is None:
+        return
+    log.test_log.message(terminal.separator())
+    log.test_log.message('Ran suites for {busy_time:.1f}s in {wall_time:.1f}s'
+            ' on {threads} threads ({utilization:.0%} utilization)'
+            .format(threads=threads, **metrics))
+    log.test_log.message('Critical path: {critical_path:.1f}s'
+            ' ({critical_suite}), lower bound on the run time: '
+            '{lower_bound:.1f}s'.format(**metrics))
+    busy = {}
+    for timing in timings:
+        busy[timing.worker] = busy.get(timing.worker, 0) + timing.duration
+    for worker, busy_time in sorted(busy.items()):
+        log.test_log.message('  {}: {:.1f}s busy ({:.0%})'.format(
+                worker, busy_time,
+                busy_time / metrics['wall_time'] if metrics['wall_time']
+                else 1.0))
+
 def run_schedule(test_schedule, log_handler):
     '''
     Test Phases
@@ -264,13 +284,31 @@ def run_schedule(test_schedule, log_handler):
                 configuration.config.result_path))
     log.test_log.message(terminal.separator())
 
+    history_path = configuration.config.suite_history
+    if history_path is None:
+        history_path = os.path.join(configuration.config.result_path,
+                configuration.constants.suite_history_filename)
+    history = runner.SuiteDurationHistory(history_path)
+
     # Build global fixtures and exectute scheduled test suites.
-    if configuration.config.test_threads > 1:
+    threads = configuration.config.test_threads
+    if threads > 1:
         library_runner = runner.LibraryParallelRunner(test_schedule)
-        library_runner.set_threads(configuration.config.test_threads)
+        library_runner.set_threads(threads)
+        library_runner.set_history(history)
     else:
         library_runner = runner.LibraryRunner(test_schedule)
     library_runner.run()
+    # The messages which follow are not about the last test run.
+    log.test_log.test = None
+
+    history.update(library_runner.timings)
+    try:
+        history.save()
+    except OSError as e:
+        log.test_log.warn('Unable to save the suite durations to {}: {}'
+                .format(history_path, e))
+    report_schedule_metrics(library_runner.timings, threads)
 
     failed = log_handler.unsuccessful()
 
@@ -38,7 +38,11 @@
 #
 # Authors: Sean Wilson
 
+import json
 import multiprocessing.dummy
+import os
+import threading
+import time
 import traceback
 
 import testlib.helper as helper
@@ -165,17 +169,140 @@ class SuiteRunner(RunnerPattern):
                 iter(self.testable))
 
 
+class SuiteTiming(object):
+    '''
+    The wall-clock time a suite was run at, and the worker thread it was run
+    on.
+    '''
+    def __init__(self, suite, worker, start, end):
+        self.suite = suite
+        self.worker = worker
+        self.start = start
+        self.end = end
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+class SuiteDurationHistory(object):
+    '''
+    The duration of each test suite when it was last run, stored as a JSON
+    object of suite uids to seconds. Used to schedule the longest suites
+    first.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.durations = {}
+        try:
+            with open(path) as f:
+                self.durations = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def duration(self, suite):
+        '''
+        :returns: the duration of the suite when it was last run, or None if
+            it has not been run before.
+        '''
+        return self.durations.get(str(suite.uid))
+
+    def longest_first(self, suites):
+        '''
+        :returns: the suites sorted by decreasing duration. Suites which have
+            not been run before come first, in their original order, as they
+            could take any time.
+        '''
+        def key(suite):
+            duration = self.duration(suite)
+            return float('inf') if duration is None else duration
+        return sorted(suites, key=key, reverse=True)
+
+    def update(self, timings):
+        '''
+        Records the duration of the suites which have been run. Skipped suites
+        are not recorded as they take no time when skipped.
+        '''
+        for timing in timings:
+            if timing.suite.result.value != Result.Skipped:
+                self.durations[str(timing.suite.uid)] = timing.duration
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(self.durations, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def schedule_metrics(timings, threads):
+    '''
+    Computes metrics of how well suites were scheduled across the workers.
+
+    :returns: a dictionary of the wall-clock time of the run, the total time
+        spent running suites, the critical path (the longest suite, which
+        no schedule can finish before), the lower bound on the wall-clock time
+        of any schedule, and the utilization of the workers.
+    '''
+    if not timings:
+        return None
+    wall_time = (max(timing.end for timing in timings) -
+                 min(timing.start for timing in timings))
+    busy_time = sum(timing.duration for timing in timings)
+    critical_path = max(timings, key=lambda timing: timing.duration)
+    return {
+        'wall_time': wall_time,
+        'busy_time': busy_time,
+        'critical_path': critical_path.duration,
+        'critical_suite': critical_path.suite.uid,
+        'lower_bound': max(critical_path.duration, busy_time / threads),
+        'utilization': busy_time / (threads * wall_time) if wall_time else 1.0,
+    }
+
+
 class LibraryRunner(SuiteRunner):
-    pass
+    def __init__(self, loaded_testable):
+        super(LibraryRunner, self).__init__(loaded_testable)
+        self.timings = []
 
+    def run_suite(self, suite):
+        start = time.time()
+        suite.runner(suite).run()
+        self.timings.append(SuiteTiming(
+                suite, threading.current_thread().name, start, time.time()))
+
+    def test(self):
+        for suite in self.testable:
+            self.run_suite(suite)
+        self.testable.result = compute_aggregate_result(
+                iter(self.testable))
+
+
+class LibraryParallelRunner(LibraryRunner):
+    history = None
 
-class LibraryParallelRunner(RunnerPattern):
     def set_threads(self, threads):
         self.threads = threads
 
+    def set_history(self, history):
+        '''
+        Sets the :class:`SuiteDurationHistory` used to run the longest suites
+        first.
+        '''
+        self.history = history
+
     def test(self):
+        suites = list(self.testable)
+        if self.history is not None:
+            suites = self.history.longest_first(suites)
         pool = multiprocessing.dummy.Pool(self.threads)
-        pool.map(lambda suite : suite.runner(suite).run(), self.testable)
+        # Suites are handed out one at a time, so each worker takes the
+        # longest remaining suite when it becomes free.
+        pool.map(self.run_suite, suites, chunksize=1)
+        pool.close()
+        pool.join()
         self.testable.result = compute_aggregate_result(
                 iter(self.testable))
 
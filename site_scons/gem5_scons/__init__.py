@@ -214,6 +214,23 @@ def summarize_warnings():
             termcap.Normal)
     list(map(print, all_warnings))
 
+def summarize_codegen(report):
+    """Print how many of the files written by the code generators this
+    build actually changed, from the report they append to (see
+    write_if_changed() in build_tools/code_formatter.py)."""
+    if not os.path.isfile(report):
+        return
+    changed = 0
+    total = 0
+    with open(report, 'r') as f:
+        for line in f:
+            total += 1
+            if line.startswith('changed '):
+                changed += 1
+    print(termcap.Yellow + termcap.Bold +
+            f'*** {changed} of {total} generated files changed ***' +
+            termcap.Normal)
+
 def warning(*args, **kwargs):
     message = ' '.join(args)
     printed = print_message('Warning: ', termcap.Yellow, message, **kwargs)
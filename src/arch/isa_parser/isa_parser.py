@@ -37,13 +37,17 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import hashlib
 import os
+import pickle
 import re
 import sys
 import traceback
 # get type names
 from types import *
 
+from code_formatter import GeneratedFile, write_if_changed
+import grammar
 from grammar import Grammar
 from .operand_list import *
 from .operand_types import *
@@ -474,10 +478,29 @@ class InstObjParams(object):
 #
 
 class ISAParser(Grammar):
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, cache_dir=None, chunks=None):
         super().__init__()
         self.output_dir = output_dir
 
+        # The number of files the splittable sections ('decoder' and
+        # 'exec') are compiled in. The regions between split points of
+        # such a section are distributed over that many chunks by the size
+        # of the code emitted into them. Sections not listed here get one
+        # chunk per region.
+        self.chunks = dict(chunks or {})
+
+        # If set, the parser tables and the files generated for each ISA
+        # description are kept in this directory so that an unchanged
+        # description doesn't have to be parsed again.
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.setupParserFactory(debug=False,
+                    tables=os.path.join(cache_dir, 'isa_parser_tables.pickle'))
+
+        # Names of the files generated so far.
+        self.generated = []
+
         self.filename = None # for output file watermarking/scaremongering
 
         # variable to hold templates
@@ -497,6 +520,7 @@ class ISAParser(Grammar):
         # split into so far.
         self.files = {}
         self.splits = {}
+        self.split_sections = {}
 
         # isa_name / namespace identifier from namespace declaration.
         # before the namespace declaration, None.
@@ -587,6 +611,7 @@ class ISAParser(Grammar):
         if re.search('-ns.cc.inc$', filename):
             print('#if !defined(__SPLIT) || (__SPLIT == 1)', file=f)
             self.splits[f] = 1
+            self.split_sections[f] = section
         # ensure requisite #include's
         elif filename == 'decoder-g.hh.inc':
             print('#include "base/bitfield.hh"', file=f)
@@ -867,7 +892,9 @@ class ISAParser(Grammar):
     def p_specification(self, t):
         'specification : opt_defs_and_outputs top_level_decode_block'
 
-        for f in self.splits.keys():
+        for f, section in self.split_sections.items():
+            if section in self.chunks:
+                self.balance_splits(f, self.chunks[section])
             f.write('\n#endif\n')
 
         for f in self.files.values(): # close ALL the files;
@@ -921,6 +948,57 @@ class ISAParser(Grammar):
         else:
             return s
 
+    splitRE = re.compile(r'\n#endif\n#if __SPLIT == \d+\n')
+
+    @staticmethod
+    def partition(sizes, chunks):
+        '''Split the list of sizes into at most 'chunks' contiguous groups
+        so that the largest group is as small as possible, and return the
+        number of items in each group.'''
+        n = len(sizes)
+        chunks = max(1, min(chunks, n))
+        prefix = [0]
+        for size in sizes:
+            prefix.append(prefix[-1] + size)
+        # cost[j][i] is the size of the largest group when the first i
+        # items are put in j groups, and cut[j][i] where the last of those
+        # groups starts.
+        inf = float('inf')
+        cost = [[inf] * (n + 1) for _ in range(chunks + 1)]
+        cut = [[0] * (n + 1) for _ in range(chunks + 1)]
+        cost[0][0] = 0
+        for j in range(1, chunks + 1):
+            for i in range(j, n + 1):
+                for k in range(j - 1, i):
+                    c = max(cost[j - 1][k], prefix[i] - prefix[k])
+                    if c < cost[j][i]:
+                        cost[j][i], cut[j][i] = c, k
+        counts = []
+        i = n
+        for j in range(chunks, 0, -1):
+            counts.append(i - cut[j][i])
+            i = cut[j][i]
+        return counts[::-1]
+
+    # The regions between the split points of a section are the units the
+    # ISA description guarantees can be compiled separately, but their
+    # sizes can be very uneven. Instead of compiling each of them on its
+    # own, merge neighbouring regions so that the requested number of
+    # chunks get roughly the same amount of code.
+    def balance_splits(self, f, chunks):
+        regions = self.splitRE.split(f.getvalue())
+        counts = self.partition([len(r) for r in regions], chunks)
+        contents = []
+        for chunk, count in enumerate(counts, 1):
+            if chunk > 1:
+                contents.append('\n#endif\n#if __SPLIT == %u\n' % chunk)
+            contents.append('\n'.join(regions[:count]))
+            regions = regions[count:]
+        f.seek(0)
+        f.truncate()
+        f.write(''.join(contents))
+        self.splits[f] = len(counts)
+
     # split output file to reduce compilation time
     def p_split(self, t):
         'split : SPLIT output_type SEMI'
@@ -1521,15 +1599,15 @@ StaticInstPtr
     def open(self, name, bare=False):
         '''Open the output file for writing and include scary warning.'''
         filename = os.path.join(self.output_dir, name)
-        f = open(filename, 'w')
+        self.generated.append(name)
+        f = GeneratedFile(filename)
         if f:
             if not bare:
                 f.write(ISAParser.scaremonger_template % self)
         return f
 
     def update(self, file, contents):
-        '''Update the output file only.  Scons should handle the case when
-        the new contents are unchanged using its built-in hash feature.'''
+        '''Update the output file only if its contents change.'''
         f = self.open(file)
         f.write(contents)
         f.close()
@@ -1594,14 +1672,88 @@ StaticInstPtr
         # do this up front.
         isa_desc = self.read_and_flatten(isa_desc_file)
 
+        if self.cache_dir:
+            cache_file = os.path.join(self.cache_dir, hashlib.sha1(
+                isa_desc_file.encode()).hexdigest() + '.pickle')
+            desc_hash = hashlib.sha1((repr(sorted(self.chunks.items())) +
+                isa_desc).encode()).hexdigest()
+            if self.restore_cached(cache_file, desc_hash):
+                ISAParser.AlreadyGenerated[isa_desc_file] = None
+                return
+
         # Initialize lineno tracker
         self.lex.lineno = LineTracker(isa_desc_file)
 
         # Parse.
         self.parse_string(isa_desc)
 
+        if self.cache_dir:
+            self.save_cached(cache_file, desc_hash)
+
         ISAParser.AlreadyGenerated[isa_desc_file] = None
 
+    # The output of the parser depends on the flattened ISA description
+    # and on the python code run while parsing it: the parser itself and
+    # whatever modules the description imports (e.g. the x86 microcode).
+    # The cache for an ISA description records the hash of the former,
+    # the python source files which were loaded from the arch and
+    # build_tools directories and their hashes, and the generated files.
+    python_dirs = (
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        os.path.dirname(os.path.abspath(grammar.__file__)),
+    )
+
+    @staticmethod
+    def file_hash(filename):
+        with open(filename, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def python_deps(self):
+        prefixes = tuple(d + os.sep for d in self.python_dirs)
+        deps = {}
+        for module in list(sys.modules.values()):
+            filename = getattr(module, '__file__', None)
+            if not filename or not filename.endswith('.py'):
+                continue
+            filename = os.path.abspath(filename)
+            if filename.startswith(prefixes):
+                deps[filename] = self.file_hash(filename)
+        return deps
+
+    def restore_cached(self, cache_file, desc_hash):
+        '''Write out the files cached for this ISA description if it and
+        the python code it depends on haven't changed.'''
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+        if cached['desc_hash'] != desc_hash:
+            return False
+        for filename, file_hash in cached['python_deps'].items():
+            try:
+                if self.file_hash(filename) != file_hash:
+                    return False
+            except OSError:
+                return False
+        for name, contents in cached['files'].items():
+            write_if_changed(os.path.join(self.output_dir, name), contents)
+        return True
+
+    def save_cached(self, cache_file, desc_hash):
+        files = {}
+        for name in self.generated:
+            with open(os.path.join(self.output_dir, name), 'r') as f:
+                files[name] = f.read()
+        tmp = '%s.%d' % (cache_file, os.getpid())
+        with open(tmp, 'wb') as f:
+            pickle.dump({
+                'desc_hash' : desc_hash,
+                'python_deps' : self.python_deps(),
+                'files' : files,
+            }, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+
     def parse_isa_desc(self, *args, **kwargs):
         try:
             self._parse_isa_desc(*args, **kwargs)
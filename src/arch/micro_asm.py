@@ -34,6 +34,12 @@ from types import *
 from ply import lex
 from ply import yacc
 
+from grammar import cached_yacc
+
+# If set, the parser tables are kept in this directory between runs instead
+# of being generated every time a MicroAssembler is created.
+tables_dir = None
+
 ##########################################################################
 #
 # Base classes for use outside of the assembler
@@ -499,7 +505,12 @@ class MicroAssembler(object):
     def __init__(self, macro_type, microops,
             rom = None, rom_macroop_type = None):
         self.lexer = lex.lex()
-        self.parser = yacc.yacc(write_tables=False)
+        if tables_dir:
+            self.parser = cached_yacc(
+                    os.path.join(tables_dir, 'micro_asm_tables.pickle'),
+                    module=sys.modules[__name__], debug=False)
+        else:
+            self.parser = yacc.yacc(write_tables=False)
         self.parser.macro_type = macro_type
         self.parser.macroops = {}
         self.parser.microops = microops
@@ -65,6 +65,9 @@ def main(args=None):
                       help="Path where C++ code output code goes")
     parser.add_option("-H", "--html-path",
                       help="Path where html output goes")
+    parser.add_option("--cache-dir",
+                      help="Only regenerate the code of changed machines, "
+                      "keeping what this depends on in this directory")
     parser.add_option("-F", "--print-files", action='store_true',
                       help="Print files that SLICC will generate")
     parser.add_option("--tb", "--traceback", action='store_true',
@@ -91,7 +94,7 @@ def main(args=None):
     protocol_base = os.path.join(os.path.dirname(__file__),
                                  '..', 'ruby', 'protocol')
     slicc = SLICC(slicc_file, protocol_base, verbose=True, debug=opts.debug,
-                  traceback=opts.tb)
+                  traceback=opts.tb, cache_dir=opts.cache_dir)
 
 
     if opts.print_files:
@@ -37,25 +37,77 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import hashlib
 import os.path
+import pickle
 import re
 import sys
 
+import code_formatter as code_formatter_module
 from code_formatter import code_formatter
 from grammar import Grammar, ParseError
 
 import slicc.ast as ast
 import slicc.util as util
-from slicc.symbols import SymbolTable
+from slicc.symbols import StateMachine, SymbolTable
+
+def sha1(data):
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha1(data).hexdigest()
+
+# The parsed declarations of a file are pickled without the SLICC object
+# they refer to, which is replaced by the one loading them.
+class ASTPickler(pickle.Pickler):
+    def __init__(self, f, slicc):
+        super().__init__(f, pickle.HIGHEST_PROTOCOL)
+        self.slicc = slicc
+
+    def persistent_id(self, obj):
+        if obj is self.slicc:
+            return 'slicc'
+        if obj is self.slicc.symtab:
+            return 'symtab'
+        return None
+
+class ASTUnpickler(pickle.Unpickler):
+    def __init__(self, f, slicc):
+        super().__init__(f)
+        self.slicc = slicc
+
+    def persistent_load(self, pid):
+        if pid == 'slicc':
+            return self.slicc
+        return self.slicc.symtab
 
 class SLICC(Grammar):
-    def __init__(self, filename, base_dir, verbose=False, traceback=False, **kwargs):
+    def __init__(self, filename, base_dir, verbose=False, traceback=False,
+                 cache_dir=None, **kwargs):
         self.protocol = None
         self.traceback = traceback
         self.verbose = verbose
         self.symtab = SymbolTable(self)
         self.base_dir = base_dir
 
+        # If set, the declarations parsed from each file included by the
+        # .slicc file, and the fingerprints of the code generated for each
+        # symbol, are kept in this directory. Files which haven't changed
+        # aren't parsed again, and only the symbols whose inputs changed
+        # have their code generated again.
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.setupParserFactory(
+                debug=False,
+                tables=os.path.join(cache_dir, 'slicc_tables.pickle'))
+
+        # The files being parsed, outermost first, and for each file
+        # included by the .slicc file (a unit), the hashes of the files it
+        # is made of.
+        self.parsing = []
+        self.units = {}
+        self.generated = False
+
         try:
             self.decl_list = self.parse_file(filename, **kwargs)
         except ParseError as e:
@@ -73,12 +125,61 @@ class SLICC(Grammar):
         return code
 
     def process(self):
-        self.decl_list.generate()
+        # With a cache, the declarations are only processed once it is
+        # known that some of the code generated from them is out of date.
+        if self.cache_dir:
+            return
+        self.generate()
+
+    def generate(self):
+        if not self.generated:
+            self.generated = True
+            self.decl_list.generate()
 
     def writeCodeFiles(self, code_path, includes):
-        self.symtab.writeCodeFiles(code_path, includes)
+        if not self.cache_dir:
+            self.symtab.writeCodeFiles(code_path, includes)
+            return
+
+        record = self.cacheFile(code_path, 'outputs.' + self.cacheKind())
+        try:
+            with open(record, 'rb') as f:
+                previous = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            previous = {}
+
+        # Nothing has to be done if none of the inputs changed since the
+        # code was last generated, and all of it is still there.
+        inputs = sha1(repr((self.pythonHash(), includes,
+                            sorted(self.units.items()))))
+        if previous.get('inputs') == inputs and \
+                all(os.path.exists(os.path.join(code_path, name))
+                    for name in self.files()):
+            return
+
+        self.generate()
+        fingerprints = self.fingerprints(includes)
+        unchanged = set()
+        for symbol in self.symtab.sym_vec:
+            key = self.symbolKey(symbol)
+            if previous.get('fingerprints', {}).get(key) == \
+                    fingerprints[key] and \
+                    all(os.path.exists(os.path.join(code_path, name))
+                        for name in symbol.codeFiles()):
+                unchanged.add(symbol)
+
+        self.symtab.writeCodeFiles(code_path, includes, unchanged)
+
+        tmp = '%s.%d' % (record, os.getpid())
+        with open(tmp, 'wb') as f:
+            pickle.dump({
+                'inputs' : inputs,
+                'fingerprints' : fingerprints,
+            }, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, record)
 
     def writeHTMLFiles(self, html_path):
+        self.generate()
         self.symtab.writeHTMLFiles(html_path)
 
     def files(self):
@@ -88,6 +189,131 @@ class SLICC(Grammar):
 
         return f
 
+    # Everything generated depends on the python code doing it.
+    pythonFiles = sorted(
+        [ os.path.join(root, name)
+          for root, dirs, names in
+              os.walk(os.path.dirname(os.path.abspath(__file__)))
+          for name in names if name.endswith('.py') ] +
+        [ os.path.abspath(code_formatter_module.__file__) ])
+    _pythonHash = None
+
+    @classmethod
+    def pythonHash(cls):
+        if cls._pythonHash is None:
+            cls._pythonHash = sha1(''.join(
+                cls.fileHash(name) for name in cls.pythonFiles))
+        return cls._pythonHash
+
+    @staticmethod
+    def fileHash(filename):
+        with open(filename, 'rb') as f:
+            return sha1(f.read())
+
+    def cacheFile(self, name, kind):
+        return os.path.join(self.cache_dir,
+                            '%s.%s.pickle' % (sha1(name), kind))
+
+    # Types declared in different machines share their identifiers.
+    @staticmethod
+    def symbolKey(symbol):
+        return (type(symbol).__name__, getattr(symbol, 'c_ident', str(symbol)))
+
+    def unitOf(self, filename):
+        for unit, sources in self.units.items():
+            if filename in sources:
+                return unit
+        return None
+
+    def fingerprints(self, includes):
+        '''Return a fingerprint of the inputs of each symbol's code.
+
+        The code of a state machine, and of the types declared within it,
+        depends on the unit the machine is in and on all the global
+        declarations (types, functions, enumerations) it can refer to.
+        Everything else is conservatively assumed to depend on all global
+        declarations, i.e., on every unit that doesn't consist of machines
+        only, and on the set of machines.'''
+        machine_units = set()
+        for machine in self.symtab.getAllType(StateMachine):
+            machine_units.add(self.unitOf(machine.location.filename))
+        for symbol in self.symtab.sym_map_vec[0].values():
+            if not isinstance(symbol, StateMachine):
+                machine_units.discard(self.unitOf(symbol.location.filename))
+
+        def unit_hash(unit):
+            return sha1(repr(sorted(self.units[unit].items())))
+
+        global_hash = sha1(repr((
+            self.pythonHash(), includes,
+            [ str(m) for m in self.symtab.getAllType(StateMachine) ],
+            [ unit_hash(u) for u in self.units if u not in machine_units ],
+        )))
+
+        fingerprints = {}
+        for symbol in self.symtab.sym_vec:
+            unit = self.unitOf(symbol.location.filename)
+            fingerprint = global_hash
+            if unit in machine_units:
+                fingerprint = sha1(global_hash + unit_hash(unit))
+            fingerprints[self.symbolKey(symbol)] = fingerprint
+        return fingerprints
+
+    def parse_file(self, filename, **kwargs):
+        # The files included by the .slicc file are the units which are
+        # cached, every other file belongs to the unit it was included
+        # from.
+        self.parsing.append(filename)
+        try:
+            unit = self.parsing[1] if len(self.parsing) > 1 else filename
+            if unit == filename:
+                self.units[unit] = {}
+                if self.cache_dir and len(self.parsing) == 2:
+                    decls = self.parseCached(filename)
+                    if decls is not None:
+                        return decls
+
+            with open(filename, 'r') as f:
+                contents = f.read()
+            self.units[unit][filename] = sha1(contents)
+            decls = self.parse_string(contents, filename, **kwargs)
+
+            if self.cache_dir and len(self.parsing) == 2:
+                self.saveCached(filename, decls)
+            return decls
+        finally:
+            self.parsing.pop()
+
+    def parseCached(self, filename):
+        try:
+            with open(self.cacheFile(filename, self.cacheKind()), 'rb') as f:
+                cached = ASTUnpickler(f, self).load()
+            if cached['pythonHash'] != self.pythonHash():
+                return None
+            for name, file_hash in cached['sources'].items():
+                if self.fileHash(name) != file_hash:
+                    return None
+        except (OSError, EOFError, pickle.UnpicklingError,
+                AttributeError, ImportError, KeyError):
+            return None
+        self.units[filename] = cached['sources']
+        return cached['decls']
+
+    def saveCached(self, filename, decls):
+        cache_file = self.cacheFile(filename, self.cacheKind())
+        tmp = '%s.%d' % (cache_file, os.getpid())
+        with open(tmp, 'wb') as f:
+            ASTPickler(f, self).dump({
+                'pythonHash' : self.pythonHash(),
+                'sources' : self.units[filename],
+                'decls' : decls,
+            })
+        os.replace(tmp, cache_file)
+
+    # Whether warnings are printed is recorded in the parsed declarations.
+    def cacheKind(self):
+        return 'verbose' if self.verbose else 'quiet'
+
     t_ignore = '\t '
 
     # C or C++ comment (ignore)
@@ -224,6 +224,13 @@ class StateMachine(Symbol):
                 in_msg_bufs[buf_name].append(port)
         return port_to_buf_map, in_msg_bufs, msg_bufs
 
+    def codeFiles(self):
+        return ['%s_Controller.py' % self.ident,
+                '%s_Controller.hh' % self.ident,
+                '%s_Controller.cc' % self.ident,
+                '%s_Wakeup.cc' % self.ident,
+                '%s_Transitions.cc' % self.ident]
+
     def writeCodeFiles(self, path, includes):
         self.printControllerPython(path)
         self.printControllerHH(path)
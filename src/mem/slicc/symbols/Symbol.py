@@ -72,6 +72,10 @@ class Symbol(PairContainer):
     def warning(self, message, *args):
         self.location.warning(message, *args)
 
+    def codeFiles(self):
+        '''The names of the files writeCodeFiles() generates.'''
+        return []
+
     def writeHTMLFiles(self, path):
         pass
 
@@ -131,7 +131,9 @@ class SymbolTable(object):
             if isinstance(symbol, type):
                 yield symbol
 
-    def writeCodeFiles(self, path, includes):
+    def writeCodeFiles(self, path, includes, unchanged=()):
+        '''Write the code for all symbols except for those in unchanged,
+        whose files are known to be up to date already.'''
         makeDir(path)
 
         code = self.codeFormatter()
@@ -146,7 +148,8 @@ class SymbolTable(object):
         code.write(path, "Types.hh")
 
         for symbol in self.sym_vec:
-            symbol.writeCodeFiles(path, includes)
+            if symbol not in unchanged:
+                symbol.writeCodeFiles(path, includes)
 
     def writeHTMLFiles(self, path):
         makeDir(path)
@@ -188,6 +188,11 @@ class Type(Symbol):
             return True
         return False
 
+    def codeFiles(self):
+        if self.isExternal:
+            return []
+        return ['%s.hh' % self.c_ident, '%s.cc' % self.c_ident]
+
     def writeCodeFiles(self, path, includes):
         if self.isExternal:
             # Do nothing
@@ -70,11 +70,17 @@ EmbeddedPython::getList()
 
 /*
  * Uncompress and unmarshal the code object stored in the
- * EmbeddedPython
+ * EmbeddedPython. Code which was embedded uncompressed is unmarshalled
+ * straight out of the binary's (mapped) image without any copies.
  */
 py::object
 EmbeddedPython::getCode() const
 {
+    auto marshal = py::module_::import("marshal");
+
+    if (zlen == 0)
+        return marshal.attr("loads")(py::memoryview::from_memory(code, len));
+
     Bytef marshalled[len];
     uLongf unzlen = len;
     int ret = uncompress(marshalled, &unzlen, (const Bytef *)code, zlen);
@@ -84,15 +90,16 @@ EmbeddedPython::getCode() const
     }
     assert(unzlen == (uLongf)len);
 
-    auto marshal = py::module_::import("marshal");
     return marshal.attr("loads")(py::bytes((char *)marshalled, len));
 }
 
 bool
 EmbeddedPython::addModule() const
 {
+    // Only unmarshal the code when the module is actually imported.
     auto importer = py::module_::import("importer");
-    importer.attr("add_module")(abspath, modpath, getCode());
+    importer.attr("add_module")(abspath, modpath,
+            py::cpp_function([this]() { return getCode(); }));
     return true;
 }
 
@@ -51,7 +51,9 @@ namespace gem5
 {
 
 /*
- * Data structure describing an embedded python file.
+ * Data structure describing an embedded python file. The code is the
+ * zlib compressed, marshalled code object of the file, or just the
+ * marshalled code object if zlen is 0.
  */
 struct EmbeddedPython
 {
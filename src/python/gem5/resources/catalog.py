@@ -0,0 +1,246 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+"""
+This Python module contains the in-memory catalog of the resources listed in
+a resources.json file, and its compact on-disk snapshot.
+"""
+
+# The first line of a snapshot file, followed by the version of the format.
+_SNAPSHOT_MAGIC = b"gem5-resources-snapshot"
+_SNAPSHOT_VERSION = 1
+
+
+def _get_resources(resources_group: Dict) -> Dict[str, Dict]:
+    """
+    A recursive function to get all the resources.
+
+    :returns: A dictionary of resource names to the resource JSON objects.
+    """
+
+    to_return = {}
+    for resource in resources_group:
+        # 'artifact' is the old naming, we keep it here for
+        # backwards compatibility, but it can be removed with time:
+        # https://gem5-review.googlesource.com/c/public/gem5-resources/+/51169.
+        if resource["type"] == "artifact" or resource["type"] == "resource":
+            # If the type is "resource" then we add it directly to the map
+            # after a check that the name is unique.
+            if resource["name"] in to_return.keys():
+                raise Exception(
+                    "Error: Duplicate resource with name '{}'.".format(
+                        resource["name"]
+                    )
+                )
+            to_return[resource["name"]] = resource
+        elif resource["type"] == "group":
+            # If it's a group we get recursive. We then check to see if there
+            # are any duplication of keys.
+            new_map = _get_resources(resource["contents"])
+            intersection = set(new_map.keys()).intersection(to_return.keys())
+            if len(intersection) > 0:
+                # Note: if this error is received it's likely an error with
+                # the resources.json file. The resources names need to be
+                # unique keyes.
+                raise Exception(
+                    "Error: Duplicate resources with names: {}.".format(
+                        str(intersection)
+                    )
+                )
+            to_return.update(new_map)
+        else:
+            raise Exception(
+                "Error: Unknown type '{}'.".format(resource["type"])
+            )
+
+    return to_return
+
+
+class ResourcesCatalog:
+    """
+    The resources of a resources.json file, indexed by name.
+
+    A catalog is either built from the resources.json dictionary, or loaded
+    from a snapshot written by `save_snapshot`. A snapshot holds an index of
+    the resource names followed by the JSON object of each resource, so
+    loading it only reads the index. The JSON object of a resource is read the
+    first time the resource is looked up.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        url_base: str,
+        resources: Dict[str, Union[Dict, Tuple[int, int]]],
+        snapshot: Optional[str] = None,
+    ):
+        """
+        :param version: The version of the resources.json file.
+
+        :param url_base: The "url_base" string of the resources.json file.
+
+        :param resources: A dictionary of resource names to either the
+        resource JSON objects, or the (offset, length) of the JSON objects in
+        `snapshot`.
+
+        :param snapshot: The path of the snapshot the catalog is loaded from,
+        if any.
+        """
+        self._version = version
+        self._url_base = url_base
+        self._resources = resources
+        self._snapshot = snapshot
+
+    @classmethod
+    def from_json(cls, resources_json: Dict) -> "ResourcesCatalog":
+        """
+        Builds a catalog from a resources.json file.
+
+        :param resources_json: The resources.json file, as a Python Dict.
+        """
+        return cls(
+            version=resources_json["version"],
+            url_base=resources_json.get("url_base", ""),
+            resources=_get_resources(resources_json["resources"]),
+        )
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "ResourcesCatalog":
+        """
+        Loads a catalog from a snapshot written by `save_snapshot`.
+
+        :param path: The path of the snapshot.
+
+        :raises Exception: An exception is raised if the file is not a
+        snapshot of a version of the format this class can read.
+        """
+        with open(path, "rb") as f:
+            magic = f.readline().split()
+            if len(magic) != 2 or magic[0] != _SNAPSHOT_MAGIC or \
+                magic[1] != str(_SNAPSHOT_VERSION).encode():
+                raise Exception(
+                    f"'{path}' is not a resources snapshot (version "
+                    f"{_SNAPSHOT_VERSION})."
+                )
+            header = json.loads(f.readline())
+            start = f.tell()
+
+        resources = {
+            name : (start + offset, length)
+            for name, (offset, length) in header["index"].items()
+        }
+        return cls(
+            version=header["version"],
+            url_base=header["url_base"],
+            resources=resources,
+            snapshot=path,
+        )
+
+    def save_snapshot(self, path: str) -> None:
+        """
+        Writes the catalog to a snapshot, which `load_snapshot` can load
+        without network access. The file is replaced atomically.
+
+        :param path: The path of the snapshot.
+        """
+        index = {}
+        entries = []
+        offset = 0
+        for name in self._resources:
+            entry = json.dumps(
+                self.get(name), separators=(",", ":")
+            ).encode("utf-8")
+            index[name] = (offset, len(entry))
+            entries.append(entry)
+            offset += len(entry)
+
+        header = json.dumps(
+            {
+                "version" : self._version,
+                "url_base" : self._url_base,
+                "index" : index,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_SNAPSHOT_MAGIC + b" %d\n" % _SNAPSHOT_VERSION)
+            f.write(header + b"\n")
+            for entry in entries:
+                f.write(entry)
+        os.replace(tmp_path, path)
+
+    @property
+    def version(self) -> str:
+        """The version of the resources.json file."""
+        return self._version
+
+    @property
+    def url_base(self) -> str:
+        """The "url_base" string of the resources.json file."""
+        return self._url_base
+
+    def names(self) -> List[str]:
+        """Returns the names of all the resources in the catalog."""
+        return list(self._resources.keys())
+
+    def get(self, resource_name: str) -> Dict:
+        """
+        Get the JSON object of a resource.
+
+        :param resource_name: The name of the resource.
+
+        :returns: The JSON object (in the form of a dictionary).
+
+        :raises Exception: An exception is raised if the specified resources
+        does not exist.
+        """
+        if resource_name not in self._resources:
+            raise Exception(
+                "Error: Resource with name '{}' does not exist".format(
+                    resource_name
+                )
+            )
+
+        resource = self._resources[resource_name]
+        if isinstance(resource, tuple):
+            offset, length = resource
+            with open(self._snapshot, "rb") as f:
+                f.seek(offset)
+                resource = json.loads(f.read(length))
+            self._resources[resource_name] = resource
+        return resource
+
+    def __contains__(self, resource_name: str) -> bool:
+        return resource_name in self._resources
+
+    def __len__(self) -> int:
+        return len(self._resources)
@@ -24,6 +24,8 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import http.client
+import io
 import json
 import urllib.request
 import urllib.parse
@@ -39,9 +41,19 @@ from pathlib import Path
 import tarfile
 from tempfile import gettempdir
 from urllib.error import HTTPError
-from typing import List, Dict
-
-from .md5_utils import md5_file, md5_dir
+from functools import lru_cache
+from typing import List, Dict, Optional
+
+from .catalog import ResourcesCatalog
+from .store import (
+    get_store_dir,
+    link_from_store,
+    make_read_only,
+    owned_by_user,
+    remove_from_store,
+    store_path,
+)
+from .md5_utils import md5_cached, md5_dir, record_md5, _md5_update_from_file
 
 from ..utils.filelock import FileLock
 
@@ -161,61 +173,48 @@ def _get_resources_json() -> Dict:
 
     return to_return
 
-def _get_url_base() -> str:
+@lru_cache(maxsize=None)
+def _get_resources_catalog_at(
+    path: str, snapshot: Optional[str]
+) -> ResourcesCatalog:
     """
-    Obtains the "url_base" string from the resources.json file.
+    Returns the catalog of the resources.json file at `path`, or of the
+    snapshot at `snapshot` if one is given. The catalog is only loaded once.
+    """
+    if snapshot:
+        catalog = ResourcesCatalog.load_snapshot(snapshot)
+        version = _resources_json_version_required()
+        if catalog.version != version:
+            raise Exception(
+                f"The resources snapshot '{snapshot}' is of version "
+                f"'{catalog.version}' of resources.json, not '{version}'."
+            )
+        return catalog
+    return ResourcesCatalog.from_json(_get_resources_json())
 
-    :returns: The "url_base" string value from the resources.json file.
+def _get_resources_catalog() -> ResourcesCatalog:
     """
-    json = _get_resources_json()
-    if "url_base" in json.keys():
-        return json["url_base"]
-    return ""
+    Gets the catalog of the resources in the Resources JSON.
 
+    If the "GEM5_RESOURCE_SNAPSHOT" environment variable is set, the catalog
+    is loaded from that snapshot (see `save_resources_snapshot`) and the
+    Resources JSON is not retrieved.
 
-def _get_resources(resources_group: Dict) -> Dict[str, Dict]:
+    :returns: The resources catalog.
     """
-    A recursive function to get all the resources.
+    return _get_resources_catalog_at(
+        path=os.getenv("GEM5_RESOURCE_JSON", _get_resources_json_uri()),
+        snapshot=os.getenv("GEM5_RESOURCE_SNAPSHOT"),
+    )
 
-    :returns: A dictionary of resource names to the resource JSON objects.
+def _get_url_base() -> str:
     """
+    Obtains the "url_base" string from the resources.json file.
 
-    to_return = {}
-    for resource in resources_group:
-        # 'artifact' is the old naming, we keep it here for
-        # backwards compatibility, but it can be removed with time:
-        # https://gem5-review.googlesource.com/c/public/gem5-resources/+/51169.
-        if resource["type"] == "artifact" or resource["type"] == "resource":
-            # If the type is "resource" then we add it directly to the map
-            # after a check that the name is unique.
-            if resource["name"] in to_return.keys():
-                raise Exception(
-                    "Error: Duplicate resource with name '{}'.".format(
-                        resource["name"]
-                    )
-                )
-            to_return[resource["name"]] = resource
-        elif resource["type"] == "group":
-            # If it's a group we get recursive. We then check to see if there
-            # are any duplication of keys.
-            new_map = _get_resources(resource["contents"])
-            intersection = set(new_map.keys()).intersection(to_return.keys())
-            if len(intersection) > 0:
-                # Note: if this error is received it's likely an error with
-                # the resources.json file. The resources names need to be
-                # unique keyes.
-                raise Exception(
-                    "Error: Duplicate resources with names: {}.".format(
-                        str(intersection)
-                    )
-                )
-            to_return.update(new_map)
-        else:
-            raise Exception(
-                "Error: Unknown type '{}'.".format(resource["type"])
-            )
+    :returns: The "url_base" string value from the resources.json file.
+    """
+    return _get_resources_catalog().url_base
 
-    return to_return
 
 def _download(
     url: str,
@@ -269,13 +268,279 @@ def _download(
 
 
 
+class _ResumableDownload(io.RawIOBase):
+    """
+    A file-like object reading the body of a URL. If the connection is lost,
+    the download resumes where it stopped using a HTTP Range request.
+
+    Connecting is retried with the same Truncated Exponential Backoff
+    algorithm as `_download`.
+    """
+
+    def __init__(self, url: str, offset: int = 0, max_attempts: int = 6):
+        """
+        :param url: The URL of the file to download.
+
+        :param offset: The offset in the file to start the download at.
+
+        :param max_attempts: The max number of attempts to connect before
+        stopping.
+        """
+        super().__init__()
+        self._url = url
+        self._offset = offset
+        self._max_attempts = max_attempts
+        self._attempt = 0
+        self._response = None
+        self._length = None
+        self._connect()
+
+    def _retry(self, error: Exception) -> None:
+        self._attempt += 1
+        if self._attempt >= self._max_attempts:
+            raise Exception(
+                f"After {self._attempt} attempts, '{self._url}' could not be "
+                f"downloaded: {error}"
+            )
+        time.sleep((2 ** self._attempt) + random.uniform(0, 1))
+
+    def _connect(self) -> None:
+        while True:
+            request = urllib.request.Request(self._url)
+            if self._offset:
+                request.add_header("Range", f"bytes={self._offset}-")
+            try:
+                response = urllib.request.urlopen(request)
+                break
+            except HTTPError as e:
+                if e.code == 416 and self._offset:
+                    # There is nothing left to download.
+                    self._response = None
+                    return
+                if e.code in (408, 429) or 500 <= e.code < 600:
+                    self._retry(e)
+                else:
+                    raise e
+
+        length = response.getheader("Content-Length")
+        if response.status == 206:
+            # "Content-Range: bytes <first>-<last>/<length>"
+            total = response.getheader("Content-Range", "").split("/")[-1]
+            self._length = int(total) if total.isdigit() else None
+        else:
+            # The server doesn't support ranges, skip what was read before.
+            self._length = int(length) if length is not None else None
+            skip = self._offset
+            while skip > 0:
+                chunk = response.read(min(skip, 1024 * 1024))
+                if not chunk:
+                    break
+                skip -= len(chunk)
+        self._response = response
+        self._received = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self._response is not None:
+            try:
+                size = self._response.readinto(b)
+                if size == 0 and self._length is not None and \
+                    self._offset < self._length:
+                    raise http.client.IncompleteRead(
+                        b"", self._length - self._offset
+                    )
+            except (OSError, http.client.HTTPException) as e:
+                self._response.close()
+                self._response = None
+                # Only back off if nothing could be read since connecting.
+                if not self._received:
+                    self._retry(e)
+                self._connect()
+                continue
+            if size:
+                self._attempt = 0
+            self._offset += size
+            self._received += size
+            return size
+        return 0
+
+    def close(self) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+        super().close()
+
+
+def _download_resource(
+    url: str,
+    to_path: str,
+    unzip: bool,
+    untar: bool,
+    md5sum: Optional[str] = None,
+    max_attempts: int = 6,
+) -> None:
+    """
+    Downloads a resource in a single pass: the download is decompressed and
+    unpacked while it is received, and the md5 value of a file is computed
+    while it is written. The resource is staged at "<to_path>.part" and only
+    renamed to `to_path` once it is complete.
+
+    If the connection is lost, the download is resumed using a HTTP Range
+    request. An interrupted download of a file which is neither compressed
+    nor a tar archive is resumed by the next call.
+
+    :param url: The URL of the resource.
+
+    :param to_path: The location the resource is to be stored.
+
+    :param unzip: Decompress the resource, which is gzipped.
+
+    :param untar: Unpack the resource, which is a tar archive, to a directory.
+
+    :param md5sum: The md5 value of the resource once decompressed and
+    unpacked. If not None, an exception is raised if the downloaded resource
+    has a different md5 value.
+
+    :param max_attempts: The max number of attempts to connect before
+    stopping.
+    """
+
+    part_path = to_path + ".part"
+    md5 = hashlib.md5()
+    offset = 0
+    if os.path.isfile(part_path) and not unzip and not untar:
+        offset = os.path.getsize(part_path)
+        _md5_update_from_file(Path(part_path), md5)
+    elif os.path.isdir(part_path):
+        shutil.rmtree(part_path)
+    elif os.path.exists(part_path):
+        os.remove(part_path)
+
+    with _ResumableDownload(url, offset, max_attempts) as download:
+        stream = io.BufferedReader(download, buffer_size=1024 * 1024)
+        if untar:
+            # Tar archives can be gzipped whether or not they are unzipped.
+            with tarfile.open(fileobj=stream, mode="r|*") as f:
+                f.extractall(part_path)
+            # md5_dir() hashes the files sorted by name rather than in the
+            # order they are in the archive.
+            md5_value = md5_dir(Path(part_path)) if md5sum else None
+        else:
+            if unzip:
+                stream = gzip.GzipFile(fileobj=stream, mode="rb")
+            with open(part_path, "ab") as f:
+                for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                    md5.update(chunk)
+                    f.write(chunk)
+            md5_value = md5.hexdigest()
+
+    if md5sum is not None and md5_value != md5sum:
+        if os.path.isdir(part_path):
+            shutil.rmtree(part_path)
+        else:
+            os.remove(part_path)
+        if offset:
+            # The interrupted download may have been of another version of
+            # the resource.
+            return _download_resource(url, to_path, unzip, untar, md5sum,
+                                      max_attempts)
+        raise Exception(
+            f"The resource downloaded from '{url}' has the md5 value "
+            f"'{md5_value}' rather than '{md5sum}'."
+        )
+
+    os.replace(part_path, to_path)
+    if md5sum is not None:
+        record_md5(Path(to_path), md5sum)
+
+
+def _get_resource_from_store(
+    resource_name: str,
+    url: str,
+    to_path: str,
+    unzip: bool,
+    untar: bool,
+    md5sum: str,
+    store_dir: str,
+) -> bool:
+    """
+    Obtains a resource through the shared resource store: the resource is
+    downloaded to the store if it is not already there, and then linked to
+    `to_path`.
+
+    :param resource_name: The name of the resource.
+    :param url: The URL of the resource.
+    :param to_path: The location the resource is to be linked to.
+    :param unzip: Decompress the resource, which is gzipped.
+    :param untar: Unpack the resource, which is a tar archive.
+    :param md5sum: The md5 value of the resource.
+    :param store_dir: The directory of the store.
+
+    :returns: False if the store can't be used, e.g. if this user can't
+    write to it, in which case nothing is done.
+    """
+
+    try:
+        path = store_path(store_dir, md5sum)
+
+        # Processes obtaining the same resource wait here for the first one
+        # to download it to the store.
+        with FileLock("{}.lock".format(path), timeout=900):
+
+            if os.path.exists(path) and md5_cached(
+                Path(path), force=not owned_by_user(path)
+            ) != md5sum:
+                # The resource in the store has been modified.
+                remove_from_store(path)
+
+            if not os.path.exists(path):
+                print(
+                    f"Resource '{resource_name}' was not found in the "
+                    f"resource store. Downloading to '{path}'..."
+                )
+                _download_resource(
+                    url=url,
+                    to_path=path,
+                    unzip=unzip,
+                    untar=untar,
+                    md5sum=md5sum,
+                )
+                make_read_only(path)
+                print(f"Finished downloading resource '{resource_name}'.")
+
+            try:
+                linked = link_from_store(path, to_path)
+            except:
+                if os.path.isdir(to_path) and not os.path.islink(to_path):
+                    shutil.rmtree(to_path)
+                elif os.path.lexists(to_path):
+                    os.remove(to_path)
+                raise
+            if not linked:
+                print(
+                    f"Resource '{resource_name}' can't be linked from the "
+                    f"resource store, it was copied to '{to_path}' instead."
+                )
+    except PermissionError as e:
+        print(
+            f"The resource store '{store_dir}' can't be used ({e}), "
+            f"resource '{resource_name}' is obtained without it."
+        )
+        return False
+
+    record_md5(Path(to_path), md5sum)
+    return True
+
+
 def list_resources() -> List[str]:
     """
     Lists all available resources by name.
 
     :returns: A list of resources by name.
     """
-    return _get_resources(_get_resources_json()["resources"]).keys()
+    return _get_resources_catalog().names()
 
 
 def get_resources_json_obj(resource_name: str) -> Dict:
@@ -289,16 +554,18 @@ def get_resources_json_obj(resource_name: str) -> Dict:
     :raises Exception: An exception is raised if the specified resources does
     not exist.
     """
-    resource_map = _get_resources(_get_resources_json()["resources"])
+    return _get_resources_catalog().get(resource_name)
 
-    if resource_name not in resource_map:
-        raise Exception(
-            "Error: Resource with name '{}' does not exist".format(
-                resource_name
-            )
-        )
 
-    return resource_map[resource_name]
+def save_resources_snapshot(path: str) -> None:
+    """
+    Saves a snapshot of the resources catalog, e.g. for hosts without network
+    access. The snapshot is used in place of the Resources JSON if the
+    "GEM5_RESOURCE_SNAPSHOT" environment variable is set to its path.
+
+    :param path: The path the snapshot is to be saved to.
+    """
+    _get_resources_catalog().save_snapshot(path)
 
 
 def get_resource(
@@ -307,6 +574,7 @@ def get_resource(
     unzip: bool = True,
     untar: bool = True,
     download_md5_mismatch: bool = True,
+    force_md5_check: bool = False,
 ) -> None:
     """
     Obtains a gem5 resource and stored it to a specified location. If the
@@ -328,9 +596,23 @@ def get_resource(
     will delete this local resource and re-download it if this parameter is
     True. True by default.
 
+    :param force_md5_check: If true, the md5 sum of a resource already present
+    at `to_path` is always computed. Otherwise it is only computed if the
+    resource has changed since it was last checked, see
+    `md5_utils.md5_cached`. False by default.
+
+    If the "GEM5_RESOURCE_STORE" environment variable is set to a directory,
+    which may be shared by the members of its group, a single copy of the
+    resource is downloaded to that directory under its md5 value and
+    `to_path` is a symbolic link to it (or a clone or a copy of it, if the
+    file system doesn't support symbolic links). Resources in the store are
+    made read-only, and the md5 value of a resource added by another user is
+    always computed.
+
     :raises Exception: An exception is thrown if a file is already present at
     `to_path` but it does not have the correct md5 sum. An exception will also
-    be thrown is a directory is present at `to_path`
+    be thrown is a directory is present at `to_path`, or if the downloaded
+    resource does not have the correct md5 sum.
     """
 
     # We apply a lock for a specific resource. This is to avoid circumstances
@@ -342,19 +624,21 @@ def get_resource(
 
         resource_json = get_resources_json_obj(resource_name)
 
+        if os.path.islink(to_path) and not os.path.exists(to_path):
+            # The resource it was linked to has been removed from the
+            # resource store.
+            os.remove(to_path)
+
         if os.path.exists(to_path):
 
-            if os.path.isfile(to_path):
-                md5 = md5_file(Path(to_path))
-            else:
-                md5 = md5_dir(Path(to_path))
+            md5 = md5_cached(Path(to_path), force=force_md5_check)
 
             if md5 == resource_json["md5sum"]:
                 # In this case, the file has already been download, no need to
                 # do so again.
                 return
             elif download_md5_mismatch:
-                if os.path.isfile(to_path):
+                if os.path.isfile(to_path) or os.path.islink(to_path):
                     os.remove(to_path)
                 else:
                     shutil.rmtree(to_path)
@@ -364,16 +648,14 @@ def get_resource(
                     "its md5 value is invalid.".format(to_path)
                 )
 
-        download_dest = to_path
-
         # This if-statement is remain backwards compatable with the older,
         # string-based way of doing things. It can be refactored away over
         # time:
         # https://gem5-review.googlesource.com/c/public/gem5-resources/+/51168
         if isinstance(resource_json["is_zipped"], str):
-            run_unzip = unzip and resource_json["is_zipped"].lower() == "true"
+            is_zipped = resource_json["is_zipped"].lower() == "true"
         elif isinstance(resource_json["is_zipped"], bool):
-            run_unzip = unzip and resource_json["is_zipped"]
+            is_zipped = resource_json["is_zipped"]
         else:
             raise Exception(
                 "The resource.json entry for '{}' has a value for the "
@@ -382,56 +664,50 @@ def get_resource(
                     resource_name
                 )
             )
+        run_unzip = unzip and is_zipped
 
-        run_tar_extract = untar and "is_tar_archive" in resource_json and \
-                          resource_json["is_tar_archive"]
+        is_tar_archive = "is_tar_archive" in resource_json and \
+                         resource_json["is_tar_archive"]
+        run_tar_extract = untar and is_tar_archive
 
-        tar_extension = ".tar"
-        if run_tar_extract:
-            download_dest += tar_extension
+        # Get the URL. The URL may contain '{url_base}' which needs replaced
+        # with the correct value.
+        url = resource_json["url"].format(url_base=_get_url_base())
 
-        zip_extension = ".gz"
-        if run_unzip:
-            download_dest += zip_extension
+        # The md5 value is that of the resource once it is decompressed and
+        # unpacked.
+        if run_unzip == is_zipped and run_tar_extract == is_tar_archive:
+            md5sum = resource_json["md5sum"]
+        else:
+            md5sum = None
+
+        store_dir = get_store_dir()
+        if store_dir is not None and md5sum is not None and \
+            _get_resource_from_store(
+                resource_name=resource_name,
+                url=url,
+                to_path=to_path,
+                unzip=run_unzip,
+                untar=run_tar_extract,
+                md5sum=md5sum,
+                store_dir=store_dir,
+            ):
+            return
 
         # TODO: Might be nice to have some kind of download status bar here.
         # TODO: There might be a case where this should be silenced.
         print(
             "Resource '{}' was not found locally. Downloading to '{}'..."
             .format(
-                resource_name, download_dest
+                resource_name, to_path
             )
         )
 
-        # Get the URL. The URL may contain '{url_base}' which needs replaced
-        # with the correct value.
-        url = resource_json["url"].format(url_base=_get_url_base())
-
-        _download(url=url, download_to=download_dest)
+        _download_resource(
+            url=url,
+            to_path=to_path,
+            unzip=run_unzip,
+            untar=run_tar_extract,
+            md5sum=md5sum,
+        )
         print("Finished downloading resource '{}'.".format(resource_name))
-
-        if run_unzip:
-            print(
-                "Decompressing resource '{}' ('{}')...".format(
-                    resource_name, download_dest
-                )
-            )
-            unzip_to = download_dest[:-len(zip_extension)]
-            with gzip.open(download_dest, "rb") as f:
-                with open(unzip_to, "wb") as o:
-                    shutil.copyfileobj(f, o)
-            os.remove(download_dest)
-            download_dest = unzip_to
-            print(
-                "Finished decompressing resource '{}'.".format(resource_name)
-            )
-
-        if run_tar_extract:
-            print(
-                f"Unpacking the the resource '{resource_name}' "
-                f"('{download_dest}')"
-            )
-            unpack_to = download_dest[:-len(tar_extension)]
-            with tarfile.open(download_dest) as f:
-                f.extractall(unpack_to)
-            os.remove(download_dest)
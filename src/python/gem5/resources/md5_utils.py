@@ -26,13 +26,21 @@
 
 from pathlib import Path
 import hashlib
+import json
+import os
 from _hashlib import HASH as Hash
+from typing import Dict, Optional
+
+# Large reads are a lot faster than small ones on network file systems.
+_BUFFER_SIZE = 1024 * 1024
 
 def _md5_update_from_file(filename:  Path, hash: Hash) -> Hash:
     assert filename.is_file()
-    with open(str(filename), "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash.update(chunk)
+    buffer = bytearray(_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(str(filename), "rb", buffering=0) as f:
+        for size in iter(lambda: f.readinto(buffer), 0):
+            hash.update(view[:size])
     return hash
 
 def _md5_update_from_dir(directory:  Path, hash: Hash) -> Hash:
@@ -66,6 +74,11 @@ def md5_file(filename:  Path) -> str:
 
     :filename: The file in which the md5 is to be calculated.
     """
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+ hashes the file without copying it into Python objects.
+        assert filename.is_file()
+        with open(str(filename), "rb") as f:
+            return str(hashlib.file_digest(f, "md5").hexdigest())
     return str(_md5_update_from_file(filename, hashlib.md5()).hexdigest())
 
 def md5_dir(directory: Path) -> str:
@@ -78,3 +91,113 @@ def md5_dir(directory: Path) -> str:
     if empty files are included or filenames are changed.
     """
     return str(_md5_update_from_dir(directory, hashlib.md5()).hexdigest())
+
+def _md5_cache_path(path: Path) -> Path:
+    """
+    The sidecar file recording the md5 value of a file or directory.
+    """
+    return path.with_name(path.name + ".md5cache")
+
+def _fingerprint(path: Path) -> Dict:
+    """
+    Identifies the contents of a file or directory without reading them. It
+    changes if a file is replaced, or written to, since it was recorded.
+    """
+    def stat_of(st: os.stat_result) -> Dict:
+        return {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "inode": st.st_ino,
+            "device": st.st_dev,
+        }
+
+    fingerprint = {"path": str(path.resolve())}
+    if path.is_file():
+        fingerprint.update(stat_of(path.stat()))
+    else:
+        # The names of everything in the directory, as `md5_dir` hashes the
+        # names of subdirectories too, and the stats of the files.
+        entries = hashlib.md5()
+        for root, dirs, filenames in os.walk(str(path)):
+            dirs.sort()
+            for name in dirs:
+                directory = os.path.join(root, name)
+                entries.update(
+                    json.dumps(
+                        [os.path.relpath(directory, str(path)), "dir"]
+                    ).encode()
+                )
+            for name in sorted(filenames):
+                file = os.path.join(root, name)
+                st = os.stat(file)
+                entries.update(
+                    json.dumps(
+                        [os.path.relpath(file, str(path)), stat_of(st)]
+                    ).encode()
+                )
+        fingerprint["entries"] = entries.hexdigest()
+    return fingerprint
+
+def _read_md5_cache(path: Path, fingerprint: Dict) -> Optional[str]:
+    try:
+        with open(str(_md5_cache_path(path))) as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(record, dict) or \
+        record.get("fingerprint") != fingerprint:
+        return None
+    return record.get("md5")
+
+def _write_md5_cache(path: Path, fingerprint: Dict, md5: str) -> None:
+    cache_path = _md5_cache_path(path)
+    tmp_path = cache_path.with_name(
+        f"{cache_path.name}.{os.getpid()}.tmp"
+    )
+    try:
+        with open(str(tmp_path), "w") as f:
+            json.dump({"fingerprint": fingerprint, "md5": md5}, f)
+        # The cache may be of a resource shared with other users.
+        os.chmod(str(tmp_path), 0o644)
+        os.replace(str(tmp_path), str(cache_path))
+    except OSError:
+        # The md5 value just isn't cached if, e.g., the resources are on a
+        # read-only file system.
+        try:
+            os.remove(str(tmp_path))
+        except OSError:
+            pass
+
+def md5_cached(path: Path, force: bool = False) -> str:
+    """
+    Gets the md5 value of a file or directory, like `md5`, but only computes
+    it if the file or directory has changed since its md5 value was last
+    computed. The md5 value is recorded, in a sidecar file next to the file or
+    directory, with the path, size, modification time and inode of the file,
+    or of all files in the directory.
+
+    :param path: The path to get the md5 of.
+    :param force: Always compute the md5 value, ignoring the recorded one. The
+    new md5 value is recorded. False by default.
+    """
+    path = Path(path)
+    fingerprint = _fingerprint(path)
+    if not force:
+        cached = _read_md5_cache(path, fingerprint)
+        if cached is not None:
+            return cached
+
+    value = md5(path)
+    _write_md5_cache(path, fingerprint, value)
+    return value
+
+def record_md5(path: Path, md5: str) -> None:
+    """
+    Records the md5 value of a file or directory for `md5_cached`, e.g. when
+    it has been computed while the file or directory was created.
+
+    :param path: The path of the file or directory.
+    :param md5: The md5 value of the file or directory.
+    """
+    path = Path(path)
+    _write_md5_cache(path, _fingerprint(path), md5)
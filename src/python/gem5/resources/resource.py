@@ -126,6 +126,7 @@ class Resource(AbstractResource):
         resource_name: str,
         resource_directory: Optional[str] = None,
         download_md5_mismatch: bool = True,
+        force_md5_check: bool = False,
     ):
         """
         :param resource_name: The name of the gem5 resource.
@@ -137,6 +138,9 @@ class Resource(AbstractResource):
         have the correct md5 value, the resoruce will be deleted and
         re-downloaded if this value is True. Otherwise an exception will be
         thrown. True by default.
+        :param force_md5_check: If True, the md5 value of a resource which is
+        present is always computed, otherwise it is only computed if the
+        resource has changed since it was last checked. False by default.
         """
 
         if resource_directory == None:
@@ -168,7 +172,8 @@ class Resource(AbstractResource):
         get_resource(
             resource_name=resource_name,
             to_path=to_path,
-            download_md5_mismatch=download_md5_mismatch
+            download_md5_mismatch=download_md5_mismatch,
+            force_md5_check=force_md5_check,
         )
 
 
@@ -0,0 +1,195 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import errno
+import os
+import shutil
+import stat
+import uuid
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .md5_utils import _md5_cache_path
+
+"""
+This Python module contains functions for the shared resource store: a
+directory, which can be shared between users, holding a single copy of each
+resource under its md5 value. Resources are linked from the store to where
+they are used with symbolic links, which, unlike hard links, can be made by
+users who don't own the resource and across file systems.
+"""
+
+# The Linux FICLONE ioctl, which makes a copy-on-write clone of a file.
+_FICLONE = 0x40049409
+
+# The mode of the directories of the store. The store is shared by the
+# members of its group: files in the directories are created with the group
+# of the directory, and every member can add resources, lock files and md5
+# caches to them, and remove stale ones. There is no sticky bit, as the
+# resources and md5 caches of one member may have to be replaced by another.
+_SHARED_DIR_MODE = 0o2775
+
+def _make_shared_dir(directory: str) -> None:
+    try:
+        os.mkdir(directory)
+    except FileExistsError:
+        return
+    # The umask applies to the mode passed to mkdir(), so the mode is set
+    # afterwards.
+    os.chmod(directory, _SHARED_DIR_MODE)
+
+def get_store_dir() -> Optional[str]:
+    """
+    Returns the directory of the shared resource store, set by the
+    "GEM5_RESOURCE_STORE" environment variable, or None if it is not set.
+    """
+    return os.getenv("GEM5_RESOURCE_STORE") or None
+
+def store_path(store_dir: str, md5sum: str) -> str:
+    """
+    Returns the path of the resource with md5 value `md5sum` in a store. The
+    parent directory of the path, and the store, are created if they don't
+    exist, writable by the group of the store.
+
+    :param store_dir: The directory of the store.
+    :param md5sum: The md5 value of the resource.
+    """
+    parent = os.path.dirname(os.path.abspath(store_dir))
+    os.makedirs(parent, exist_ok=True)
+    _make_shared_dir(store_dir)
+    directory = os.path.join(store_dir, md5sum[:2])
+    _make_shared_dir(directory)
+    return os.path.join(directory, md5sum)
+
+def make_read_only(path: str) -> None:
+    """
+    Makes a resource in the store readable by every user, and removes write
+    permissions from its files, and those of the group and other users from
+    its directories. As resources are linked from the store, this stops a
+    resource from being modified through one of its links.
+
+    :param path: The path of the file or directory in the store.
+    """
+    read = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+    search = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+    no_write = ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    no_shared_write = ~(stat.S_IWGRP | stat.S_IWOTH)
+
+    def share(p: str) -> None:
+        mode = stat.S_IMODE(os.stat(p).st_mode)
+        if os.path.isdir(p):
+            os.chmod(p, (mode | read | search) & no_shared_write)
+        else:
+            os.chmod(p, (mode | read) & no_write)
+
+    share(path)
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            for name in dirs + files:
+                share(os.path.join(root, name))
+
+def owned_by_user(path: str) -> bool:
+    """
+    Whether a resource in the store, and the record of its md5 value, are
+    owned by this user. Other members of the group of the store can replace
+    either of them, so only the md5 value recorded for a resource this user
+    added to the store can be trusted.
+
+    :param path: The path of the file or directory in the store.
+    """
+    if not hasattr(os, "getuid"):
+        return False
+    for p in (path, str(_md5_cache_path(Path(path)))):
+        try:
+            if os.lstat(p).st_uid != os.getuid():
+                return False
+        except FileNotFoundError:
+            pass
+    return True
+
+def remove_from_store(path: str) -> None:
+    """
+    Removes a stale resource from the store. The subdirectories of a
+    directory downloaded by another user can't be emptied, so a directory is
+    moved aside first, and left there if it can't be removed.
+
+    :param path: The path of the file or directory in the store.
+    """
+    if os.path.isdir(path):
+        stale_path = f"{path}.stale.{uuid.uuid4().hex}"
+        os.rename(path, stale_path)
+        shutil.rmtree(stale_path, ignore_errors=True)
+    else:
+        os.remove(path)
+
+def _copy_file(src: str, dst: str) -> None:
+    """
+    Copies the file `src` to `dst`, with a copy-on-write clone if the file
+    system supports them.
+    """
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except (OSError, AttributeError):
+            shutil.copyfileobj(s, d, 1024 * 1024)
+    shutil.copymode(src, dst)
+
+def link_from_store(path: str, to_path: str) -> bool:
+    """
+    Links a resource in the store to `to_path` with a symbolic link. If the
+    link can't be made, e.g. because the file system doesn't support them,
+    the resource is copied to `to_path` instead.
+
+    :param path: The path of the file or directory in the store.
+    :param to_path: The path the resource is to be linked to. It must not
+    exist.
+
+    :returns: False if the resource was copied rather than linked.
+    """
+    try:
+        os.symlink(
+            os.path.abspath(path),
+            to_path,
+            target_is_directory=os.path.isdir(path),
+        )
+        return True
+    except NotImplementedError:
+        pass
+    except OSError as e:
+        # Symbolic links may not be supported by the file system.
+        if e.errno not in (errno.EPERM, errno.ENOTSUP, errno.ENOSYS):
+            raise
+
+    if os.path.isdir(path):
+        shutil.copytree(path, to_path, copy_function=_copy_file)
+    else:
+        _copy_file(path, to_path)
+    return False
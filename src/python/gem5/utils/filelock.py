@@ -27,6 +27,13 @@ import os
 import time
 import errno
 
+try:
+    import fcntl
+except ImportError:
+    # fcntl is not available on Windows, where the lock file is created
+    # exclusively instead.
+    fcntl = None
+
 
 class FileLockException(Exception):
     pass
@@ -34,13 +41,21 @@ class FileLockException(Exception):
 
 class FileLock(object):
     """A file locking mechanism that has context-manager support so
-    you can use it in a with statement. This should be relatively cross
-    compatible as it doesn't rely on msvcrt or fcntl for the locking.
+    you can use it in a with statement.
+
+    Where fcntl is available the lock is a `flock` on the lock file, which
+    is released if the process holding it dies. The lock file is left in
+    place as other processes may be waiting on it. Otherwise the lock is
+    held by exclusively creating the lock file. Either way, a process
+    waiting for the lock tries again after `delay` seconds until `timeout`
+    seconds have passed.
     """
 
     def __init__(self, file_name, timeout=10, delay=0.05):
         """Prepare the file locker. Specify the file to lock and optionally
-        the maximum timeout and the delay between each attempt to lock.
+        the maximum timeout and the delay between each attempt to lock. If
+        the timeout is None the lock is not waited for. With fcntl, the
+        delay doubles after each attempt, up to a second.
         """
         if timeout is not None and delay is None:
             raise ValueError(
@@ -58,6 +73,10 @@ class FileLock(object):
         exceeds `timeout` number of seconds, in which case it throws
         an exception.
         """
+        if fcntl is not None:
+            self._acquire_flock()
+            return
+
         start_time = time.time()
         while True:
             try:
@@ -79,14 +98,56 @@ class FileLock(object):
 
     #        self.is_locked = True
 
+    def _acquire_flock(self):
+        """Acquire the lock with `flock`. If the lock is in use, try again
+        until the timeout is exceeded, in which case an exception is thrown.
+        """
+        # A read-only descriptor is enough to lock the file, so a lock file
+        # created by another user can be used.
+        fd = os.open(self.lockfile, os.O_CREAT | os.O_RDONLY, 0o644)
+        try:
+            # Let other users lock the file whatever the umask. Only its
+            # owner can change its mode.
+            try:
+                os.fchmod(fd, 0o644)
+            except PermissionError:
+                pass
+            start_time = time.time()
+            delay = self.delay
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if self.timeout is None:
+                        raise FileLockException(
+                            "Could not acquire lock on {}".format(
+                                self.file_name
+                            )
+                        )
+                    remaining = self.timeout - (time.time() - start_time)
+                    if remaining <= 0:
+                        raise FileLockException("Timeout occured.")
+                    time.sleep(min(delay, remaining))
+                    delay = min(delay * 2, max(self.delay, 1.0))
+        except:
+            os.close(fd)
+            raise
+        self.fd = fd
+        self.is_locked = True
+
     def release(self):
-        """Get rid of the lock by deleting the lockfile.
-        When working in a `with` statement, this gets automatically
-        called at the end.
+        """Get rid of the lock by deleting the lockfile, or by unlocking it
+        with fcntl. When working in a `with` statement, this gets
+        automatically called at the end.
         """
         if self.is_locked:
-            os.close(self.fd)
-            os.unlink(self.lockfile)
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+                os.close(self.fd)
+            else:
+                os.close(self.fd)
+                os.unlink(self.lockfile)
             self.is_locked = False
 
     def __enter__(self):
@@ -28,23 +28,49 @@ import importlib
 import importlib.abc
 import importlib.util
 import os
+import sys
+import time
+import types
 
 class ByteCodeLoader(importlib.abc.Loader):
-    def __init__(self, code):
+    def __init__(self, code, timings=None):
         super().__init__()
         self.code = code
+        self.timings = timings
 
     def exec_module(self, module):
-        exec(self.code, module.__dict__)
+        start = time.perf_counter()
+        code = self.code
+        if not isinstance(code, types.CodeType):
+            # Embedded modules are only unmarshalled when imported.
+            code = code()
+        loaded = time.perf_counter()
+        exec(code, module.__dict__)
+        if self.timings is not None:
+            self.timings[module.__name__] = \
+                (loaded - start, time.perf_counter() - loaded)
 
 # Simple importer that allows python to import data from a dict of
 # code objects.  The keys are the module path, and the items are the
-# filename and bytecode of the file.
+# filename and bytecode of the file.  The bytecode can also be a
+# callable which returns the code object, which lets the code be
+# unmarshalled lazily.
+#
+# If the M5_IMPORT_TIMING environment variable is set, the time taken
+# to load and to execute each module is recorded and a report is
+# printed to stderr on exit.
 class CodeImporter(object):
     def __init__(self):
         self.modules = {}
         override_var = os.environ.get('M5_OVERRIDE_PY_SOURCE', 'false')
         self.override = (override_var.lower() in ('true', 'yes'))
+        timing_var = os.environ.get('M5_IMPORT_TIMING', 'false')
+        if timing_var.lower() in ('true', 'yes'):
+            import atexit
+            self.timings = {}
+            atexit.register(self.print_timings)
+        else:
+            self.timings = None
 
     def add_module(self, abspath, modpath, code):
         if modpath in self.modules:
@@ -64,22 +90,42 @@ class CodeImporter(object):
 
         is_package = (os.path.basename(abspath) == '__init__.py')
         spec = importlib.util.spec_from_loader(
-                name=fullname, loader=ByteCodeLoader(code),
+                name=fullname, loader=ByteCodeLoader(code, self.timings),
                 is_package=is_package)
 
         spec.loader_state = self.modules.keys()
 
         return spec
 
+    def print_timings(self, file=sys.stderr):
+        # Execution times include the time spent importing other
+        # modules, load times don't.
+        total_load = sum(load for load, _ in self.timings.values())
+        print("Embedded python import times (ms):", file=file)
+        print("%10s %10s  %s" % ("load", "exec", "module"), file=file)
+        for modpath, (load, run) in sorted(self.timings.items(),
+                key=lambda item: sum(item[1]), reverse=True):
+            print("%10.3f %10.3f  %s" % (load * 1e3, run * 1e3, modpath),
+                  file=file)
+        print("%d of %d modules imported, %.3f ms loading code" %
+              (len(self.timings), len(self.modules), total_load * 1e3),
+              file=file)
+
 # Create an importer and add it to the meta_path so future imports can
 # use it.  There's currently nothing in the importer, but calls to
 # add_module can be used to add code.
+#
+# Installing the importer again is a no-op, which lets build tools run
+# several scripts that each call install() in a single interpreter.
+_importer = None
 def install():
-    importer = CodeImporter()
-    global add_module
-    add_module = importer.add_module
+    global _importer, add_module
+    if _importer is not None:
+        return
+    _importer = CodeImporter()
+    add_module = _importer.add_module
     import sys
-    sys.meta_path.insert(0, importer)
+    sys.meta_path.insert(0, _importer)
 
     # Injected into this module's namespace by the c++ code that loads it.
     _init_all_embedded()
@@ -38,7 +38,9 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import json
 import sys
+import time
 from types import FunctionType, MethodType, ModuleType
 from functools import wraps
 import inspect
@@ -111,6 +113,19 @@ instanceDict = {}
 # Did any of the SimObjects lack a header file?
 noCxxHeader = False
 
+# Generation number of the configuration hierarchy.  It is bumped
+# whenever a parent/child link changes so that cached descendant
+# lists (see SimObject.descendants_list()) know when to rebuild.
+hierarchyGeneration = 0
+
+def hierarchyChanged():
+    global hierarchyGeneration
+    hierarchyGeneration += 1
+
+# Total time spent in the C++ SimObject constructors.  m5.instantiate()
+# uses it to tell param marshalling apart from object construction.
+ccCreateTime = 0.0
+
 def public_value(key, value):
     return key.startswith('_') or \
                isinstance(value, (FunctionType, MethodType, ModuleType,
@@ -335,6 +350,45 @@ class MetaSimObject(type):
         port.name = name
         cls._ports[name] = port
 
+    # The params and ports of a class are fixed once the class has been
+    # created, so their names only need to be sorted once per class.
+    # Look in the class' own __dict__ so that a subclass never picks up
+    # the names cached by its base.
+    def _sorted_param_names(cls):
+        names = cls.__dict__.get('_param_names')
+        if names is None:
+            names = sorted(cls._params.keys())
+            type.__setattr__(cls, '_param_names', names)
+        return names
+
+    def _sorted_port_names(cls):
+        names = cls.__dict__.get('_port_names')
+        if names is None:
+            names = sorted(cls._ports.keys())
+            type.__setattr__(cls, '_port_names', names)
+        return names
+
+    # Everything getCCParams() needs to know about a class to fill in a
+    # C++ param struct: the struct's type, the params in sorted order
+    # along with whether each is a vector, and the port connection
+    # count attributes.  It's built on first use and shared by all the
+    # instances of the class.
+    def _cc_params_plan(cls):
+        plan = cls.__dict__.get('_cc_plan')
+        if plan is None:
+            # Ensure that m5.internal.params is available.
+            import m5.internal.params
+
+            cc_params_struct = getattr(m5.internal.params,
+                                       '%sParams' % cls.type)
+            params = [ (name, isinstance(cls._params[name], VectorParamDesc))
+                       for name in cls._sorted_param_names() ]
+            ports = [ (name, 'port_' + name + '_connection_count')
+                      for name in cls._sorted_port_names() ]
+            plan = (cc_params_struct, params, ports)
+            type.__setattr__(cls, '_cc_plan', plan)
+        return plan
+
     # same as _get_port_ref, effectively, but for classes
     def _cls_get_port_ref(cls, attr):
         # Return reference that can be assigned to another port
@@ -688,6 +742,8 @@ class SimObject(object, metaclass=MetaSimObject):
         self._name = None
         self._ccObject = None  # pointer to C++ object
         self._ccParams = None
+        self._descendants = None # (hierarchyGeneration, [objects])
+        self._path = None # (hierarchyGeneration, path)
         self._instantiated = False # really "cloned"
         self._init_called = True # Checked so subclasses don't forget __init__
 
@@ -868,11 +924,13 @@ class SimObject(object, metaclass=MetaSimObject):
     def clear_parent(self, old_parent):
         assert self._parent is old_parent
         self._parent = None
+        hierarchyChanged()
 
     # Also implemented by SimObjectVector
     def set_parent(self, parent, name):
         self._parent = parent
         self._name = name
+        hierarchyChanged()
 
     # Return parent object of this SimObject, not implemented by
     # SimObjectVector because the elements in a SimObjectVector may not share
@@ -935,10 +993,19 @@ class SimObject(object, metaclass=MetaSimObject):
         elif isinstance(self._parent, MetaSimObject):
             return str(self.__class__)
 
+        # Paths only change when the hierarchy does, and they are
+        # needed over and over again when dumping the configuration
+        cached = self._path
+        if cached is not None and cached[0] == hierarchyGeneration:
+            return cached[1]
+
         ppath = self._parent.path()
         if ppath == 'root':
-            return self._name
-        return ppath + "." + self._name
+            path = self._name
+        else:
+            path = ppath + "." + self._name
+        self._path = (hierarchyGeneration, path)
+        return path
 
     def path_list(self):
         if self._parent:
@@ -1028,96 +1095,118 @@ class SimObject(object, metaclass=MetaSimObject):
 
         # Unproxy ports in sorted order so that 'append' operations on
         # vector ports are done in a deterministic fashion.
-        port_names = list(self._ports.keys())
-        port_names.sort()
-        for port_name in port_names:
+        for port_name in type(self)._sorted_port_names():
             port = self._port_refs.get(port_name)
             if port != None:
                 port.unproxy(self)
 
     def print_ini(self, ini_file):
-        print('[' + self.path() + ']', file=ini_file)    # .ini section header
+        path = self.path()
+        instanceDict[path] = self
 
-        instanceDict[self.path()] = self
+        # Build the whole section and write it out in one go
+        lines = [ '[' + path + ']' ]    # .ini section header
 
         if hasattr(self, 'type'):
-            print('type=%s' % self.type, file=ini_file)
+            lines.append('type=%s' % self.type)
 
         if len(self._children.keys()):
-            print('children=%s' %
+            lines.append('children=%s' %
                   ' '.join(self._children[n].get_name()
-                           for n in sorted(self._children.keys())),
-                  file=ini_file)
+                           for n in sorted(self._children.keys())))
 
-        for param in sorted(self._params.keys()):
+        for param in type(self)._sorted_param_names():
             value = self._values.get(param)
             if value != None:
-                print('%s=%s' % (param, self._values[param].ini_str()),
-                      file=ini_file)
+                lines.append('%s=%s' % (param, value.ini_str()))
 
-        for port_name in sorted(self._ports.keys()):
+        for port_name in type(self)._sorted_port_names():
             port = self._port_refs.get(port_name, None)
             if port != None:
-                print('%s=%s' % (port_name, port.ini_str()), file=ini_file)
+                lines.append('%s=%s' % (port_name, port.ini_str()))
 
-        print(file=ini_file)        # blank line between objects
+        lines.append('')        # blank line between objects
+        ini_file.write('\n'.join(lines) + '\n')
 
-    # generate a tree of dictionaries expressing all the parameters in the
-    # instantiated system for use by scripts that want to do power, thermal
-    # visualization, and other similar tasks
-    def get_config_as_dict(self):
-        d = attrdict()
+    # The entries of this object's config.json dictionary, in order.
+    # SimObject children are returned as the children themselves so
+    # that callers can decide how to expand them.
+    def _config_items(self):
+        items = {}
         if hasattr(self, 'type'):
-            d.type = self.type
+            items['type'] = self.type
         if hasattr(self, 'cxx_class'):
-            d.cxx_class = self.cxx_class
+            items['cxx_class'] = self.cxx_class
         # Add the name and path of this object to be able to link to
         # the stats
-        d.name = self.get_name()
-        d.path = self.path()
+        items['name'] = self.get_name()
+        items['path'] = self.path()
 
-        for param in sorted(self._params.keys()):
+        for param in type(self)._sorted_param_names():
             value = self._values.get(param)
             if value != None:
-                d[param] = value.config_value()
+                items[param] = value.config_value()
 
         for n in sorted(self._children.keys()):
-            child = self._children[n]
             # Use the name of the attribute (and not get_name()) as
             # the key in the JSON dictionary to capture the hierarchy
             # in the Python code that assembled this system
-            d[n] = child.get_config_as_dict()
+            items[n] = self._children[n]
 
-        for port_name in sorted(self._ports.keys()):
+        for port_name in type(self)._sorted_port_names():
             port = self._port_refs.get(port_name, None)
             if port != None:
                 # Represent each port with a dictionary containing the
                 # prominent attributes
-                d[port_name] = port.get_config_as_dict()
+                items[port_name] = port.get_config_as_dict()
+
+        return items
 
+    # generate a tree of dictionaries expressing all the parameters in the
+    # instantiated system for use by scripts that want to do power, thermal
+    # visualization, and other similar tasks
+    def get_config_as_dict(self):
+        d = attrdict()
+        for key, value in self._config_items().items():
+            if isSimObjectOrVector(value):
+                value = value.get_config_as_dict()
+            d[key] = value
         return d
 
+    # Write the same JSON that json.dump(self.get_config_as_dict(),
+    # json_file, indent=4) would, but one object at a time rather than
+    # building the dictionary for the whole tree first.
+    def write_config_json(self, json_file, indent=0):
+        items = self._config_items()
+        if not items:
+            json_file.write('{}')
+            return
+        inner = ' ' * (indent + 4)
+        json_file.write('{')
+        sep = '\n'
+        for key, value in items.items():
+            json_file.write(sep + inner + json.dumps(key) + ': ')
+            _write_config_json_value(value, json_file, indent + 4)
+            sep = ',\n'
+        json_file.write('\n' + ' ' * indent + '}')
+
     def getCCParams(self):
         if self._ccParams:
             return self._ccParams
 
-        # Ensure that m5.internal.params is available.
-        import m5.internal.params
-
-        cc_params_struct = getattr(m5.internal.params, '%sParams' % self.type)
+        cc_params_struct, params, ports = type(self)._cc_params_plan()
         cc_params = cc_params_struct()
         cc_params.name = str(self)
 
-        param_names = list(self._params.keys())
-        param_names.sort()
-        for param in param_names:
-            value = self._values.get(param)
+        values = self._values
+        for param, is_vector in params:
+            value = values.get(param)
             if value is None:
                 fatal("%s.%s without default or user set value",
                       self.path(), param)
 
             value = value.getValue()
-            if isinstance(self._params[param], VectorParamDesc):
+            if is_vector:
                 assert isinstance(value, list)
                 vec = getattr(cc_params, param)
                 assert not len(vec)
@@ -1128,20 +1217,18 @@ class SimObject(object, metaclass=MetaSimObject):
                     setattr(cc_params, param, list(value))
                 else:
                     for v in value:
-                        getattr(cc_params, param).append(v)
+                        vec.append(v)
             else:
                 setattr(cc_params, param, value)
 
-        port_names = list(self._ports.keys())
-        port_names.sort()
-        for port_name in port_names:
-            port = self._port_refs.get(port_name, None)
+        port_refs = self._port_refs
+        for port_name, count_attr in ports:
+            port = port_refs.get(port_name, None)
             if port != None:
                 port_count = len(port)
             else:
                 port_count = 0
-            setattr(cc_params, 'port_' + port_name + '_connection_count',
-                    port_count)
+            setattr(cc_params, count_attr, port_count)
         self._ccParams = cc_params
         return self._ccParams
 
@@ -1158,7 +1245,10 @@ class SimObject(object, metaclass=MetaSimObject):
             self._ccObject = -1
             if not self.abstract:
                 params = self.getCCParams()
+                global ccCreateTime
+                start = time.perf_counter()
                 self._ccObject = params.create()
+                ccCreateTime += time.perf_counter() - start
         elif self._ccObject == -1:
             raise RuntimeError("%s: Cycle found in configuration hierarchy." \
                   % self.path())
@@ -1173,6 +1263,34 @@ class SimObject(object, metaclass=MetaSimObject):
             for obj in child.descendants():
                 yield obj
 
+    # Return a flat list of this object and all of its descendants in
+    # the same order as descendants().  The list is cached and only
+    # rebuilt when the configuration hierarchy changes, so the many
+    # passes over the tree in m5.instantiate() only pay for a single
+    # walk.  Callers that add children while iterating (e.g.,
+    # adoptOrphanParams()) must use descendants() instead.
+    def descendants_list(self):
+        cached = self._descendants
+        if cached is not None and cached[0] == hierarchyGeneration:
+            return cached[1]
+
+        objs = []
+        stack = [ self ]
+        while stack:
+            obj = stack.pop()
+            objs.append(obj)
+            # Push children in reverse sorted order so that they are
+            # popped (and visited) in sorted order
+            for name, child in sorted(obj._children.items(), reverse=True):
+                if isSimObjectVector(child):
+                    stack.extend(v for v in reversed(child)
+                                 if not isNullPointer(v))
+                elif not isNullPointer(child):
+                    stack.append(child)
+
+        self._descendants = (hierarchyGeneration, objs)
+        return objs
+
     # Call C++ to create C++ object corresponding to this object
     def createCCObject(self):
         if self.abstract:
@@ -1243,6 +1361,26 @@ class SimObject(object, metaclass=MetaSimObject):
         d = self._apply_config_get_dict()
         return eval(simobj_path, d)
 
+def _write_config_json_value(value, json_file, indent):
+    if isSimObject(value):
+        value.write_config_json(json_file, indent)
+    elif isSimObjectVector(value) and len(value) == 0:
+        json_file.write('[]')
+    elif isSimObjectVector(value):
+        inner = ' ' * (indent + 4)
+        json_file.write('[')
+        sep = '\n'
+        for v in value:
+            json_file.write(sep + inner)
+            _write_config_json_value(v, json_file, indent + 4)
+            sep = ',\n'
+        json_file.write('\n' + ' ' * indent + ']')
+    elif isNullPointer(value):
+        json_file.write('{}')
+    else:
+        text = json.dumps(value, indent=4)
+        json_file.write(text.replace('\n', '\n' + ' ' * indent))
+
 # Function to provide to C++ so it can look up instances based on paths
 def resolveSimObject(name):
     obj = instanceDict[name]
@@ -30,7 +30,9 @@ from .simstat import SimStat
 from .statistic import Statistic
 from .storagetype import StorageType
 from .timeconversion import TimeConversion
-from .jsonloader import JsonLoader
+from .jsonloader import JsonLoader, JsonLinesLoader
+from .columnar import ColumnarStats
+from .textloader import TextLoader
 
 __all__ = [
            "Group",
@@ -40,4 +42,7 @@ __all__ = [
            "StorageType",
            "JsonSerializable",
            "JsonLoader",
+           "JsonLinesLoader",
+           "ColumnarStats",
+           "TextLoader",
           ]
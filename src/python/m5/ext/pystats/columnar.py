@@ -0,0 +1,189 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Reader for the columnar stats files written by the `columnar://` stat visitor
+(see `src/python/m5/stats/columnar.py`).
+
+A columnar stats file holds one column per stat and one row per stat dump. It
+starts with a fixed size preamble followed by a JSON header, which are written
+once, when the stats are first dumped:
+
+    magic       8 bytes, `COLUMNAR_MAGIC`
+    version     little-endian uint32, `COLUMNAR_VERSION`
+    length      little-endian uint32, the length of the JSON header in bytes
+    header      JSON object, padded with spaces to a multiple of 8 bytes
+
+The header lists the names (`columns`), units (`units`) and, optionally,
+descriptions (`descriptions`) of the columns and the simulated tick frequency
+(`tick_frequency`). It is followed by the rows, each of them the tick of the
+dump as a little-endian uint64 and the value of every column as a
+little-endian float64. Stats which were not part of a dump are NaN.
+
+Since the rows have a fixed size and are only ever appended, a file can be
+read while the simulation is still running, in which case a partially written
+last row is ignored.
+"""
+
+import json
+import struct
+from typing import Any, Dict, List, Optional
+
+COLUMNAR_MAGIC = b"gem5col\0"
+COLUMNAR_VERSION = 1
+
+# The magic, version and header length.
+COLUMNAR_PREAMBLE = struct.Struct("<8sII")
+
+
+def columnar_header_size(header_len: int) -> int:
+    """
+    The offset of the first row of a file whose JSON header is `header_len`
+    bytes long before padding.
+    """
+    return COLUMNAR_PREAMBLE.size + (header_len + 7) // 8 * 8
+
+
+class ColumnarStats:
+    """
+    The stats of a columnar stats file, loaded as NumPy arrays. The rows are
+    memory-mapped, so only the columns which are used are read from the file.
+
+    Usage
+    -----
+    ```
+    from m5.ext.pystats.columnar import ColumnarStats
+
+    stats = ColumnarStats("m5out/stats.col")
+    ipc = stats["system.cpu.ipc"]
+    misses = stats.select("system.cpu*.dcache.overallMisses::total")
+    ```
+    """
+
+    columns: List[str]
+    units: List[str]
+    descriptions: Optional[List[str]]
+    tick_frequency: Optional[int]
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+
+        path: str
+            The columnar stats file to load.
+
+        Raises
+        ------
+        ImportError
+            If NumPy isn't installed.
+
+        ValueError
+            If the file isn't a columnar stats file, or was written by an
+            incompatible version of gem5.
+        """
+
+        # NumPy isn't a dependency of gem5, so it is only needed once a
+        # columnar file is actually loaded.
+        import numpy as np
+
+        with open(path, "rb") as f:
+            preamble = f.read(COLUMNAR_PREAMBLE.size)
+            if len(preamble) < COLUMNAR_PREAMBLE.size:
+                raise ValueError(f"'{path}' is not a columnar stats file")
+            magic, version, header_len = COLUMNAR_PREAMBLE.unpack(preamble)
+            if magic != COLUMNAR_MAGIC:
+                raise ValueError(f"'{path}' is not a columnar stats file")
+            if version != COLUMNAR_VERSION:
+                raise ValueError(
+                    f"'{path}' has unsupported columnar version {version}"
+                )
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            f.seek(0, 2)
+            size = f.tell()
+
+        self.columns = header["columns"]
+        self.units = header["units"]
+        self.descriptions = header.get("descriptions")
+        self.tick_frequency = header.get("tick_frequency")
+        self._index = { name: i for i, name in enumerate(self.columns) }
+
+        self.dtype = np.dtype([
+            ("tick", "<u8"),
+            ("values", "<f8", (len(self.columns), )),
+        ])
+        offset = columnar_header_size(header_len)
+        rows = max(0, size - offset) // self.dtype.itemsize
+        if rows:
+            self._rows = np.memmap(path, dtype=self.dtype, mode="r",
+                                   offset=offset, shape=(rows, ))
+        else:
+            self._rows = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self) -> int:
+        """The number of stat dumps in the file."""
+        return len(self._rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __getitem__(self, name: str) -> Any:
+        """The values of the stat `name` in every dump, as a NumPy array."""
+        return self._rows["values"][:, self._index[name]]
+
+    @property
+    def ticks(self) -> Any:
+        """The tick of every dump, as a NumPy array."""
+        return self._rows["tick"]
+
+    @property
+    def seconds(self) -> Any:
+        """The simulated time of every dump in seconds, as a NumPy array."""
+        if not self.tick_frequency:
+            raise ValueError("The tick frequency of the stats is unknown")
+        return self.ticks / float(self.tick_frequency)
+
+    @property
+    def values(self) -> Any:
+        """
+        The values of all stats as a 2D NumPy array, with one row per dump
+        and one column per stat.
+        """
+        return self._rows["values"]
+
+    def unit(self, name: str) -> str:
+        """The unit of the stat `name`."""
+        return self.units[self._index[name]]
+
+    def select(self, pattern: str) -> Dict[str, Any]:
+        """
+        The values of every stat whose name matches the shell-style pattern
+        `pattern`, as a dictionary of NumPy arrays.
+        """
+        from fnmatch import fnmatchcase
+
+        return { name: self[name] for name in self.columns
+                 if fnmatchcase(name, pattern) }
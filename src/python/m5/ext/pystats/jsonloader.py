@@ -29,7 +29,7 @@ from .simstat import SimStat
 from .statistic import Scalar, Distribution, Accumulator, Statistic
 from .group import Group, Vector
 import json
-from typing import IO, Union
+from typing import IO, Iterator, List, Union
 
 class JsonLoader(json.JSONDecoder):
     """
@@ -47,7 +47,7 @@ class JsonLoader(json.JSONDecoder):
     """
 
     def __init__(self):
-        super().__init__(self, object_hook=self.__json_to_simstat)
+        super().__init__(object_hook=self.__json_to_simstat)
 
     def __json_to_simstat(self, d: dict) -> Union[SimStat,Statistic,Group]:
         if 'type' in d:
@@ -96,3 +96,75 @@ def load(json_file: IO) -> SimStat:
     simstat_object = json.load(json_file, cls=JsonLoader)
     return simstat_object
 
+
+class JsonLinesLoader:
+    """
+    Loads the stat dumps of a JSON lines stats file, as written by the
+    `jsonl://` stat visitor, one at a time. Opening the file only finds where
+    the dumps start, a dump is only parsed into a SimStat object when it is
+    accessed.
+
+    Usage
+    -----
+    ```
+    from m5.ext.pystats.jsonloader import JsonLinesLoader
+
+    dumps = JsonLinesLoader(path)
+    print(len(dumps))
+    last = dumps[-1]
+    for simstat_object in dumps:
+        ...
+    ```
+    """
+
+    path: str
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+
+        path: str
+            The JSON lines stats file to load.
+        """
+
+        self.path = path
+        self._offsets = self.__index()
+
+    def __index(self) -> List[int]:
+        # The offsets of the complete lines. A last line without a newline
+        # may still be being written.
+        offsets = []
+        with open(self.path, "rb") as f:
+            start = 0
+            offset = 0
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                pos = chunk.find(b"\n")
+                while pos != -1:
+                    if offset + pos > start:
+                        offsets.append(start)
+                    start = offset + pos + 1
+                    pos = chunk.find(b"\n", pos + 1)
+                offset += len(chunk)
+        return offsets
+
+    def __len__(self) -> int:
+        """The number of stat dumps in the file."""
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> SimStat:
+        """Loads the stat dump `index`."""
+        offset = self._offsets[index]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return self.__load(f.readline())
+
+    def __iter__(self) -> Iterator[SimStat]:
+        """Loads the stat dumps in order."""
+        with open(self.path, "rb") as f:
+            for offset in self._offsets:
+                f.seek(offset)
+                yield self.__load(f.readline())
+
+    def __load(self, line: bytes) -> SimStat:
+        return json.loads(line.decode("utf-8"), cls=JsonLoader)
@@ -0,0 +1,285 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Reader for the text stats files (`stats.txt`) written by the `text://` stat
+visitor.
+
+Opening a file only finds where its stat dumps begin and end, the stats are
+parsed when they are queried: a query matches a single regular expression
+against the dumps, so only the lines of the queried stats are looked at in
+Python.
+"""
+
+from array import array
+import gzip
+import math
+import mmap
+import re
+from typing import Dict, Iterator, List, Optional
+
+_BEGIN = b"---------- Begin Simulation Statistics ----------"
+_END = b"---------- End Simulation Statistics   ----------"
+
+# The name and value of a stat, ignoring the markers around the dumps.
+_STAT_RE = rb"^(%s)[ \t]+(\S+)"
+_ANY_NAME = rb"[^\s#-]\S*"
+
+
+def _glob_regex(pattern: str) -> bytes:
+    """Translates a shell-style pattern into a regex matching stat names."""
+    regex = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "*":
+            regex.append(r"\S*")
+        elif c == "?":
+            regex.append(r"\S")
+        elif c == "[":
+            # The same sets as fnmatch.
+            j = i
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                regex.append(r"\[")
+            else:
+                chars = pattern[i:j].replace("\\", "\\\\")
+                i = j + 1
+                if chars[0] == "!":
+                    chars = "^" + chars[1:]
+                elif chars[0] == "^":
+                    chars = "\\" + chars
+                regex.append("[%s]" % chars)
+        else:
+            regex.append(re.escape(c))
+    return "".join(regex).encode("utf-8")
+
+
+def _glob_literal(pattern: str) -> bytes:
+    """The longest part of a shell-style pattern without wildcards."""
+    parts = re.split(r"[*?]|\[[^]]*\]?", pattern)
+    return max(parts, key=len).encode("utf-8")
+
+
+def _to_float(value: bytes) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+class TextLoader:
+    """
+    The stat dumps of a text stats file. Gzipped files (`stats.txt.gz`) are
+    decompressed into memory, other files are memory-mapped.
+
+    Usage
+    -----
+    ```
+    from m5.ext.pystats.textloader import TextLoader
+
+    stats = TextLoader("m5out/stats.txt")
+    print(len(stats), "dumps")
+
+    # The values of a stat in every dump, as an array of floats.
+    ticks = stats.values("simTicks")
+
+    # The values of all matching stats in every dump.
+    for name, values in stats.query("system.cpu*.ipc").items():
+        print(name, list(values))
+    ```
+    """
+
+    path: str
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+
+        path: str
+            The text stats file to load.
+        """
+
+        self.path = path
+        self._file = None
+        if path.endswith(".gz"):
+            self._buf = self.__read_gzip(path)
+        else:
+            self._file = open(path, "rb")
+            try:
+                self._buf = mmap.mmap(self._file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped.
+                self._buf = b""
+        self._dumps = self.__index()
+        self._queries = {}
+
+    @staticmethod
+    def __read_gzip(path: str) -> bytes:
+        # Keep what could be read from a truncated file, e.g. of a
+        # simulation which is still running.
+        chunks = []
+        with gzip.open(path, "rb") as f:
+            try:
+                for chunk in iter(lambda: f.read(1 << 24), b""):
+                    chunks.append(chunk)
+            except (EOFError, OSError):
+                pass
+        return b"".join(chunks)
+
+    def __index(self) -> List[range]:
+        # A dump ends at its end marker or, if the marker is missing, at the
+        # start of the next dump.
+        buf = self._buf
+        dumps = []
+        begin = buf.find(_BEGIN)
+        while begin != -1:
+            start = begin + len(_BEGIN)
+            end = buf.find(_END, start)
+            following = buf.find(_BEGIN, start)
+            if end == -1 or following != -1 and following < end:
+                end = following if following != -1 else len(buf)
+            dumps.append(range(start, end))
+            begin = following
+        return dumps
+
+    def close(self) -> None:
+        if self._file is not None:
+            if isinstance(self._buf, mmap.mmap):
+                self._buf.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "TextLoader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """The number of stat dumps in the file."""
+        return len(self._dumps)
+
+    def dump(self, index: int) -> Dict[str, float]:
+        """All stats of the dump `index`, in the order they are in the file."""
+        dump = self._dumps[index]
+        regex = self.__regex(_ANY_NAME)
+        return { name.decode("utf-8") : _to_float(value) for name, value in
+                 regex.findall(self._buf, dump.start, dump.stop) }
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        """All stats of every dump, a dump at a time."""
+        for index in range(len(self)):
+            yield self.dump(index)
+
+    def names(self, index: int = 0) -> List[str]:
+        """The names of the stats in the dump `index`."""
+        return list(self.dump(index))
+
+    def query(self, pattern: str) -> Dict[str, array]:
+        """
+        The values of every stat whose name matches the shell-style pattern
+        `pattern`, in every dump.
+
+        Returns
+        -------
+        Dict[str, array]
+            A dictionary from the names of the matching stats, in the order
+            they are found in the file, to arrays of floats with one value
+            per dump. Stats which aren't in a dump are NaN in that dump.
+        """
+
+        return self.__query(_glob_regex(pattern), _glob_literal(pattern))
+
+    def values(self, name: str) -> array:
+        """
+        The values of the stat `name` in every dump, as an array of floats.
+        The stat is NaN in the dumps it isn't in.
+        """
+
+        values = self.__query(re.escape(name.encode("utf-8")),
+                              name.encode("utf-8"))
+        return values.get(name, array("d", [ math.nan ]) * len(self))
+
+    def __query(self, names: bytes, literal: bytes) -> Dict[str, array]:
+        regex = self.__regex(names)
+        count = len(self._dumps)
+        result = {}
+        for index, dump in enumerate(self._dumps):
+            if len(literal) >= 4:
+                matches = self.__find(regex, literal, dump)
+            else:
+                matches = regex.findall(self._buf, dump.start, dump.stop)
+            for name, value in matches:
+                values = result.get(name)
+                if values is None:
+                    values = array("d", [ math.nan ]) * count
+                    result[name] = values
+                values[index] = _to_float(value)
+        return { name.decode("utf-8") : values
+                 for name, values in result.items() }
+
+    def __find(self, regex: re.Pattern, literal: bytes,
+               dump: range) -> Iterator:
+        # Only match the regex against the lines containing a part of the
+        # names it matches, which are found a lot faster.
+        buf = self._buf
+        start, stop = dump.start, dump.stop
+        pos = buf.find(literal, start, stop)
+        while pos != -1:
+            line = max(buf.rfind(b"\n", start, pos) + 1, start)
+            match = regex.match(buf, line, stop)
+            if match:
+                yield match.groups()
+            eol = buf.find(b"\n", pos, stop)
+            if eol == -1:
+                break
+            pos = buf.find(literal, eol, stop)
+
+    def description(self, name: str) -> Optional[str]:
+        """The description of the stat `name`, if it is in the file."""
+        regex = re.compile(rb"^%s[ \t]+\S+[^#\n]*#[ \t]*([^\n]*)" %
+                           re.escape(name.encode("utf-8")), re.M)
+        for dump in self._dumps:
+            match = regex.search(self._buf, dump.start, dump.stop)
+            if match:
+                return match.group(1).rstrip().decode("utf-8")
+        return None
+
+    def __regex(self, name: bytes) -> re.Pattern:
+        regex = self._queries.get(name)
+        if regex is None:
+            regex = re.compile(_STAT_RE % name, re.M)
+            self._queries[name] = regex
+        return regex
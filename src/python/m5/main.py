@@ -118,6 +118,14 @@ def parse_options():
     group("Statistics Options")
     option("--stats-file", metavar="FILE", default="stats.txt",
         help="Sets the output file for statistics [Default: %default]")
+    option("--stats-include", metavar="PATTERN[,PATTERN]",
+        action="append", split=",",
+        help="Only output the statistics whose names match one of these "
+        "shell-style patterns (e.g., 'system.cpu*.ipc')")
+    option("--stats-exclude", metavar="PATTERN[,PATTERN]",
+        action="append", split=",",
+        help="Don't output the statistics whose names match one of these "
+        "shell-style patterns")
     option("--stats-help",
            action="callback", callback=_stats_help,
            help="Display documentation for available stat visitors")
@@ -128,6 +136,9 @@ def parse_options():
         help="Dump configuration output file [Default: %default]")
     option("--json-config", metavar="FILE", default="config.json",
         help="Create JSON output of the configuration [Default: %default]")
+    option("--json-config-background", action="store_true", default=False,
+        help="Write the JSON configuration from a background thread "
+             "once the C++ SimObjects have been created")
     option("--dot-config", metavar="FILE", default="config.dot",
         help="Create DOT & pdf outputs of the configuration [Default: %default]")
     option("--dot-dvfs-config", metavar="FILE", default=None,
@@ -136,6 +147,8 @@ def parse_options():
 
     # Debugging options
     group("Debugging Options")
+    option("--instantiate-timing", action="store_true", default=False,
+        help="Report how long each phase of m5.instantiate() takes")
     option("--debug-break", metavar="TICK[,TICK]", action='append', split=',',
         help="Create breakpoint(s) at TICK(s) " \
              "(kills process if no debugger attached)")
@@ -285,6 +298,10 @@ def main():
 
     if options.list_sim_objects:
         from . import SimObject
+        from . import objects
+        # m5.objects imports modules on demand, make sure every
+        # SimObject class has been registered
+        objects._load_all()
         done = True
         print("SimObjects:")
         objects = list(SimObject.allClasses.keys())
@@ -347,7 +364,9 @@ def main():
     sys.path[0:0] = options.path
 
     # set stats options
-    stats.addStatVisitor(options.stats_file)
+    stats.addStatVisitor(options.stats_file,
+                         include=options.stats_include,
+                         exclude=options.stats_exclude)
 
     # Disable listeners unless running interactively or explicitly
     # enabled
@@ -24,6 +24,114 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-for module in __spec__.loader_state:
-    if module.startswith('m5.objects.'):
-        exec("from %s import *" % module)
+# The m5.objects namespace holds every name exported by the SimObject
+# modules compiled into gem5.  Rather than importing all of those
+# modules up front, a module is imported the first time one of its
+# names is looked up, using an index of the names each module binds
+# which is generated at build time (see build_tools/objects_index.py).
+# Anything the index can't account for falls back to importing every
+# module, which is also what "from m5.objects import *" does.
+
+import importlib as _importlib
+import sys as _sys
+import types as _types
+
+try:
+    from m5 import objects_index as _index
+except ImportError:
+    _index = None
+
+_embedded = [ module for module in __spec__.loader_state
+              if module.startswith('m5.objects.') ]
+_embedded_set = set(_embedded)
+_all_loaded = False
+
+def _exported_names(module):
+    names = getattr(module, '__all__', None)
+    if names is None:
+        names = [ name for name in module.__dict__ \
+                  if not name.startswith('_') ]
+    return names
+
+def _load_all():
+    '''Import every m5.objects module into this namespace'''
+    global _all_loaded
+    if _all_loaded:
+        return
+    _all_loaded = True
+
+    namespace = globals()
+    for modpath in _embedded:
+        module = _importlib.import_module(modpath)
+        for name in _exported_names(module):
+            namespace[name] = getattr(module, name)
+
+def _find_in_modules(name, indices):
+    # Later modules take precedence, just like they would if each
+    # module was star imported in turn.
+    for i in reversed(indices):
+        modpath = _index.modules[i]
+        if modpath in _embedded_set:
+            module = _importlib.import_module(modpath)
+            if hasattr(module, name):
+                return True, getattr(module, name)
+    return False, None
+
+def _find(name):
+    found, value = _find_in_modules(name, _index.names.get(name, ()))
+    if found:
+        return value
+
+    for modpath in _index.star_modules:
+        module = _importlib.import_module(modpath)
+        if name in _exported_names(module):
+            return getattr(module, name)
+
+    found, value = _find_in_modules(name,
+            _index.imported_names.get(name, ()))
+    if found:
+        return value
+
+    # Not something the index knows about. It may have been created
+    # dynamically, so import everything and look again.
+    _load_all()
+    namespace = globals()
+    if name in namespace:
+        return namespace[name]
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+class _ObjectsModule(_types.ModuleType):
+    def __getattr__(self, name):
+        if name == '__all__':
+            _load_all()
+            return [ n for n in self.__dict__ if not n.startswith('_') ]
+        if name.startswith('_'):
+            raise AttributeError(
+                f"module '{__name__}' has no attribute '{name}'")
+
+        value = _find(name)
+        self.__dict__[name] = value
+        return value
+
+    def __setattr__(self, name, value):
+        # Importing m5.objects.Foo makes the import system set the Foo
+        # attribute of this package to the module.  Don't let that
+        # hide a name the index says should be something else (for
+        # example, the Foo SimObject defined in that module).
+        if isinstance(value, _types.ModuleType) and \
+                value.__name__ == f'{__name__}.{name}' and \
+                (name in _index.names or name in _index.imported_names):
+            return
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        names = set(self.__dict__)
+        names.update(_index.names, _index.imported_names)
+        return sorted(names)
+
+if _index is None:
+    # No index was built, so behave as if every module was star imported.
+    _load_all()
+else:
+    _sys.modules[__name__].__class__ = _ObjectsModule
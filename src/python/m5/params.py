@@ -173,7 +173,12 @@ class ParamDesc(object):
     def __getattr__(self, attr):
         if attr == 'ptype':
             from . import SimObject
-            ptype = SimObject.allClasses[self.ptype_str]
+            ptype = SimObject.allClasses.get(self.ptype_str)
+            if ptype is None:
+                # The class may live in an m5.objects module which
+                # hasn't been imported yet
+                from . import objects
+                ptype = getattr(objects, self.ptype_str)
             assert isSimObjectClass(ptype)
             self.ptype = ptype
             return ptype
@@ -40,6 +40,7 @@
 import atexit
 import os
 import sys
+import time
 
 # import the wrapped C++ functions
 import _m5.drain
@@ -64,6 +65,31 @@ _drain_manager = _m5.drain.DrainManager.instance()
 
 _instantiated = False # Has m5.instantiate() been called?
 
+# Records how long each phase of m5.instantiate() takes
+class _PhaseTimer(object):
+    def __init__(self):
+        self.phases = []
+        self.last = time.perf_counter()
+
+    # Record the time since the last mark.  Time already accounted for
+    # by the (name, time) pair in excluding is reported separately.
+    def mark(self, name, excluding=None):
+        now = time.perf_counter()
+        elapsed = now - self.last
+        if excluding:
+            elapsed -= excluding[1]
+        self.phases.append((name, elapsed))
+        if excluding:
+            self.phases.append(excluding)
+        self.last = now
+
+    def report(self, file=sys.stderr):
+        total = sum(t for _, t in self.phases)
+        print("m5.instantiate() timing (ms):", file=file)
+        for name, t in self.phases:
+            print("%12.3f  %s" % (t * 1e3, name), file=file)
+        print("%12.3f  total" % (total * 1e3), file=file)
+
 # The final call to instantiate the SimObject graph and initialize the
 # system.
 def instantiate(ckpt_dir=None):
@@ -74,6 +100,7 @@ def instantiate(ckpt_dir=None):
         fatal("m5.instantiate() called twice.")
 
     _instantiated = True
+    timer = _PhaseTimer()
 
     root = objects.Root.getInstance()
 
@@ -86,51 +113,78 @@ def instantiate(ckpt_dir=None):
     # Make sure SimObject-valued params are in the configuration
     # hierarchy so we catch them with future descendants() walks
     for obj in root.descendants(): obj.adoptOrphanParams()
+    timer.mark("adopt orphan params")
+
+    # All SimObject-valued params have been adopted at this point, so
+    # the hierarchy is fixed and the remaining passes can share a
+    # single flattened walk of the tree.
+    objs = root.descendants_list()
+    timer.mark("flatten hierarchy")
 
     # Unproxy in sorted order for determinism
-    for obj in root.descendants(): obj.unproxyParams()
+    for obj in objs: obj.unproxyParams()
+
+    # Unproxying can, in rare cases, attach new children.  This only
+    # rebuilds the list if the hierarchy actually changed.
+    objs = root.descendants_list()
+    timer.mark("unproxy params")
 
     if options.dump_config:
         ini_file = open(os.path.join(options.outdir, options.dump_config), 'w')
         # Print ini sections in sorted order for easier diffing
-        for obj in sorted(root.descendants(), key=lambda o: o.path()):
+        for obj in sorted(objs, key=lambda o: o.path()):
             obj.print_ini(ini_file)
         ini_file.close()
+        timer.mark("write config.ini")
 
+    json_path = None
     if options.json_config:
-        try:
-            import json
-            json_file = open(
-                os.path.join(options.outdir, options.json_config), 'w')
-            d = root.get_config_as_dict()
-            json.dump(d, json_file, indent=4)
-            json_file.close()
-        except ImportError:
-            pass
+        json_path = os.path.join(options.outdir, options.json_config)
+        if not options.json_config_background:
+            _dumpJsonConfig(root, json_path)
+            timer.mark("write config.json")
 
     if options.dot_config:
         do_dot(root, options.outdir, options.dot_config)
         do_ruby_dot(root, options.outdir, options.dot_config)
+        timer.mark("write config.dot")
 
     # Initialize the global statistics
     stats.initSimStats()
+    timer.mark("init stats")
+
+    # Create the C++ sim objects and connect ports.  Creating an object
+    # involves marshalling its params into a C++ param struct and then
+    # calling the C++ constructor, report those separately.
+    create_time = SimObject.ccCreateTime
+    for obj in objs: obj.createCCObject()
+    create_time = SimObject.ccCreateTime - create_time
+    timer.mark("marshal params",
+               excluding=("construct C++ objects", create_time))
+
+    for obj in objs: obj.connectPorts()
+    timer.mark("connect ports")
 
-    # Create the C++ sim objects and connect ports
-    for obj in root.descendants(): obj.createCCObject()
-    for obj in root.descendants(): obj.connectPorts()
+    # The Python side of the configuration doesn't change from here on,
+    # so the JSON dump can proceed alongside the rest of the set up.
+    if json_path and options.json_config_background:
+        _startJsonConfigThread(root, json_path)
 
     # Do a second pass to finish initializing the sim objects
-    for obj in root.descendants(): obj.init()
+    for obj in objs: obj.init()
+    timer.mark("init")
 
     # Do a third pass to initialize statistics
     stats._bindStatHierarchy(root)
     root.regStats()
+    timer.mark("register stats")
 
     # Do a fourth pass to initialize probe points
-    for obj in root.descendants(): obj.regProbePoints()
+    for obj in objs: obj.regProbePoints()
 
     # Do a fifth pass to connect probe listeners
-    for obj in root.descendants(): obj.regProbeListeners()
+    for obj in objs: obj.regProbeListeners()
+    timer.mark("register probes")
 
     # We want to generate the DVFS diagram for the system. This can only be
     # done once all of the CPP objects have been created and initialised so
@@ -145,14 +199,33 @@ def instantiate(ckpt_dir=None):
     if ckpt_dir:
         _drain_manager.preCheckpointRestore()
         ckpt = _m5.core.getCheckpoint(ckpt_dir)
-        for obj in root.descendants(): obj.loadState(ckpt)
+        for obj in objs: obj.loadState(ckpt)
     else:
-        for obj in root.descendants(): obj.initState()
+        for obj in objs: obj.initState()
+    timer.mark("load checkpoint" if ckpt_dir else "init state")
 
     # Check to see if any of the stat events are in the past after resuming from
     # a checkpoint, If so, this call will shift them to be at a valid time.
     updateStatEvents()
 
+    if options.instantiate_timing:
+        timer.report()
+
+def _dumpJsonConfig(root, path):
+    # Stream the configuration out rather than building a dictionary
+    # for the whole tree first.
+    with open(path, 'w', buffering=1 << 20) as json_file:
+        root.write_config_json(json_file)
+
+def _startJsonConfigThread(root, path):
+    import threading
+
+    thread = threading.Thread(target=_dumpJsonConfig, args=(root, path),
+                              name="json-config", daemon=True)
+    thread.start()
+    # Make sure the file is complete before gem5 exits
+    atexit.register(thread.join)
+
 need_startup = True
 def simulate(*args, **kwargs):
     global need_startup
@@ -163,7 +236,7 @@ def simulate(*args, **kwargs):
 
     if need_startup:
         root = objects.Root.getInstance()
-        for obj in root.descendants(): obj.startup()
+        for obj in root.descendants_list(): obj.startup()
         need_startup = False
 
         # Python exit handlers happen in reverse order.
@@ -225,11 +298,11 @@ def drain():
     assert _drain_manager.isDrained(), "Drain state inconsistent"
 
 def memWriteback(root):
-    for obj in root.descendants():
+    for obj in root.descendants_list():
         obj.memWriteback()
 
 def memInvalidate(root):
-    for obj in root.descendants():
+    for obj in root.descendants_list():
         obj.memInvalidate()
 
 def checkpoint(dir):
@@ -327,7 +400,7 @@ def switchCpus(system, cpuList, verbose=True):
         new_cpu.takeOverFrom(old_cpu)
 
 def notifyFork(root):
-    for obj in root.descendants():
+    for obj in root.descendants_list():
         obj.notifyFork()
 
 fork_count = 0
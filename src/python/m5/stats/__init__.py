@@ -42,7 +42,8 @@ import m5
 import _m5.stats
 from m5.objects import Root
 from m5.params import isNullPointer
-from .gem5stats import JsonOutputVistor
+from .gem5stats import JsonOutputVistor, JsonLinesOutputVisitor
+from .columnar import ColumnarOutput
 from m5.util import attrdict, fatal
 
 # Stat exports
@@ -51,6 +52,10 @@ from _m5.stats import periodicStatDump
 
 outputList = []
 
+# The stat filters of the outputs which only dump some stats, see
+# addStatVisitor().
+outputFilters = {}
+
 # Dictionary of stat visitor factories populated by the _url_factory
 # visitor.
 factories = { }
@@ -194,7 +199,47 @@ def _jsonFactory(fn):
 
     return JsonOutputVistor(fn)
 
-def addStatVisitor(url):
+@_url_factory(["jsonl"])
+def _jsonLinesFactory(fn):
+    """Output stats in JSON lines format.
+
+    Every stat dump is appended to the file as a line of JSON, in the
+    same format as the JSON output. Files can be loaded a dump at a time
+    using m5.ext.pystats.jsonloader.JsonLinesLoader.
+
+    Example:
+      jsonl://stats.jsonl
+
+    """
+
+    return JsonLinesOutputVisitor(fn)
+
+@_url_factory(["columnar"])
+def _columnarFactory(fn, desc=False):
+    """Output stats in a compact, append-only columnar format.
+
+    Columnar stat files have one column per stat and one row per stat
+    dump. The names and units of the stats are only written once, at the
+    start of the file, and every dump appends the values of all stats as
+    raw binary floats. Files can be loaded as NumPy arrays using
+    m5.ext.pystats.columnar.ColumnarStats.
+
+    Known limitations:
+      * 2D vectors and sparse histograms are unsupported.
+      * The columns are the stats of the first dump, later dumps of
+        subtrees leave the other columns empty (NaN).
+
+    Parameters:
+      * desc (bool): Output stat descriptions (default: False)
+
+    Example:
+      columnar://stats.col?desc=True
+
+    """
+
+    return ColumnarOutput(fn, desc)
+
+def addStatVisitor(url, include=None, exclude=None):
     """Add a stat visitor specified using a URL string
 
     Stat visitors are specified using URLs on the following format:
@@ -205,6 +250,15 @@ def addStatVisitor(url):
     parameters are keyword arguments. Parameter values must be valid
     Python literals.
 
+    The stats dumped to the visitor can be limited with lists of
+    shell-style patterns matched against the full names of the stats:
+    only the stats matching one of the include patterns (all stats, if
+    there are none) and none of the exclude patterns are dumped. For
+    example:
+
+        addStatVisitor("text://ipc.txt",
+                       include=["system.cpu*.ipc", "*.l2.overallMissRate"])
+
     """
 
     try:
@@ -223,7 +277,12 @@ def addStatVisitor(url):
     if factory is None:
         fatal("Stat type '%s' disabled at compile time" % parsed.scheme)
 
-    outputList.append(factory(parsed))
+    output = factory(parsed)
+    if include or exclude:
+        if isinstance(output, (JsonOutputVistor, JsonLinesOutputVisitor)):
+            fatal("Stat type '%s' can't be filtered" % parsed.scheme)
+        outputFilters[output] = StatFilter(include, exclude)
+    outputList.append(output)
 
 def printStatVisitorTypes():
     """List available stat visitors and their documentation"""
@@ -259,6 +318,59 @@ def _visit_stats(visitor, root=None):
             visitor(g, stat)
     _visit_groups(for_each_stat, root=root)
 
+class StatFilter(object):
+    """The stats selected by lists of include and exclude patterns.
+
+    Matching the patterns against the names of all stats is only done
+    once, the first time the stats are dumped, which leaves a flat list
+    of the selected stats and the groups they are in.
+    """
+
+    def __init__(self, include=None, exclude=None):
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self._selected = None
+
+    def match(self, name):
+        from fnmatch import fnmatchcase
+
+        if self.include and \
+                not any(fnmatchcase(name, pat) for pat in self.include):
+            return False
+        return not any(fnmatchcase(name, pat) for pat in self.exclude)
+
+    def selected(self):
+        """Return the selected stats as a list of (path, stats) pairs in
+        the order they are dumped in, where path is the tuple of names of
+        the groups the stats are in."""
+
+        if self._selected is not None:
+            return self._selected
+
+        self._selected = []
+        def add_group(path, group):
+            stats = [ stat for stat in group.getStats()
+                      if self.match(".".join(path + (stat.name, ))) ]
+            if stats:
+                self._selected.append((path, stats))
+            for name, child in group.getStatGroups().items():
+                add_group(path + (name, ), child)
+
+        root = Root.getInstance()
+        if root:
+            add_group((), root)
+
+        # Legacy stats have their full name
+        stats = [ stat for stat in stats_list if self.match(stat.name) ]
+        if stats:
+            self._selected.append(((), stats))
+
+        return self._selected
+
+# The stats dumped to the outputs without a filter which can't visit the
+# stats, see dump().
+_all_stats = StatFilter()
+
 def _bindStatHierarchy(root):
     def _bind_obj(name, obj):
         if isNullPointer(obj):
@@ -361,6 +473,31 @@ def _dump_to_visitor(visitor, roots=None):
         for stat in stats_list:
             stat.visit(visitor)
 
+def _dump_selected(visitor, selected, roots=None):
+    if roots:
+        # Only the stats from the selected subroots.
+        prefixes = [ tuple(root.path_list()) for root in roots ]
+        selected = [ (path, stats) for path, stats in selected
+                     if any(path[:len(p)] == p for p in prefixes) ]
+
+    current = ()
+    for path, stats in selected:
+        common = 0
+        while common < min(len(path), len(current)) and \
+                path[common] == current[common]:
+            common += 1
+        for name in current[common:]:
+            visitor.endGroup()
+        for name in path[common:]:
+            visitor.beginGroup(name)
+        current = path
+
+        for stat in stats:
+            stat.visit(visitor)
+
+    for name in current:
+        visitor.endGroup()
+
 lastDump = 0
 # List[SimObject].
 global_dump_roots = []
@@ -392,18 +529,36 @@ def dump(roots=None):
         sim_root = Root.getInstance()
         if sim_root:
             sim_root.preDumpStats();
-        prepare()
+        if outputList and all(output in outputFilters
+                              for output in outputList):
+            # Only the stats which are dumped need to be prepared.
+            prepared = set()
+            for output in outputList:
+                for path, stats in outputFilters[output].selected():
+                    for stat in stats:
+                        if stat.id not in prepared:
+                            prepared.add(stat.id)
+                            stat.prepare()
+        else:
+            prepare()
 
     for output in outputList:
-        if isinstance(output, JsonOutputVistor):
+        if isinstance(output, (JsonOutputVistor, JsonLinesOutputVisitor)):
             if not all_roots:
                 output.dump(Root.getInstance())
             else:
                 output.dump(all_roots)
+        elif isinstance(output, ColumnarOutput):
+            output.dump(outputFilters.get(output, _all_stats).selected(),
+                        roots=all_roots)
         else:
             if output.valid():
                 output.begin()
-                _dump_to_visitor(output, roots=all_roots)
+                if output in outputFilters:
+                    _dump_selected(output, outputFilters[output].selected(),
+                                   roots=all_roots)
+                else:
+                    _dump_to_visitor(output, roots=all_roots)
                 output.end()
 
 def reset():
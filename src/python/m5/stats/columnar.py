@@ -0,0 +1,215 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A stat visitor which appends the stats of every dump as a row of a columnar
+stats file. The file format is described in
+`src/python/m5/ext/pystats/columnar.py`, which also has a NumPy loader for it.
+"""
+
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import m5
+import _m5.core
+import _m5.stats
+from m5.ext.pystats.columnar import *
+
+_tick = struct.Struct("<Q")
+
+
+def _vector_columns(name: str, stat: _m5.stats.VectorInfo) -> List[str]:
+    from m5.stats import flags
+
+    # The same names as in the text output, which prints single element
+    # vectors as scalars.
+    if stat.size == 1:
+        return [ name ]
+    subnames = stat.subnames
+    columns = [ "%s::%s" % (name, subnames[i] if i < len(subnames) and
+                            subnames[i] else i)
+                for i in range(stat.size) ]
+    if stat.flags & flags.total:
+        columns.append("%s::total" % name)
+    return columns
+
+
+def _vector_values(stat: _m5.stats.VectorInfo) -> List[float]:
+    from m5.stats import flags
+
+    values = list(stat.result)
+    if len(values) > 1 and stat.flags & flags.total:
+        values.append(stat.total)
+    return values
+
+
+_dist_summary = ("min_value", "max_value", "sum", "squares",
+                 "underflows", "overflows")
+
+
+def _dist_values(stat: _m5.stats.DistInfo) -> List[float]:
+    return [ stat.min_val, stat.max_val, stat.sum, stat.squares,
+             stat.underflow, stat.overflow ] + list(stat.values)
+
+
+def _stat_columns(name: str, stat: _m5.stats.Info) \
+        -> Tuple[List[str], Optional[Callable]]:
+    """The columns of a stat and the function returning their values."""
+    if isinstance(stat, _m5.stats.ScalarInfo):
+        return [ name ], lambda s: [ s.result ]
+    elif isinstance(stat, _m5.stats.VectorInfo):
+        return _vector_columns(name, stat), _vector_values
+    elif isinstance(stat, _m5.stats.DistInfo):
+        columns = [ "%s::%s" % (name, s) for s in _dist_summary ]
+        columns += [ "%s::%d" % (name, i) for i in range(len(stat.values)) ]
+        return columns, _dist_values
+    else:
+        # 2D vectors, sparse histograms etc. aren't exposed to Python.
+        return [], None
+
+
+class ColumnarOutput:
+    """
+    Appends the stats of every dump to a columnar stats file, as a row of raw
+    float64 values. The columns are the stats selected when the stats are
+    first dumped, and their names, units and descriptions are only written
+    once, at the start of the file.
+
+    The file is reopened in append mode for every dump, so the rows are
+    on disk as soon as the dump is done.
+    """
+
+    file: str
+    desc: bool
+
+    def __init__(self, file: str, desc: bool = False):
+        """
+        Parameters
+        ----------
+
+        file: str
+            The output file location, relative to the output directory.
+
+        desc: bool
+            Whether to include the stat descriptions in the file header.
+        """
+
+        self.file = file
+        self.desc = desc
+        # List of (path, [(stat, values function, first column, count)]).
+        self._layout = None
+        self._width = 0
+        self._path = None
+
+    def _setup(self, selected: Sequence) -> None:
+        from m5 import options
+        from m5.stats import flags
+
+        self._path = os.path.join(options.outdir, self.file)
+
+        columns = []
+        units = []
+        descs = []
+        self._layout = []
+        for path, stats in selected:
+            prefix = "".join(p + "." for p in path)
+            entries = []
+            for stat in stats:
+                if not (stat.flags & flags.display):
+                    continue
+                names, values = _stat_columns(prefix + stat.name, stat)
+                if not names:
+                    continue
+                entries.append((stat, values, len(columns), len(names)))
+                columns += names
+                units += [ stat.unit ] * len(names)
+                descs += [ stat.desc ] * len(names)
+            if entries:
+                self._layout.append((path, entries))
+        self._width = len(columns)
+
+        header = {
+            "columns": columns,
+            "units": units,
+            "tick_frequency": _m5.core.getClockFrequency(),
+        }
+        if self.desc:
+            header["descriptions"] = descs
+        data = json.dumps(header).encode("utf-8")
+        padding = columnar_header_size(len(data)) - \
+            COLUMNAR_PREAMBLE.size - len(data)
+
+        with open(self._path, "wb") as f:
+            f.write(COLUMNAR_PREAMBLE.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION,
+                                           len(data)))
+            f.write(data + b" " * padding)
+
+    def dump(self, selected: Sequence, roots: Optional[List] = None) -> None:
+        """
+        Appends a row with the stats to the output file.
+
+        WARNING: This dump assumes the statistics have already been prepared.
+
+        Parameters
+        ----------
+
+        selected: Sequence
+            The stats which can be dumped to the file, as (path, stats)
+            pairs, see `m5.stats.StatFilter.selected()`. Only the stats of
+            the first dump become columns of the file.
+
+        roots: Optional[List[SimObject]]
+            The roots of the stats to dump, or all of them, if empty. The
+            other columns are NaN.
+        """
+
+        if self._layout is None:
+            self._setup(selected)
+
+        layout = self._layout
+        if roots:
+            prefixes = [ tuple(root.path_list()) for root in roots ]
+            layout = [ (path, entries) for path, entries in layout
+                       if any(path[:len(p)] == p for p in prefixes) ]
+
+        row = array("d", [ math.nan ]) * self._width
+        for path, entries in layout:
+            for stat, values, first, count in entries:
+                # A formula may have fewer values than when the file was
+                # created.
+                vals = values(stat)[:count]
+                row[first:first + len(vals)] = array("d", vals)
+        if sys.byteorder != "little":
+            row.byteswap()
+
+        with open(self._path, "ab") as f:
+            f.write(_tick.pack(m5.curTick()))
+            row.tofile(f)
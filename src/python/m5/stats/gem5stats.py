@@ -30,6 +30,8 @@ the Python Stats model.
 """
 
 from datetime import datetime
+import json
+import os
 from typing import IO, List, Union
 
 import _m5.stats
@@ -81,6 +83,146 @@ class JsonOutputVistor():
             simstat = get_simstat(root=roots, prepare_stats=False)
             simstat.dump(fp=fp, **self.json_args)
 
+class JsonLinesOutputVisitor():
+    """
+    A stat visitor which appends every stat dump to a JSON lines file, as a
+    single line holding the JSON of the SimStat object of the dump (see
+    `get_simstat`). Unlike `JsonOutputVistor`, the JSON is written while
+    walking the stats, without translating them into Python stats objects
+    first, and periodic dumps don't overwrite each other.
+
+    The dumps can be loaded one at a time with
+    `m5.ext.pystats.jsonloader.JsonLinesLoader`.
+    """
+    file: str
+
+    def __init__(self, file: str):
+        """
+        Parameters
+        ----------
+
+        file: str
+            The output file location, relative to the output directory. It is
+            truncated by the first dump.
+        """
+
+        self.file = file
+        self._path = None
+
+    def dump(self, roots: Union[List[SimObject], Root]) -> None:
+        """
+        Appends the stats of a simulation root (or list of roots) to the
+        output file.
+
+        WARNING: This dump assumes the statistics have already been prepared
+        for the target root.
+
+        Parameters
+        ----------
+
+        roots: Union[List[Root], Root]]
+            The Root, or List of roots, whose stats are are to be dumped.
+        """
+
+        if self._path is None:
+            from m5 import options
+            self._path = os.path.join(options.outdir, self.file)
+            mode = 'w'
+        else:
+            mode = 'a'
+
+        if not isinstance(roots, list):
+            roots = [ roots ]
+
+        root = Root.getInstance()
+        final_tick = root.resolveStat("finalTick").value
+        sim_ticks = root.resolveStat("simTicks").value
+        header = {
+            "creation_time" :
+                datetime.now().replace(microsecond=0).isoformat(),
+            "time_conversion" : None,
+            "simulated_begin_time" : int(final_tick - sim_ticks),
+            "simulated_end_time" : int(final_tick),
+        }
+
+        with open(self._path, mode) as fp:
+            # The same JSON as SimStat.to_json(), one group at a time.
+            fp.write(json.dumps(header, separators=(',', ':'))[:-1])
+            for r in roots:
+                if isinstance(r, Root):
+                    for key, group in r.getStatGroups().items():
+                        self.__write_entry(fp, key, group)
+                else:
+                    self.__write_entry(fp, r.get_name(), r)
+            fp.write('}\n')
+
+    def __write_entry(self, fp: IO[str], key: str,
+                      group: _m5.stats.Group) -> None:
+        fp.write(',%s:' % json.dumps(key))
+        self.__write_group(fp, group)
+
+    def __write_group(self, fp: IO[str], group: _m5.stats.Group) -> None:
+        fp.write('{"type":"Group","time_conversion":null')
+        for stat in group.getStats():
+            value = self.__stat_json(stat)
+            if value is not None:
+                fp.write(',%s:%s' % (json.dumps(stat.name),
+                                     json.dumps(value, separators=(',', ':'))))
+        for key, child in group.getStatGroups().items():
+            self.__write_entry(fp, key, child)
+        fp.write('}')
+
+    @staticmethod
+    def __stat_json(stat: _m5.stats.Info) -> Optional[Dict]:
+        # The JSON of the Statistic objects created by get_stats_group().
+        if isinstance(stat, _m5.stats.ScalarInfo):
+            return {
+                "value" : stat.value,
+                "type" : "Scalar",
+                "unit" : stat.unit,
+                "description" : stat.desc,
+                "datatype" : "f64",
+            }
+        elif isinstance(stat, _m5.stats.DistInfo):
+            return {
+                "value" : list(stat.values),
+                "type" : "Distribution",
+                "unit" : stat.unit,
+                "description" : stat.desc,
+                "datatype" : "f64",
+                "min" : stat.min_val,
+                "max" : stat.max_val,
+                "num_bins" : len(stat.values),
+                "bin_size" : stat.bucket_size,
+                "sum" : stat.sum,
+                "underflow" : stat.underflow,
+                "overflow" : stat.overflow,
+                "logs" : stat.logs,
+                "sum_squared" : stat.squares,
+            }
+        elif isinstance(stat, _m5.stats.FormulaInfo):
+            # Formulas aren't dumped, see __get_statistic().
+            return None
+        elif isinstance(stat, _m5.stats.VectorInfo):
+            vector = { "type" : "Vector", "time_conversion" : None }
+            unit = stat.unit
+            values = stat.value
+            subnames = stat.subnames
+            subdescs = stat.subdescs
+            for index in range(stat.size):
+                name = str(subnames[index]) if index < len(subnames) else ""
+                vector[name or str(index)] = {
+                    "value" : values[index],
+                    "type" : "Scalar",
+                    "unit" : unit,
+                    "description" : subdescs[index]
+                        if index < len(subdescs) else stat.desc,
+                    "datatype" : "f64",
+                }
+            return vector
+
+        return None
+
 def get_stats_group(group: _m5.stats.Group) -> Group:
     """
     Translates a gem5 Group object into a Python stats Group object. A Python
@@ -40,12 +40,14 @@
 '''
 Built in test cases that verify particular details about a gem5 run.
 '''
+import math
 import re
 import os
+import sys
 
 from testlib import test_util
 from testlib.configuration import constants
-from testlib.helper import joinpath, diff_out_file
+from testlib.helper import absdirpath, joinpath, diff_out_file
 
 class Verifier(object):
     def __init__(self, fixtures=tuple()):
@@ -168,11 +170,76 @@ class MatchStderr(DerivedGoldStandard):
     _file = constants.gem5_simulation_stderr
     _default_ignore_regex = []
 
-class MatchStats(DerivedGoldStandard):
-    # TODO: Likely will want to change this verifier since we have the weird
-    # perl script right now. A simple diff probably isn't going to work.
+class MatchStats(Verifier):
+    '''
+    Compares the stats of a standard stats file to the stats of the test
+    output and passes if every stat has the same value in every dump.
+    '''
     _file = constants.gem5_simulation_stats
-    _default_ignore_regex = []
+    _default_ignore = (
+            'host*',
+            )
+
+    def __init__(self, standard_filename, ignore=_default_ignore,
+                 rel_tol=0.0):
+        '''
+        :param standard_filename: The path of the standard stats file to
+        compare the stats to.
+
+        :param ignore: An iterable of shell-style patterns matching the names
+        of the stats which aren't compared, by default the host stats.
+
+        :param rel_tol: The relative tolerance of the comparison.
+        '''
+        super(MatchStats, self).__init__()
+        self.standard_filename = standard_filename
+        self.ignore = tuple(ignore)
+        self.rel_tol = rel_tol
+
+    def _load(self, filename):
+        stats_path = os.path.abspath(joinpath(absdirpath(__file__),
+            os.pardir, os.pardir, 'src', 'python'))
+        if stats_path not in sys.path:
+            sys.path.append(stats_path)
+        from m5.ext.pystats.textloader import TextLoader
+
+        return TextLoader(filename)
+
+    def _same(self, standard, test):
+        if math.isnan(standard) or math.isnan(test):
+            return math.isnan(standard) and math.isnan(test)
+        return math.isclose(standard, test, rel_tol=self.rel_tol)
+
+    def test(self, params):
+        from fnmatch import fnmatchcase
+
+        tempdir = params.fixtures[constants.tempdir_fixture_name].path
+        standard = self._load(self.standard_filename)
+        test = self._load(joinpath(tempdir, self._file))
+
+        if len(standard) != len(test):
+            test_util.fail('Expected %d stat dumps, found %d\nSee %s for '
+                           'full results' % (len(standard), len(test),
+                                             tempdir))
+
+        diff = []
+        for index, (expected, found) in enumerate(zip(standard, test)):
+            names = list(expected) + [ name for name in found
+                                       if name not in expected ]
+            for name in names:
+                if any(fnmatchcase(name, pat) for pat in self.ignore):
+                    continue
+                if name not in found:
+                    diff.append('dump %d: %s missing' % (index, name))
+                elif name not in expected:
+                    diff.append('dump %d: %s unexpected' % (index, name))
+                elif not self._same(expected[name], found[name]):
+                    diff.append('dump %d: %s expected %s, found %s' %
+                                (index, name, expected[name], found[name]))
+
+        if diff:
+            test_util.fail('Stats did not match:\n%s\nSee %s for full '
+                           'results' % ('\n'.join(diff), tempdir))
 
 class MatchConfigINI(DerivedGoldStandard):
     _file = constants.gem5_simulation_config_ini
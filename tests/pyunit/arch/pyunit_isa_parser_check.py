@@ -0,0 +1,116 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+_root = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                     os.pardir)
+for _path in ('src/arch', 'build_tools', 'ext/ply'):
+    _path = os.path.abspath(os.path.join(_root, _path))
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+from isa_parser.isa_parser import ISAParser
+
+def _split_file(sizes):
+    '''Return a file whose split regions have the given sizes.'''
+    regions = ['x' * size for size in sizes]
+    text = ''
+    for i, region in enumerate(regions):
+        if i:
+            text += '\n#endif\n#if __SPLIT == %u\n' % (i + 1)
+        text += region
+    return io.StringIO(text)
+
+class PartitionTestSuite(unittest.TestCase):
+    """Test cases for ISAParser.partition()"""
+
+    def test_even(self):
+        self.assertEqual(ISAParser.partition([1] * 10, 2), [5, 5])
+        self.assertEqual(ISAParser.partition([1] * 9, 3), [3, 3, 3])
+
+    def test_uneven(self):
+        # The two large regions should each get a chunk of their own.
+        self.assertEqual(ISAParser.partition([10, 1, 1, 1, 1, 10], 3),
+                         [1, 4, 1])
+        self.assertEqual(ISAParser.partition([1, 1, 1, 1, 20], 2), [4, 1])
+
+    def test_largest_chunk_minimized(self):
+        sizes = [7, 2, 5, 10, 8, 1, 3]
+        counts = ISAParser.partition(sizes, 3)
+        self.assertEqual(sum(counts), len(sizes))
+        chunks = []
+        for count in counts:
+            chunks.append(sum(sizes[:count]))
+            sizes = sizes[count:]
+        self.assertEqual(max(chunks), 14)
+
+    def test_more_chunks_than_regions(self):
+        self.assertEqual(ISAParser.partition([5, 5], 8), [1, 1])
+
+    def test_one_chunk(self):
+        self.assertEqual(ISAParser.partition([3, 1, 4], 1), [3])
+        self.assertEqual(ISAParser.partition([3, 1, 4], 0), [3])
+
+class BalanceSplitsTestSuite(unittest.TestCase):
+    """Test cases for ISAParser.balance_splits()"""
+
+    def setUp(self):
+        self.outdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.outdir.cleanup)
+        self.parser = ISAParser(self.outdir.name)
+
+    def regions(self, f):
+        return ISAParser.splitRE.split(f.getvalue())
+
+    def test_merge(self):
+        f = _split_file([100, 10, 10, 10, 10, 100])
+        self.parser.balance_splits(f, 3)
+        self.assertEqual(self.parser.splits[f], 3)
+        self.assertEqual([len(r) for r in self.regions(f)], [100, 43, 100])
+        self.assertEqual(f.getvalue().count('#if __SPLIT == 2\n'), 1)
+        self.assertEqual(f.getvalue().count('#if __SPLIT == 3\n'), 1)
+
+    def test_no_code_lost(self):
+        f = _split_file([3, 1, 4, 1, 5, 9, 2, 6])
+        self.parser.balance_splits(f, 4)
+        self.assertEqual(sum(len(r) for r in self.regions(f)), 31 + 4)
+
+    def test_fewer_regions_than_chunks(self):
+        f = _split_file([10, 20])
+        self.parser.balance_splits(f, 8)
+        self.assertEqual(self.parser.splits[f], 2)
+        self.assertEqual([len(r) for r in self.regions(f)], [10, 20])
+
+    def test_single_chunk(self):
+        f = _split_file([10, 20, 30])
+        self.parser.balance_splits(f, 1)
+        self.assertEqual(self.parser.splits[f], 1)
+        self.assertEqual(self.regions(f), [f.getvalue()])
@@ -0,0 +1,121 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import math
+import os
+import struct
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    # NumPy is only needed to load columnar stats files.
+    numpy = None
+
+from m5.ext.pystats.columnar import (
+    COLUMNAR_MAGIC,
+    COLUMNAR_PREAMBLE,
+    COLUMNAR_VERSION,
+    ColumnarStats,
+    columnar_header_size,
+)
+
+_COLUMNS = ["simSeconds", "system.cpu0.ipc", "system.cpu1.ipc"]
+_UNITS = ["Second", "(Count/Cycle)", "(Count/Cycle)"]
+_ROWS = [
+    (1000, [1e-9, 0.5, 0.25]),
+    (2000, [2e-9, 0.75, math.nan]),
+    (3000, [3e-9, 1.0, 0.5]),
+]
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class ColumnarStatsTestSuite(unittest.TestCase):
+    """Test cases for m5.ext.pystats.columnar.ColumnarStats"""
+
+    def setUp(self) -> None:
+        # Write a file as the `columnar://` stat visitor does.
+        header = json.dumps({
+            "columns": _COLUMNS,
+            "units": _UNITS,
+            "tick_frequency": 10 ** 12,
+        }).encode("utf-8")
+        padding = columnar_header_size(len(header)) - \
+            COLUMNAR_PREAMBLE.size - len(header)
+        row = struct.Struct("<Q%dd" % len(_COLUMNS))
+
+        file = tempfile.NamedTemporaryFile(suffix=".col", delete=False)
+        file.write(COLUMNAR_PREAMBLE.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION,
+                                          len(header)))
+        file.write(header + b" " * padding)
+        for tick, values in _ROWS:
+            file.write(row.pack(tick, *values))
+        file.close()
+        self.path = file.name
+        self.row = row
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def test_columns(self) -> None:
+        stats = ColumnarStats(self.path)
+        self.assertEqual(_COLUMNS, stats.columns)
+        self.assertEqual("(Count/Cycle)", stats.unit("system.cpu1.ipc"))
+        self.assertIsNone(stats.descriptions)
+        self.assertIn("system.cpu0.ipc", stats)
+        self.assertNotIn("system.cpu2.ipc", stats)
+
+    def test_dumps(self) -> None:
+        stats = ColumnarStats(self.path)
+        self.assertEqual(3, len(stats))
+        self.assertEqual([1000, 2000, 3000], stats.ticks.tolist())
+        self.assertEqual([1e-9, 2e-9, 3e-9], stats.seconds.tolist())
+        self.assertEqual([0.5, 0.75, 1.0], stats["system.cpu0.ipc"].tolist())
+        self.assertEqual(0.25, stats["system.cpu1.ipc"][0])
+        self.assertTrue(math.isnan(stats["system.cpu1.ipc"][1]))
+        self.assertEqual([3e-9, 1.0, 0.5], stats.values[2].tolist())
+
+    def test_select(self) -> None:
+        stats = ColumnarStats(self.path)
+        selected = stats.select("system.cpu*.ipc")
+        self.assertEqual(["system.cpu0.ipc", "system.cpu1.ipc"],
+                         sorted(selected))
+        self.assertEqual([0.5, 0.75, 1.0],
+                         selected["system.cpu0.ipc"].tolist())
+
+    def test_partial_row(self) -> None:
+        # A row which is still being written is ignored.
+        with open(self.path, "ab") as f:
+            f.write(self.row.pack(4000, 4e-9, 1.0, 1.0)[:12])
+        self.assertEqual(3, len(ColumnarStats(self.path)))
+
+    def test_not_columnar(self) -> None:
+        with open(self.path, "wb") as f:
+            f.write(b"---------- Begin Simulation Statistics ----------\n")
+        with self.assertRaises(ValueError):
+            ColumnarStats(self.path)
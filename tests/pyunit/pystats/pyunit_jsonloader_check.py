@@ -0,0 +1,98 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from m5.ext.pystats.group import Group
+from m5.ext.pystats.jsonloader import JsonLinesLoader, JsonLoader, load
+from m5.ext.pystats.simstat import SimStat
+from m5.ext.pystats.statistic import Scalar
+
+
+def _simstat_json(tick: int, ipc: float) -> str:
+    simstat = SimStat(
+        simulated_end_time=tick,
+        system=Group(ipc=Scalar(ipc, unit="Count", description="IPC")),
+    )
+    return json.dumps(simstat.to_json())
+
+
+class JsonLinesLoaderTestSuite(unittest.TestCase):
+    """Test cases for m5.ext.pystats.jsonloader"""
+
+    def setUp(self) -> None:
+        file = tempfile.NamedTemporaryFile(mode="w", suffix=".jsonl",
+                                           delete=False)
+        for tick, ipc in ((1000, 0.5), (2000, 0.75), (3000, 1.0)):
+            file.write(_simstat_json(tick, ipc) + "\n")
+            if tick == 1000:
+                file.write("\n")
+        file.close()
+        self.path = file.name
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def test_dumps(self) -> None:
+        dumps = JsonLinesLoader(self.path)
+        self.assertEqual(3, len(dumps))
+        self.assertEqual(2000, dumps[1].simulated_end_time)
+        self.assertEqual(0.75, dumps[1].system.ipc.value)
+        self.assertEqual("IPC", dumps[1].system.ipc.description)
+        self.assertEqual(
+            [0.5, 0.75, 1.0], [dump.system.ipc.value for dump in dumps]
+        )
+
+    def test_negative_index(self) -> None:
+        dumps = JsonLinesLoader(self.path)
+        self.assertEqual(3000, dumps[-1].simulated_end_time)
+        self.assertEqual(1000, dumps[-3].simulated_end_time)
+        with self.assertRaises(IndexError):
+            dumps[-4]
+
+    def test_partial_last_line(self) -> None:
+        # A dump which is still being written is ignored.
+        line = _simstat_json(4000, 1.25)
+        with open(self.path, "a") as f:
+            f.write(line[:len(line) // 2])
+        dumps = JsonLinesLoader(self.path)
+        self.assertEqual(3, len(dumps))
+        self.assertEqual(3000, dumps[-1].simulated_end_time)
+        self.assertEqual(3, len(list(dumps)))
+
+    def test_json_loader(self) -> None:
+        decoder = JsonLoader()
+        simstat = decoder.decode(_simstat_json(1000, 0.5))
+        self.assertIsInstance(simstat, SimStat)
+        self.assertIsInstance(simstat.system.ipc, Scalar)
+        self.assertEqual(0.5, simstat.system.ipc.value)
+
+        simstat = load(io.StringIO(_simstat_json(2000, 0.75)))
+        self.assertEqual(2000, simstat.simulated_end_time)
@@ -0,0 +1,129 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import gzip
+import math
+import os
+import tempfile
+import unittest
+
+from m5.ext.pystats.textloader import TextLoader
+
+_STATS = """
+---------- Begin Simulation Statistics ----------
+simSeconds                                   0.000057                       # Number of seconds simulated (Second)
+finalTick                                       57000                       # Number of ticks from beginning of simulation (Tick)
+system.cpu.ipc                               0.500000                       # IPC: instructions per cycle ((Count/Cycle))
+system.cpu.op_class::No_OpClass                     3     50.00%     50.00% # Class of executed instruction (Count)
+system.cpu.op_class::IntAlu                         3     50.00%    100.00% # Class of executed instruction (Count)
+system.mem_ctrl.busUtil                         12.34                       # Data bus utilization in percentage (Ratio)
+system.mem_ctrl.busUtilRead                      1.00                       # Data bus utilization in percentage for reads (Ratio)
+
+---------- End Simulation Statistics   ----------
+
+---------- Begin Simulation Statistics ----------
+simSeconds                                   0.000100                       # Number of seconds simulated (Second)
+finalTick                                      100000                       # Number of ticks from beginning of simulation (Tick)
+system.mem_ctrl.busUtil                           nan                       # Data bus utilization in percentage (Ratio)
+
+---------- End Simulation Statistics   ----------
+"""
+
+
+class TextLoaderTestSuite(unittest.TestCase):
+    """Test cases for m5.ext.pystats.textloader.TextLoader"""
+
+    def setUp(self) -> None:
+        file = tempfile.NamedTemporaryFile(mode="w", suffix=".txt",
+                                           delete=False)
+        file.write(_STATS)
+        file.close()
+        self.path = file.name
+        self.stats = TextLoader(self.path)
+
+    def tearDown(self) -> None:
+        self.stats.close()
+        os.remove(self.path)
+
+    def test_dumps(self) -> None:
+        self.assertEqual(2, len(self.stats))
+        self.assertEqual(
+            {
+                "simSeconds": 0.0001,
+                "finalTick": 100000.0,
+                "system.mem_ctrl.busUtil": math.nan,
+            }.keys(),
+            self.stats.dump(1).keys(),
+        )
+        self.assertEqual(
+            3.0, self.stats.dump(0)["system.cpu.op_class::IntAlu"]
+        )
+
+    def test_values(self) -> None:
+        self.assertEqual([57000.0, 100000.0],
+                         list(self.stats.values("finalTick")))
+
+        ipc = self.stats.values("system.cpu.ipc")
+        self.assertEqual(0.5, ipc[0])
+        self.assertTrue(math.isnan(ipc[1]))
+
+        self.assertTrue(all(math.isnan(v) for v in self.stats.values("ipc")))
+
+    def test_query(self) -> None:
+        busUtil = self.stats.query("*busUtil")
+        self.assertEqual(["system.mem_ctrl.busUtil"], list(busUtil))
+        self.assertEqual(12.34, busUtil["system.mem_ctrl.busUtil"][0])
+        self.assertTrue(math.isnan(busUtil["system.mem_ctrl.busUtil"][1]))
+
+        self.assertEqual(
+            ["system.cpu.op_class::No_OpClass", "system.cpu.op_class::IntAlu"],
+            list(self.stats.query("system.cpu.op_class::*")),
+        )
+        self.assertEqual(
+            ["system.mem_ctrl.busUtil", "system.mem_ctrl.busUtilRead"],
+            list(self.stats.query("system.mem_ctrl.busUtil*")),
+        )
+        self.assertEqual(
+            ["system.cpu.ipc"], list(self.stats.query("system.?pu.[!x]pc"))
+        )
+
+    def test_description(self) -> None:
+        self.assertEqual(
+            "IPC: instructions per cycle ((Count/Cycle))",
+            self.stats.description("system.cpu.ipc"),
+        )
+        self.assertIsNone(self.stats.description("ipc"))
+
+    def test_gzip(self) -> None:
+        path = self.path + ".gz"
+        with gzip.open(path, "wt") as f:
+            f.write(_STATS)
+        try:
+            with TextLoader(path) as stats:
+                self.assertEqual(2, len(stats))
+                self.assertEqual(self.stats.dump(0), stats.dump(0))
+        finally:
+            os.remove(path)
@@ -0,0 +1,75 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import json
+import unittest
+
+from m5.params import *
+from m5.SimObject import SimObject, SimObjectVector, _write_config_json_value
+
+class ConfigJsonLeaf(SimObject):
+    type = 'ConfigJsonLeaf'
+    cxx_header = 'sim/sim_object.hh'
+    cxx_class = 'gem5::ConfigJsonLeaf'
+
+    size = Param.Int(3, "A size")
+
+class ConfigJsonNode(SimObject):
+    type = 'ConfigJsonNode'
+    cxx_header = 'sim/sim_object.hh'
+    cxx_class = 'gem5::ConfigJsonNode'
+
+    leaves = VectorParam.ConfigJsonLeaf([], "Some leaves")
+    others = VectorParam.ConfigJsonLeaf([], "No leaves")
+
+class ConfigJsonTestSuite(unittest.TestCase):
+    """Test cases for SimObject.write_config_json()"""
+
+    def check_json(self, root):
+        for obj in root.descendants():
+            obj.unproxyParams()
+        json_file = io.StringIO()
+        root.write_config_json(json_file)
+        self.assertEqual(
+            json.dumps(root.get_config_as_dict(), indent=4),
+            json_file.getvalue())
+
+    def test_tree(self):
+        root = ConfigJsonNode(eventq_index=0)
+        root.leaves = [ConfigJsonLeaf(), ConfigJsonLeaf(size=4)]
+        root.child = ConfigJsonNode()
+        root.child.leaves = [ConfigJsonLeaf()]
+        self.check_json(root)
+
+    def test_empty_vector(self):
+        root = ConfigJsonNode(eventq_index=0)
+        root.child = ConfigJsonNode()
+        self.check_json(root)
+
+        json_file = io.StringIO()
+        _write_config_json_value(SimObjectVector([]), json_file, 4)
+        self.assertEqual(json.dumps([], indent=4), json_file.getvalue())
@@ -0,0 +1,195 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import math
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import m5
+
+if m5.in_gem5:
+    from m5.stats import columnar, flags
+    from m5.ext.pystats.columnar import (
+        COLUMNAR_PREAMBLE,
+        columnar_header_size,
+    )
+
+# Stand-ins for the stat info objects of _m5.stats, which can't be created
+# from Python.
+class Info:
+    def __init__(self, name, flags, **kwargs):
+        self.name = name
+        self.flags = flags
+        self.unit = "Count"
+        self.desc = "The %s stat" % name
+        self.__dict__.update(kwargs)
+
+class ScalarInfo(Info):
+    pass
+
+class VectorInfo(Info):
+    pass
+
+class DistInfo(Info):
+    pass
+
+class FormulaInfo(Info):
+    pass
+
+class StatRoot:
+    def __init__(self, path):
+        self.path = path
+
+    def path_list(self):
+        return list(self.path)
+
+@unittest.skipUnless(m5.in_gem5, "The stat visitors need the gem5 binary")
+class ColumnarOutputTestSuite(unittest.TestCase):
+    """Test cases for m5.stats.columnar.ColumnarOutput"""
+
+    def setUp(self) -> None:
+        outdir = tempfile.TemporaryDirectory()
+        self.addCleanup(outdir.cleanup)
+        self.path = os.path.join(outdir.name, "stats.col")
+        self.tick = 0
+
+        fake_m5 = SimpleNamespace(
+            stats=SimpleNamespace(Info=Info, ScalarInfo=ScalarInfo,
+                                  VectorInfo=VectorInfo, DistInfo=DistInfo),
+            core=SimpleNamespace(getClockFrequency=lambda: 10 ** 12))
+        for patch in (
+                mock.patch.object(columnar, "_m5", fake_m5),
+                mock.patch.object(m5, "curTick", lambda: self.tick),
+                mock.patch.object(m5, "options",
+                                  SimpleNamespace(outdir=outdir.name))):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        shown = flags.display
+        self.ipc = ScalarInfo("ipc", shown, result=1.5)
+        self.misses = VectorInfo("misses", shown | flags.total, size=3,
+            subnames=["read", "", "write"], result=[1, 2, 3], total=6)
+        self.single = VectorInfo("single", shown | flags.total, size=1,
+            subnames=[], result=[7], total=7)
+        self.hidden = ScalarInfo("hidden", flags.none, result=3)
+        self.formula = FormulaInfo("formula", shown, result=[1])
+        self.latency = DistInfo("latency", shown, min_val=1, max_val=9,
+            sum=20, squares=100, underflow=0, overflow=1, values=[4, 5])
+        self.selected = [
+            (("system", "cpu"),
+             [self.ipc, self.misses, self.single, self.hidden,
+              self.formula]),
+            (("system", "mem"), [self.latency]),
+        ]
+
+    def read(self, order="<"):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        _, _, length = COLUMNAR_PREAMBLE.unpack_from(data)
+        header = json.loads(
+            data[COLUMNAR_PREAMBLE.size:COLUMNAR_PREAMBLE.size + length])
+        offset = columnar_header_size(length)
+        tick = struct.Struct("<Q")
+        values = struct.Struct("%s%dd" % (order, len(header["columns"])))
+        size = tick.size + values.size
+        self.assertEqual((len(data) - offset) % size, 0)
+        rows = [ tick.unpack_from(data, offset) +
+                 values.unpack_from(data, offset + tick.size)
+                 for offset in range(offset, len(data), size) ]
+        return header, rows
+
+    def test_columns(self):
+        columnar.ColumnarOutput("stats.col", desc=True).dump(self.selected)
+        header, rows = self.read()
+        self.assertEqual(header["columns"], [
+            "system.cpu.ipc",
+            "system.cpu.misses::read",
+            "system.cpu.misses::1",
+            "system.cpu.misses::write",
+            "system.cpu.misses::total",
+            "system.cpu.single",
+            "system.mem.latency::min_value",
+            "system.mem.latency::max_value",
+            "system.mem.latency::sum",
+            "system.mem.latency::squares",
+            "system.mem.latency::underflows",
+            "system.mem.latency::overflows",
+            "system.mem.latency::0",
+            "system.mem.latency::1",
+        ])
+        self.assertEqual(header["units"], ["Count"] * 14)
+        self.assertEqual(header["descriptions"][0], "The ipc stat")
+        self.assertEqual(header["tick_frequency"], 10 ** 12)
+        self.assertEqual(rows, [
+            (0, 1.5, 1, 2, 3, 6, 7, 1, 9, 20, 100, 0, 1, 4, 5)])
+
+    def test_rows(self):
+        output = columnar.ColumnarOutput("stats.col")
+        output.dump(self.selected)
+        self.tick = 1000
+        self.ipc.result = 2.5
+        output.dump(self.selected)
+        header, rows = self.read()
+        self.assertNotIn("descriptions", header)
+        self.assertEqual([ row[:2] for row in rows ],
+                         [(0, 1.5), (1000, 2.5)])
+
+    def test_roots(self):
+        output = columnar.ColumnarOutput("stats.col")
+        output.dump(self.selected, roots=[StatRoot(["system", "mem"])])
+        _, rows = self.read()
+        self.assertEqual(rows[0][7:], (1, 9, 20, 100, 0, 1, 4, 5))
+        self.assertTrue(all(math.isnan(value) for value in rows[0][1:7]))
+
+    def test_fewer_values(self):
+        output = columnar.ColumnarOutput("stats.col")
+        output.dump(self.selected)
+        # Values beyond the columns of the stat are dropped, and missing
+        # ones are NaN.
+        self.latency.values = [4, 5, 6]
+        self.misses.size = 2
+        self.misses.result = [1, 2]
+        self.misses.total = 3
+        output.dump(self.selected)
+        _, rows = self.read()
+        self.assertEqual(len(rows[1]), 15)
+        self.assertEqual(rows[1][2:5], (1, 2, 3))
+        self.assertTrue(math.isnan(rows[1][5]))
+        self.assertEqual(rows[1][13:], (4, 5))
+
+    def test_byteorder(self):
+        # The values are always stored little endian.
+        other = "big" if sys.byteorder == "little" else "little"
+        with mock.patch.object(sys, "byteorder", other):
+            columnar.ColumnarOutput("stats.col").dump(self.selected)
+        _, rows = self.read(order=">")
+        self.assertEqual(rows[0][:2], (0, 1.5))
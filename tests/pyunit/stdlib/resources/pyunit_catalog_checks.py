@@ -0,0 +1,153 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import tempfile
+import os
+import json
+
+from gem5.resources.catalog import ResourcesCatalog
+from gem5.resources.downloader import (
+    _resources_json_version_required,
+    get_resources_json_obj,
+    list_resources,
+)
+
+
+class ResourcesCatalogTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.catalog"""
+
+    def setUp(self) -> None:
+        self.resources_json = {
+            "version" : _resources_json_version_required(),
+            "url_base" : "http://dist.gem5.org/dist/v21-2",
+            "previous-versions" : {},
+            "resources" : [
+                {
+                    "type" : "resource",
+                    "name" : "riscv-disk-img",
+                    "is_zipped" : True,
+                    "md5sum" : "d6126db9f6bed7774518ae25aa35f153",
+                    "url" : "{url_base}/images/riscv/riscv-disk.img.gz",
+                },
+                {
+                    "type" : "group",
+                    "name" : "kernels",
+                    "contents" : [
+                        {
+                            "type" : "artifact",
+                            "name" : "x86-linux-kernel-5.4.49",
+                            "is_zipped" : False,
+                            "md5sum" : "3fcffe3956c8a95e6a6ad2f5a8f36a11",
+                            "url" : "{url_base}/kernels/x86/vmlinux-5.4.49",
+                        },
+                    ],
+                },
+            ],
+        }
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def verify_catalog(self, catalog: ResourcesCatalog) -> None:
+        self.assertEqual(2, len(catalog))
+        self.assertEqual(
+            ["riscv-disk-img", "x86-linux-kernel-5.4.49"], catalog.names()
+        )
+        self.assertIn("x86-linux-kernel-5.4.49", catalog)
+        self.assertNotIn("kernels", catalog)
+        self.assertEqual(
+            self.resources_json["resources"][1]["contents"][0],
+            catalog.get("x86-linux-kernel-5.4.49"),
+        )
+        self.assertEqual(
+            self.resources_json["resources"][0], catalog.get("riscv-disk-img")
+        )
+        self.assertEqual(_resources_json_version_required(), catalog.version)
+        self.assertEqual("http://dist.gem5.org/dist/v21-2", catalog.url_base)
+        with self.assertRaises(Exception):
+            catalog.get("kernels")
+
+    def test_from_json(self) -> None:
+        self.verify_catalog(ResourcesCatalog.from_json(self.resources_json))
+
+    def test_duplicate_names(self) -> None:
+        self.resources_json["resources"][1]["contents"].append(
+            self.resources_json["resources"][0]
+        )
+        with self.assertRaises(Exception):
+            ResourcesCatalog.from_json(self.resources_json)
+
+    def test_snapshot(self) -> None:
+        path = os.path.join(self.dir.name, "snapshot")
+        ResourcesCatalog.from_json(self.resources_json).save_snapshot(path)
+        self.verify_catalog(ResourcesCatalog.load_snapshot(path))
+
+    def test_invalid_snapshot(self) -> None:
+        path = os.path.join(self.dir.name, "snapshot")
+        with open(path, "w") as f:
+            json.dump(self.resources_json, f)
+        with self.assertRaises(Exception):
+            ResourcesCatalog.load_snapshot(path)
+
+    def test_downloader_snapshot(self) -> None:
+        # Tests that the downloader uses the snapshot in
+        # "GEM5_RESOURCE_SNAPSHOT" in place of the resources.json file.
+        path = os.path.join(self.dir.name, "snapshot")
+        ResourcesCatalog.from_json(self.resources_json).save_snapshot(path)
+        os.environ["GEM5_RESOURCE_JSON"] = os.path.join(
+            self.dir.name, "does-not-exist.json"
+        )
+        os.environ["GEM5_RESOURCE_SNAPSHOT"] = path
+        try:
+            self.assertEqual(
+                ["riscv-disk-img", "x86-linux-kernel-5.4.49"],
+                list_resources(),
+            )
+            self.assertEqual(
+                "d6126db9f6bed7774518ae25aa35f153",
+                get_resources_json_obj("riscv-disk-img")["md5sum"],
+            )
+        finally:
+            del os.environ["GEM5_RESOURCE_JSON"]
+            del os.environ["GEM5_RESOURCE_SNAPSHOT"]
+
+    def test_downloader_catalog_loaded_once(self) -> None:
+        path = os.path.join(self.dir.name, "resources.json")
+        with open(path, "w") as f:
+            json.dump(self.resources_json, f)
+        os.environ["GEM5_RESOURCE_JSON"] = path
+        try:
+            get_resources_json_obj("riscv-disk-img")
+            # The resources.json file is not read again.
+            os.remove(path)
+            self.assertEqual(
+                "3fcffe3956c8a95e6a6ad2f5a8f36a11",
+                get_resources_json_obj("x86-linux-kernel-5.4.49")["md5sum"],
+            )
+        finally:
+            del os.environ["GEM5_RESOURCE_JSON"]
@@ -27,13 +27,23 @@
 import unittest
 import tempfile
 import os
+import gzip
+import hashlib
+import http.server
+import io
+import shutil
+import tarfile
+import threading
+from pathlib import Path
 from typing import Dict
 
 from gem5.resources.downloader import(
     _get_resources_json_at_path,
     _get_resources_json,
     _resources_json_version_required,
+    _download_resource,
 )
+from gem5.resources.md5_utils import md5_dir
 
 class MD5FileTestSuite(unittest.TestCase):
     """Test cases for gem5.resources.downloader"""
@@ -136,4 +146,172 @@ class MD5FileTestSuite(unittest.TestCase):
         self.assertTrue(
             f"Resources location '{path}' is not a valid path or URL." in \
             str(context.exception)
-        )
\ No newline at end of file
+        )
+
+
+class _RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves the files of the server, supporting HTTP Range requests. The
+    connection is closed after `drop_after` bytes of the next response.
+    """
+
+    def do_GET(self) -> None:
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        self.server.ranges.append(range_header)
+        if range_header:
+            start = int(range_header[len("bytes="):].split("-")[0])
+            if start >= len(data):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+
+        body = data[start:]
+        if self.server.drop_after is not None:
+            body = body[:self.server.drop_after]
+            self.server.drop_after = None
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class DownloadResourceTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.downloader._download_resource()"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), _RangeRequestHandler
+        )
+        cls.server.files = {}
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def setUp(self) -> None:
+        self.server.ranges = []
+        self.server.drop_after = None
+        self.dir = tempfile.mkdtemp()
+        self.to_path = os.path.join(self.dir, "resource")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def serve(self, name: str, data: bytes) -> str:
+        self.server.files["/" + name] = data
+        return f"http://127.0.0.1:{self.server.server_port}/{name}"
+
+    def test_download_file(self) -> None:
+        data = os.urandom(3 * 1024 * 1024)
+        url = self.serve("file", data)
+
+        _download_resource(url, self.to_path, unzip=False, untar=False,
+                           md5sum=hashlib.md5(data).hexdigest())
+
+        with open(self.to_path, "rb") as f:
+            self.assertEqual(data, f.read())
+        self.assertFalse(os.path.exists(self.to_path + ".part"))
+        self.assertTrue(os.path.exists(self.to_path + ".md5cache"))
+
+    def test_download_gzipped_file(self) -> None:
+        data = b"A gzipped resource\n" * 100000
+        url = self.serve("file.gz", gzip.compress(data))
+
+        _download_resource(url, self.to_path, unzip=True, untar=False,
+                           md5sum=hashlib.md5(data).hexdigest())
+
+        with open(self.to_path, "rb") as f:
+            self.assertEqual(data, f.read())
+
+    def test_download_tar_archive(self) -> None:
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+            for name, data in (("file1", b"Some test data here"),
+                               ("dir2/file1", b"Yet more data")):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        url = self.serve("dir.tar.gz", archive.getvalue())
+
+        _download_resource(url, self.to_path, unzip=True, untar=True)
+
+        with open(os.path.join(self.to_path, "dir2", "file1"), "rb") as f:
+            self.assertEqual(b"Yet more data", f.read())
+        self.assertFalse(os.path.exists(self.to_path + ".part"))
+
+        # The md5 value is checked against that of the directory.
+        shutil.rmtree(self.to_path)
+        os.mkdir(os.path.join(self.dir, "expected"))
+        with open(os.path.join(self.dir, "expected", "x"), "w") as f:
+            f.write("x")
+        with self.assertRaises(Exception):
+            _download_resource(
+                url, self.to_path, unzip=True, untar=True,
+                md5sum=md5_dir(Path(os.path.join(self.dir, "expected")))
+            )
+
+    def test_resume_lost_connection(self) -> None:
+        data = os.urandom(1024 * 1024)
+        url = self.serve("file.gz", gzip.compress(data))
+        self.server.drop_after = 100000
+
+        _download_resource(url, self.to_path, unzip=True, untar=False,
+                           md5sum=hashlib.md5(data).hexdigest())
+
+        with open(self.to_path, "rb") as f:
+            self.assertEqual(data, f.read())
+        self.assertEqual([None, "bytes=100000-"], self.server.ranges)
+
+    def test_resume_interrupted_download(self) -> None:
+        data = os.urandom(1024 * 1024)
+        url = self.serve("file", data)
+        with open(self.to_path + ".part", "wb") as f:
+            f.write(data[:1000])
+
+        _download_resource(url, self.to_path, unzip=False, untar=False,
+                           md5sum=hashlib.md5(data).hexdigest())
+
+        with open(self.to_path, "rb") as f:
+            self.assertEqual(data, f.read())
+        self.assertEqual(["bytes=1000-"], self.server.ranges)
+
+    def test_resume_interrupted_download_of_other_version(self) -> None:
+        data = os.urandom(1024 * 1024)
+        url = self.serve("file", data)
+        with open(self.to_path + ".part", "wb") as f:
+            f.write(os.urandom(1000))
+
+        _download_resource(url, self.to_path, unzip=False, untar=False,
+                           md5sum=hashlib.md5(data).hexdigest())
+
+        with open(self.to_path, "rb") as f:
+            self.assertEqual(data, f.read())
+        self.assertEqual(["bytes=1000-", None], self.server.ranges)
+
+    def test_md5_mismatch(self) -> None:
+        url = self.serve("file", b"Some data")
+
+        with self.assertRaises(Exception):
+            _download_resource(url, self.to_path, unzip=False, untar=False,
+                               md5sum=hashlib.md5(b"Other data").hexdigest())
+
+        self.assertFalse(os.path.exists(self.to_path))
+        self.assertFalse(os.path.exists(self.to_path + ".part"))
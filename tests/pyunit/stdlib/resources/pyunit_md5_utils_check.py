@@ -30,7 +30,7 @@ import os
 import shutil
 from pathlib import Path
 
-from gem5.resources.md5_utils import md5_file, md5_dir
+from gem5.resources.md5_utils import md5_file, md5_dir, md5_cached
 
 
 class MD5FileTestSuite(unittest.TestCase):
@@ -114,3 +114,93 @@ class MD5DirTestSuite(unittest.TestCase):
         shutil.rmtree(dir2)
 
         self.assertEquals(first_md5, second_md5)
+
+
+class MD5CachedTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.md5_utils.md5_cached()"""
+
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        self.file = self.dir / "file"
+        with open(self.file, "w") as f:
+            f.write("This is a test string, to be put in a temp file")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def _overwrite_in_place(self, data: str) -> None:
+        # Change the contents of the file, keeping its size, modification
+        # time and inode, which is only done to test the cache.
+        st = os.stat(self.file)
+        with open(self.file, "r+") as f:
+            f.write(data)
+        os.utime(self.file, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    def test_md5CachedFile(self) -> None:
+        # This test ensures the md5 value of a file is the same as md5_file
+        # and is recorded next to the file.
+
+        md5 = md5_cached(self.file)
+
+        self.assertEquals("b113b29fce251f2023066c3fda2ec9dd", md5)
+        self.assertTrue((self.dir / "file.md5cache").is_file())
+
+        self._overwrite_in_place("THIS")
+        self.assertEquals(md5, md5_cached(self.file))
+
+    def test_md5CachedFileChanged(self) -> None:
+        # This test ensures the md5 value is computed again if the file
+        # changes.
+
+        md5 = md5_cached(self.file)
+        with open(self.file, "a") as f:
+            f.write(" and more")
+
+        self.assertNotEqual(md5, md5_cached(self.file))
+        self.assertEquals(md5_file(self.file), md5_cached(self.file))
+
+    def test_md5CachedForced(self) -> None:
+        # This test ensures the recorded md5 value is ignored if forced.
+
+        md5 = md5_cached(self.file)
+        self._overwrite_in_place("THIS")
+
+        self.assertNotEqual(md5, md5_cached(self.file, force=True))
+        self.assertEquals(md5_file(self.file), md5_cached(self.file))
+
+    def test_md5CachedDir(self) -> None:
+        # This test ensures the md5 value of a directory is the same as
+        # md5_dir and is computed again if a file in it changes.
+
+        dir = self.dir / "dir"
+        os.mkdir(dir)
+        with open(dir / "file1", "w") as f:
+            f.write("Some test data here")
+
+        md5 = md5_cached(dir)
+        self.assertEquals(md5_dir(dir), md5)
+
+        with open(dir / "file2", "w") as f:
+            f.write("Some more test data")
+        self.assertNotEqual(md5, md5_cached(dir))
+        self.assertEquals(md5_dir(dir), md5_cached(dir))
+
+    def test_md5CachedDirEmptySubdir(self) -> None:
+        # This test ensures the md5 value of a directory is computed again if
+        # an empty subdirectory is added, renamed or removed, as md5_dir
+        # hashes the names of subdirectories.
+
+        dir = self.dir / "dir"
+        os.mkdir(dir)
+        with open(dir / "file1", "w") as f:
+            f.write("Some test data here")
+        md5_cached(dir)
+
+        os.mkdir(dir / "subdir")
+        self.assertEquals(md5_dir(dir), md5_cached(dir))
+
+        os.rename(dir / "subdir", dir / "subdir2")
+        self.assertEquals(md5_dir(dir), md5_cached(dir))
+
+        os.rmdir(dir / "subdir2")
+        self.assertEquals(md5_dir(dir), md5_cached(dir))
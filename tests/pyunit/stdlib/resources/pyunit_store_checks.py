@@ -0,0 +1,371 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import tempfile
+import os
+import errno
+import io
+import json
+import hashlib
+import functools
+import http.server
+import stat
+import tarfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from gem5.resources.downloader import (
+    _resources_json_version_required,
+    get_resource,
+)
+from gem5.resources.md5_utils import md5_dir, record_md5
+from gem5.resources.store import (
+    link_from_store,
+    make_read_only,
+    store_path,
+)
+
+
+class _CountingRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files from a directory, counting the requests made."""
+
+    def do_GET(self) -> None:
+        self.server.requests.append(self.path)
+        super().do_GET()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class ResourceStoreTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.store"""
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.store_dir = os.path.join(self.dir.name, "store")
+        os.mkdir(self.store_dir)
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_store_path(self) -> None:
+        md5sum = "d6126db9f6bed7774518ae25aa35f153"
+        path = store_path(self.store_dir, md5sum)
+        self.assertEqual(
+            os.path.join(self.store_dir, "d6", md5sum), path
+        )
+        self.assertTrue(os.path.isdir(os.path.dirname(path)))
+
+    def test_link_file(self) -> None:
+        path = os.path.join(self.store_dir, "file")
+        with open(path, "w") as f:
+            f.write("Some test data here")
+        make_read_only(path)
+
+        to_path = os.path.join(self.dir.name, "linked")
+        self.assertTrue(link_from_store(path, to_path))
+
+        self.assertTrue(os.path.islink(to_path))
+        self.assertTrue(os.path.samefile(path, to_path))
+        with self.assertRaises(PermissionError):
+            if os.geteuid() == 0:
+                # root can write to a read-only file.
+                raise PermissionError()
+            open(to_path, "w")
+
+    def test_link_directory(self) -> None:
+        path = os.path.join(self.store_dir, "dir")
+        os.makedirs(os.path.join(path, "dir2"))
+        for name in ("file1", os.path.join("dir2", "file1")):
+            with open(os.path.join(path, name), "w") as f:
+                f.write(name)
+        make_read_only(path)
+
+        to_path = os.path.join(self.dir.name, "linked")
+        self.assertTrue(link_from_store(path, to_path))
+
+        self.assertTrue(os.path.samefile(
+            os.path.join(path, "dir2", "file1"),
+            os.path.join(to_path, "dir2", "file1"),
+        ))
+        self.assertEqual(md5_dir(Path(path)), md5_dir(Path(to_path)))
+
+    def test_copy_without_symlinks(self) -> None:
+        # If the file system doesn't support symbolic links, the resource is
+        # copied.
+        path = os.path.join(self.store_dir, "dir")
+        os.makedirs(os.path.join(path, "dir2"))
+        for name in ("file1", os.path.join("dir2", "file1")):
+            with open(os.path.join(path, name), "w") as f:
+                f.write(name)
+        make_read_only(path)
+
+        to_path = os.path.join(self.dir.name, "copied")
+        with mock.patch(
+            "os.symlink",
+            side_effect=OSError(errno.EPERM, "Operation not permitted"),
+        ):
+            self.assertFalse(link_from_store(path, to_path))
+
+        self.assertFalse(os.path.islink(to_path))
+        self.assertFalse(os.path.samefile(
+            os.path.join(path, "dir2", "file1"),
+            os.path.join(to_path, "dir2", "file1"),
+        ))
+        self.assertEqual(md5_dir(Path(path)), md5_dir(Path(to_path)))
+
+    def serve_resources(self) -> None:
+        """
+        Serves a file and a tar archive resource over HTTP, listed in a
+        resources.json file used by the downloader.
+        """
+        serve_dir = os.path.join(self.dir.name, "serve")
+        os.mkdir(serve_dir)
+        self.data = b"A disk image\n" * 1000
+        with open(os.path.join(serve_dir, "disk.img"), "wb") as f:
+            f.write(self.data)
+        with tarfile.open(
+            os.path.join(serve_dir, "dir.tar.gz"), "w:gz"
+        ) as tar:
+            info = tarfile.TarInfo("file1")
+            info.size = len(self.data)
+            tar.addfile(info, io.BytesIO(self.data))
+        expected_dir = os.path.join(self.dir.name, "expected")
+        os.mkdir(expected_dir)
+        with open(os.path.join(expected_dir, "file1"), "wb") as f:
+            f.write(self.data)
+
+        server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            functools.partial(_CountingRequestHandler, directory=serve_dir),
+        )
+        server.requests = []
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.server = server
+
+        def stop_server():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.addCleanup(stop_server)
+
+        resources_json = os.path.join(self.dir.name, "resources.json")
+        with open(resources_json, "w") as f:
+            json.dump(
+                {
+                    "version" : _resources_json_version_required(),
+                    "url_base" : f"http://127.0.0.1:{server.server_port}",
+                    "previous-versions" : {},
+                    "resources" : [
+                        {
+                            "type" : "resource",
+                            "name" : "disk-image",
+                            "is_zipped" : False,
+                            "md5sum" : hashlib.md5(self.data).hexdigest(),
+                            "url" : "{url_base}/disk.img",
+                        },
+                        {
+                            "type" : "resource",
+                            "name" : "directory",
+                            "is_zipped" : True,
+                            "is_tar_archive" : True,
+                            "md5sum" : md5_dir(Path(expected_dir)),
+                            "url" : "{url_base}/dir.tar.gz",
+                        },
+                    ],
+                },
+                f,
+            )
+        environ = {
+            "GEM5_RESOURCE_JSON" : resources_json,
+            "GEM5_RESOURCE_STORE" : self.store_dir,
+        }
+        patcher = mock.patch.dict(os.environ, environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_resource_through_store(self) -> None:
+        # Two resource directories obtain the same resources: they are only
+        # downloaded once, and are linked to the same files.
+        self.serve_resources()
+        for run in ("run1", "run2"):
+            os.mkdir(os.path.join(self.dir.name, run))
+            for name in ("disk-image", "directory"):
+                get_resource(name, os.path.join(self.dir.name, run, name))
+
+        self.assertEqual(["/disk.img", "/dir.tar.gz"], self.server.requests)
+        self.assertTrue(
+            os.path.islink(os.path.join(self.dir.name, "run1", "disk-image"))
+        )
+        self.assertTrue(os.path.samefile(
+            os.path.join(self.dir.name, "run1", "disk-image"),
+            os.path.join(self.dir.name, "run2", "disk-image"),
+        ))
+        self.assertTrue(os.path.samefile(
+            os.path.join(self.dir.name, "run1", "directory", "file1"),
+            os.path.join(self.dir.name, "run2", "directory", "file1"),
+        ))
+
+    def test_store_entry_removed(self) -> None:
+        # A resource linked to a resource which has been removed from the
+        # store is downloaded again.
+        self.serve_resources()
+        to_path = os.path.join(self.dir.name, "disk-image")
+        get_resource("disk-image", to_path)
+        path = os.readlink(to_path)
+        os.remove(path)
+
+        get_resource("disk-image", to_path)
+        self.assertEqual(["/disk.img", "/disk.img"], self.server.requests)
+        self.assertEqual(path, os.readlink(to_path))
+        with open(to_path, "rb") as f:
+            self.assertEqual(self.data, f.read())
+
+    def test_store_entry_of_other_user(self) -> None:
+        # The md5 value recorded for a resource added to the store by another
+        # user isn't trusted, as another member of the group of the store may
+        # have replaced the resource and the record.
+        self.serve_resources()
+        get_resource("disk-image", os.path.join(self.dir.name, "disk-image"))
+        path = os.readlink(os.path.join(self.dir.name, "disk-image"))
+        md5sum = hashlib.md5(self.data).hexdigest()
+        os.chmod(path, 0o644)
+        with open(path, "wb") as f:
+            f.write(b"Not a disk image\n")
+        record_md5(Path(path), md5sum)
+
+        to_path = os.path.join(self.dir.name, "other-disk-image")
+        with mock.patch("os.getuid", return_value=os.getuid() + 1):
+            get_resource("disk-image", to_path)
+
+        self.assertEqual(["/disk.img", "/disk.img"], self.server.requests)
+        with open(to_path, "rb") as f:
+            self.assertEqual(self.data, f.read())
+
+    @unittest.skipUnless(
+        hasattr(os, "fork") and os.geteuid() == 0,
+        "Switching to another user needs root",
+    )
+    def test_get_resource_as_other_user(self) -> None:
+        # A resource added to the store by one user is linked, not copied,
+        # by another user of the store, who can't hard-link it.
+        self.serve_resources()
+        get_resource("disk-image", os.path.join(self.dir.name, "disk-image"))
+
+        uid = gid = 65534
+        try:
+            import pwd
+            uid, gid = pwd.getpwnam("nobody")[2:4]
+        except (ImportError, KeyError):
+            pass
+        os.chmod(self.dir.name, 0o755)
+        run_dir = os.path.join(self.dir.name, "other")
+        os.mkdir(run_dir)
+        os.chown(run_dir, uid, gid)
+        to_path = os.path.join(run_dir, "disk-image")
+
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Report the result to the parent, whatever happens.
+            try:
+                os.close(read)
+                os.setgroups([os.stat(self.store_dir).st_gid])
+                os.setgid(gid)
+                os.setuid(uid)
+                with mock.patch("builtins.print") as output:
+                    get_resource("disk-image", to_path)
+                result = {
+                    "islink" : os.path.islink(to_path),
+                    "output" : [ str(c) for c in output.call_args_list ],
+                }
+                with open(to_path, "rb") as f:
+                    result["data"] = f.read().decode()
+            except BaseException as e:
+                result = {"error" : repr(e)}
+            os.write(write, json.dumps(result).encode())
+            os._exit(0)
+
+        os.close(write)
+        with os.fdopen(read) as f:
+            result = json.load(f)
+        os.waitpid(pid, 0)
+
+        self.assertNotIn("error", result)
+        self.assertTrue(result["islink"])
+        self.assertEqual(self.data.decode(), result["data"])
+        self.assertFalse(
+            any("copied" in line for line in result["output"])
+        )
+        self.assertEqual(["/disk.img"], self.server.requests)
+
+    def test_store_shared_with_restrictive_umask(self) -> None:
+        # Whatever the umask of the user adding a resource to the store,
+        # other users can lock, add to and read the store.
+        self.serve_resources()
+        umask = os.umask(0o077)
+        try:
+            for name in ("disk-image", "directory"):
+                get_resource(name, os.path.join(self.dir.name, name))
+        finally:
+            os.umask(umask)
+
+        def mode(path):
+            return stat.S_IMODE(os.stat(path).st_mode)
+
+        path = store_path(self.store_dir, hashlib.md5(self.data).hexdigest())
+        self.assertEqual(0o2775, mode(os.path.dirname(path)))
+        self.assertEqual(0o444, mode(path))
+        self.assertEqual(0o644, mode(path + ".lock.lock"))
+        self.assertEqual(0o644, mode(path + ".md5cache"))
+
+        for root, dirs, files in os.walk(self.store_dir):
+            for name in dirs:
+                self.assertEqual(
+                    0o555, mode(os.path.join(root, name)) & 0o555
+                )
+            for name in files:
+                if name.endswith(".lock") or name.endswith(".md5cache"):
+                    continue
+                self.assertEqual(0o444, mode(os.path.join(root, name)))
+
+    def test_store_not_writable(self) -> None:
+        # If the store can't be written to, the resource is downloaded
+        # without it.
+        self.serve_resources()
+        to_path = os.path.join(self.dir.name, "disk-image")
+        with mock.patch(
+            "gem5.resources.downloader.store_path",
+            side_effect=PermissionError("Permission denied"),
+        ):
+            get_resource("disk-image", to_path)
+
+        with open(to_path, "rb") as f:
+            self.assertEqual(self.data, f.read())
+        self.assertEqual([], os.listdir(self.store_dir))
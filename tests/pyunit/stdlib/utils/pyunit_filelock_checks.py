@@ -0,0 +1,82 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import tempfile
+import os
+import threading
+import time
+
+from gem5.utils.filelock import FileLock, FileLockException
+
+
+class FileLockTestSuite(unittest.TestCase):
+    """Test cases for gem5.utils.filelock"""
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "resource")
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_no_wait(self) -> None:
+        with FileLock(self.path):
+            with self.assertRaises(FileLockException):
+                FileLock(self.path, timeout=None).acquire()
+        with FileLock(self.path, timeout=None):
+            pass
+
+    def test_wait(self) -> None:
+        # A thread waiting for the lock holds it once it is released.
+        events = []
+        lock = FileLock(self.path)
+        lock.acquire()
+
+        def wait():
+            with FileLock(self.path):
+                events.append("acquired")
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        thread.join(timeout=0.2)
+        events.append("released")
+        lock.release()
+        thread.join()
+
+        self.assertEqual(["released", "acquired"], events)
+
+    def test_timeout(self) -> None:
+        # Waiting for a lock which isn't released gives up after the timeout.
+        with FileLock(self.path):
+            lock = FileLock(self.path, timeout=0.3, delay=0.01)
+            start = time.time()
+            with self.assertRaises(FileLockException):
+                lock.acquire()
+            self.assertGreaterEqual(time.time() - start, 0.3)
+            self.assertFalse(lock.is_locked)
+        with FileLock(self.path, timeout=0.3):
+            pass
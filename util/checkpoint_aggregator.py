@@ -26,11 +26,33 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+# Merge several single process checkpoints into one multiprogrammed
+# checkpoint. The memory images of the checkpoints are placed one after
+# the other in the merged image, which is optionally padded with zeros up
+# to --memory-size.
+#
+# The memory images are copied by a pool of worker processes (see --jobs),
+# each handling one checkpoint. When the merged image isn't compressed,
+# the workers write straight into their part of it, copying uncompressed
+# images with copy_file_range() where possible and leaving all-zero
+# chunks and the padding as holes. When it is compressed, every worker
+# compresses its part into a separate gzip member and the members are
+# concatenated, which gzip (and gem5) read as a single stream.
+
+from concurrent.futures import ProcessPoolExecutor
 from configparser import ConfigParser
 import gzip
+import shutil
+import zlib
 
 import sys, re, os
 
+page_size = 1 << 12
+mem_file = "system.physmem.store0.pmem"
+
+# Size of the buffers used to copy memory images
+chunk_size = 1 << 24
+
 class myCP(ConfigParser):
     def __init__(self):
         ConfigParser.__init__(self)
@@ -38,28 +60,116 @@ class myCP(ConfigParser):
     def optionxform(self, optionstr):
         return optionstr
 
-def aggregate(output_dir, cpts, no_compress, memory_size):
+def _is_gzip(path):
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+def _read_chunks(path, size):
+    """Generator yielding the first size bytes of a, possibly gzipped,
+    memory image in chunks of at most chunk_size bytes."""
+    if _is_gzip(path):
+        src = gzip.open(path, "rb")
+    else:
+        src = open(path, "rb")
+    with src:
+        while size > 0:
+            data = src.read(min(size, chunk_size))
+            if not data:
+                raise IOError("%s is shorter than its checkpoint says" % path)
+            size -= len(data)
+            yield data
+
+def _copy_raw(src_path, out_path, offset, size):
+    """Copy the first size bytes of an uncompressed memory image to offset
+    in out_path, skipping all-zero chunks."""
+    with open(src_path, "rb") as src, open(out_path, "r+b") as out:
+        if hasattr(os, "copy_file_range"):
+            start = offset
+            try:
+                while size > 0:
+                    copied = os.copy_file_range(src.fileno(), out.fileno(),
+                                                size, offset_dst=offset)
+                    if copied == 0:
+                        raise IOError("%s is shorter than its checkpoint says"
+                                      % src_path)
+                    offset += copied
+                    size -= copied
+                return
+            except OSError:
+                # E.g., not supported by the file system, fall back to
+                # copying through a buffer
+                if offset != start:
+                    raise
+    _write_chunks(_read_chunks(src_path, size), out_path, offset)
+
+def _write_chunks(chunks, out_path, offset):
+    zero = bytes(chunk_size)
+    fd = os.open(out_path, os.O_WRONLY)
+    try:
+        for data in chunks:
+            # The output is created as a sparse file, zeros are free
+            if data != zero[:len(data)]:
+                os.pwrite(fd, data, offset)
+            offset += len(data)
+    finally:
+        os.close(fd)
+
+def _copy_mem(src_path, out_path, offset, size):
+    """Worker copying a memory image into an uncompressed merged image."""
+    if _is_gzip(src_path):
+        _write_chunks(_read_chunks(src_path, size), out_path, offset)
+    else:
+        _copy_raw(src_path, out_path, offset, size)
+    return src_path
+
+def _compress_mem(src_path, out_path, size, level):
+    """Worker compressing a memory image into a gzip member in out_path."""
+    with open(out_path, "wb") as out:
+        with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=level) as gz:
+            for data in _read_chunks(src_path, size):
+                gz.write(data)
+    return src_path
+
+def _zero_member(size, level):
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return comp.compress(bytes(size)) + comp.flush()
+
+def _write_zeros(out, size, level):
+    """Append size zero bytes to a compressed image, reusing one
+    compressed member per full chunk."""
+    if size <= 0:
+        return
+    full, rest = divmod(size, chunk_size)
+    if full:
+        member = _zero_member(chunk_size, level)
+        for _ in range(full):
+            out.write(member)
+    if rest:
+        out.write(_zero_member(rest, level))
+
+def aggregate(output_dir, cpts, no_compress, memory_size, jobs=None,
+              compress_level=6):
     merged_config = None
     page_ptr = 0
 
     output_path = output_dir
-    if not os.path.isdir(output_path):
-        os.system("mkdir -p " + output_path)
-
-    agg_mem_file = open(output_path + "/system.physmem.store0.pmem", "wb+")
-    agg_config_file = open(output_path + "/m5.cpt", "wb+")
+    os.makedirs(output_path, exist_ok=True)
 
-    if not no_compress:
-        merged_mem = gzip.GzipFile(fileobj= agg_mem_file, mode="wb")
+    agg_mem_path = os.path.join(output_path, mem_file)
+    agg_config_file = open(os.path.join(output_path, "m5.cpt"), "w")
 
     max_curtick = 0
     num_digits = len(str(len(cpts)-1))
 
+    # (memory image, offset in the merged image, size) of each checkpoint
+    images = []
+
     for (i, arg) in enumerate(cpts):
         print(arg)
         merged_config = myCP()
         config = myCP()
-        config.readfp(open(cpts[i] + "/m5.cpt"))
+        with open(cpts[i] + "/m5.cpt") as f:
+            config.read_file(f)
 
         for sec in config.sections():
             if re.compile("cpu").search(sec):
@@ -69,12 +179,13 @@ def aggregate(output_dir, cpts, no_compress, memory_size):
                 items = config.items(sec)
                 for item in items:
                     if item[0] == "paddr":
-                        merged_config.set(newsec, item[0], int(item[1]) + (page_ptr << 12))
+                        merged_config.set(newsec, item[0],
+                                str(int(item[1]) + (page_ptr << 12)))
                         continue
                     merged_config.set(newsec, item[0], item[1])
 
                 if re.compile("workload.FdMap256$").search(sec):
-                    merged_config.set(newsec, "M5_pid", i)
+                    merged_config.set(newsec, "M5_pid", str(i))
 
             elif sec == "system":
                 pass
@@ -93,53 +204,60 @@ def aggregate(output_dir, cpts, no_compress, memory_size):
 
         ### memory stuff
         pages = int(config.get("system", "pagePtr"))
-        page_ptr = page_ptr + pages
         print("pages to be read: ", pages)
+        images.append((os.path.join(cpts[i], mem_file), page_ptr * page_size,
+                       pages * page_size))
+        page_ptr = page_ptr + pages
 
-        f = open(cpts[i] + "/system.physmem.store0.pmem", "rb")
-        gf = gzip.GzipFile(fileobj=f, mode="rb")
-
-        x = 0
-        while x < pages:
-            bytesRead = gf.read(1 << 12)
-            if not no_compress:
-                merged_mem.write(bytesRead)
-            else:
-                agg_mem_file.write(bytesRead)
-            x += 1
+    merged_config.add_section("system")
+    merged_config.set("system", "pagePtr", str(page_ptr))
+    merged_config.set("system", "nextPID", str(len(cpts)))
 
-        gf.close()
-        f.close()
+    data_size = page_ptr * page_size
+    if memory_size is not None and data_size < memory_size:
+        page_ptr = -(-memory_size // page_size)
+    file_size = page_ptr * page_size
 
-    merged_config.add_section("system")
-    merged_config.set("system", "pagePtr", page_ptr)
-    merged_config.set("system", "nextPID", len(cpts))
-
-    file_size = page_ptr * 4 * 1024
-    dummy_data = "".zfill(4096)
-    while file_size < memory_size:
-        if not no_compress:
-            merged_mem.write(dummy_data)
-        else:
-            agg_mem_file.write(dummy_data)
-        file_size += 4 * 1024
-        page_ptr += 1
+    if no_compress:
+        with open(agg_mem_path, "wb") as f:
+            f.truncate(file_size)
+        with ProcessPoolExecutor(jobs) as pool:
+            futures = [ pool.submit(_copy_mem, src, agg_mem_path, offset,
+                                    size)
+                        for src, offset, size in images ]
+            for future in futures:
+                print("copied", future.result())
+    else:
+        parts = [ "%s.part%d" % (agg_mem_path, i)
+                  for i in range(len(images)) ]
+        try:
+            with ProcessPoolExecutor(jobs) as pool:
+                futures = [ pool.submit(_compress_mem, src, part, size,
+                                        compress_level)
+                            for (src, _, size), part in zip(images, parts) ]
+                with open(agg_mem_path, "wb") as out:
+                    for part, future in zip(parts, futures):
+                        print("compressed", future.result())
+                        with open(part, "rb") as f:
+                            shutil.copyfileobj(f, out, chunk_size)
+                        os.remove(part)
+                    _write_zeros(out, file_size - data_size, compress_level)
+        finally:
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
 
     print("WARNING: ")
     print("Make sure the simulation using this checkpoint has at least ", end=' ')
     print(page_ptr, "x 4K of memory")
-    merged_config.set("system.physmem.store0", "range_size", page_ptr * 4 * 1024)
+    merged_config.set("system.physmem.store0", "range_size",
+                      str(page_ptr * page_size))
 
     merged_config.add_section("Globals")
-    merged_config.set("Globals", "curTick", max_curtick)
+    merged_config.set("Globals", "curTick", str(max_curtick))
 
     merged_config.write(agg_config_file)
-
-    if not no_compress:
-        merged_mem.close()
-        agg_mem_file.close()
-    else:
-        agg_mem_file.close()
+    agg_config_file.close()
 
 if __name__ == "__main__":
     from argparse import ArgumentParser
@@ -150,6 +268,13 @@ if __name__ == "__main__":
     parser.add_argument("-c", "--no-compress", action="store_true")
     parser.add_argument("--cpts", nargs='+')
     parser.add_argument("--memory-size", action="store", type=int)
+    parser.add_argument("-j", "--jobs", action="store", type=int,
+                        default=None,
+                        help="Number of worker processes copying memory "
+                        "images (default: number of CPUs)")
+    parser.add_argument("--compress-level", action="store", type=int,
+                        default=6, choices=range(1, 10),
+                        help="gzip level of the merged memory image")
 
     # Assume x86 ISA.  Any other ISAs would need extra stuff in this script
     # to appropriately parse their page tables and understand page sizes.
@@ -160,4 +285,4 @@ if __name__ == "__main__":
                      "need to be combined.")
 
     aggregate(options.output_dir, options.cpts, options.no_compress,
-              options.memory_size)
+              options.memory_size, options.jobs, options.compress_level)
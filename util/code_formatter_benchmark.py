@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Copyright (c) 2022 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Measure how fast code_formatter formats the code of real SLICC protocols.
+
+Each protocol is parsed once per repetition, and the time it takes to
+process the declarations and generate the C++ code for them (which is
+mostly spent formatting it) is reported together with the number of
+code_formatter calls made and the number of distinct format strings used.
+
+Run from anywhere in the tree, e.g.:
+
+    util/code_formatter_benchmark.py MI_example chi/CHI --repeat 5
+
+The --no-cache option measures the formatter without reusing the parsed
+format strings, for comparison.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+base = os.path.dirname(os.path.abspath(__file__))
+sys.path[1:1] = [
+    os.path.join(base, "..", "src", "mem"),
+    os.path.join(base, "..", "build_tools"),
+    os.path.join(base, "..", "ext", "ply"),
+]
+
+import code_formatter
+from slicc.parser import SLICC
+
+protocol_base = os.path.join(base, "..", "src", "mem", "ruby", "protocol")
+includes = ["mem/ruby/slicc_interface/RubySlicc_includes.hh"]
+
+class BenchmarkSLICC(SLICC):
+    """A SLICC parser which keeps the ply tables in tables_dir, so that
+    running the benchmark doesn't write them into the source tree."""
+    def __init__(self, filename, tables_dir):
+        self.setupParserFactory(debug=False,
+            tables=os.path.join(tables_dir, "slicc_tables.pickle"))
+        super().__init__(filename, protocol_base, verbose=False)
+
+def run(protocol, output_dir, tables_dir, html):
+    slicc_file = os.path.join(protocol_base, protocol + ".slicc")
+    slicc = BenchmarkSLICC(slicc_file, tables_dir)
+    compile_format = code_formatter.compile_format
+    compile_format.cache_clear()
+    start = time.perf_counter()
+    slicc.process()
+    slicc.writeCodeFiles(output_dir, includes)
+    if html:
+        slicc.writeHTMLFiles(os.path.join(output_dir, "html"))
+    seconds = time.perf_counter() - start
+    info = compile_format.cache_info()
+    return seconds, info.hits + info.misses, info.misses
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure code_formatter throughput on SLICC protocols.")
+    parser.add_argument("protocols", nargs="*",
+        default=["MI_example", "MESI_Two_Level", "MOESI_CMP_directory",
+                 "MOESI_AMD_Base", "chi/CHI"],
+        help="protocols to generate, relative to src/mem/ruby/protocol")
+    parser.add_argument("--repeat", type=int, default=3,
+        help="number of times to generate each protocol (best is reported)")
+    parser.add_argument("--html", action="store_true",
+        help="generate the HTML tables as well")
+    parser.add_argument("--no-cache", action="store_true",
+        help="parse every format string again on each call")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        # Keep the statistics of the cache, but never reuse its entries.
+        uncached = code_formatter.compile_format.__wrapped__
+        code_formatter.compile_format = code_formatter.functools.lru_cache(
+            maxsize=0)(uncached)
+
+    print("%-24s %10s %10s %10s %12s" %
+          ("protocol", "seconds", "calls", "formats", "calls/s"))
+    total_seconds = total_calls = 0
+    with tempfile.TemporaryDirectory() as tables_dir:
+        for protocol in args.protocols:
+            results = []
+            for i in range(args.repeat):
+                with tempfile.TemporaryDirectory() as output_dir:
+                    results.append(
+                        run(protocol, output_dir, tables_dir, args.html))
+            seconds, calls, formats = min(results)
+            total_seconds += seconds
+            total_calls += calls
+            print("%-24s %10.3f %10d %10d %12.0f" %
+                  (protocol, seconds, calls, formats, calls / seconds))
+        print("%-24s %10.3f %10d %10s %12.0f" %
+              ("total", total_seconds, total_calls, "",
+               total_calls / total_seconds))
+
+if __name__ == "__main__":
+    main()
@@ -68,10 +68,21 @@
 # upgrader. This can be especially valuable when maintaining private
 # upgraders in private branches.
 
+# When recursing through a directory tree, the checkpoints are upgraded by a
+# pool of worker processes (-j option). Checkpoints whose version tags are
+# already current are skipped after reading just their version information,
+# and the order in which to apply the upgraders is worked out once for every
+# distinct set of tags found. The compiled upgraders are cached in
+# cpt_upgraders/__pycache__ like any imported module.
 
+
+from concurrent.futures import ProcessPoolExecutor
 import configparser
 import glob, types, sys, os
+import importlib.machinery
 import os.path as osp
+import re
+import time
 
 verbose_print = False
 
@@ -82,14 +93,21 @@ def verboseprint(*args):
         print(arg, end=' ')
     print("\n")
 
+def _load_code(filename):
+    """Return the compiled code of an upgrader, using the bytecode cached
+    in __pycache__ if it is up to date."""
+    name = osp.basename(filename)[:-3]
+    return importlib.machinery.SourceFileLoader(name, filename).get_code(name)
+
 class Upgrader:
     tag_set = set()
     untag_set = set() # tags to remove by downgrading
     by_tag = {}
     legacy = {}
+    plans = {} # frozenset of tags -> tags to apply, in order
     def __init__(self, filename):
         self.filename = filename
-        exec(open(filename).read(), {}, self.__dict__)
+        exec(_load_code(filename), {}, self.__dict__)
 
         if not hasattr(self, 'tag'):
             self.tag = osp.basename(filename)[:-3]
@@ -155,6 +173,38 @@ class Upgrader:
     def get(tag):
         return Upgrader.by_tag[tag]
 
+    @staticmethod
+    def plan(tags):
+        """Return the list of tags whose upgraders or downgraders need to be
+        applied, in order, to a checkpoint with the given tags."""
+        key = frozenset(tags)
+        if key in Upgrader.plans:
+            return Upgrader.plans[key]
+
+        tags = set(tags)
+        order = []
+        # Apply migrations for tags not in checkpoint and tags present for
+        # which downgraders are present, respecting dependences
+        to_apply = (Upgrader.tag_set - tags) | (Upgrader.untag_set & tags)
+        while to_apply:
+            ready = set([ t for t in to_apply if Upgrader.get(t).ready(tags) ])
+            if not ready:
+                print("could not apply these upgrades:", ' '.join(to_apply))
+                print("update dependences impossible to resolve; aborting")
+                exit(1)
+
+            for tag in sorted(ready):
+                order.append(tag)
+                if hasattr(Upgrader.get(tag), 'upgrader'):
+                    tags.add(tag)
+                else:
+                    tags.remove(tag)
+
+            to_apply -= ready
+
+        Upgrader.plans[key] = order
+        return order
+
     @staticmethod
     def load_all():
         util_dir = osp.dirname(osp.abspath(__file__))
@@ -182,17 +232,42 @@ class Upgrader:
                           "nonexistent tag '{}'".format(tag, dep))
                     sys.exit(1)
 
+def read_version_tags(path):
+    """Return the version tags of a checkpoint, reading only as far as the
+    version information. Returns None for legacy checkpoints or if there is
+    no version information, which process_file() deals with."""
+    section = None
+    section_re = re.compile(r'^\[(.*)\]')
+    option_re = re.compile(r'^(version_tags|cpt_ver)\s*[=:]\s*(.*)$')
+    with open(path, 'r') as f:
+        for line in f:
+            m = section_re.match(line)
+            if m:
+                section = m.group(1)
+                continue
+            m = option_re.match(line)
+            if not m:
+                continue
+            if m.group(1) == 'cpt_ver' and section == 'root':
+                return None
+            if m.group(1) == 'version_tags' and \
+                    section in ('Globals', 'root.globals'):
+                return set(m.group(2).split())
+    return None
+
+def is_current(path):
+    """Check if a checkpoint has nothing to upgrade from its version tags"""
+    tags = read_version_tags(path)
+    return tags is not None and not Upgrader.plan(tags)
+
 def process_file(path, **kwargs):
+    """Upgrade a checkpoint, returning True if it was changed"""
     if not osp.isfile(path):
         import errno
         raise IOError(errno.ENOENT, "No such file", path)
 
     verboseprint("Processing file %s...." % path)
 
-    if kwargs.get('backup', True):
-        import shutil
-        shutil.copyfile(path, path + '.bak')
-
     cpt = configparser.ConfigParser()
 
     # gem5 is case sensitive with paramaters
@@ -237,31 +312,77 @@ def process_file(path, **kwargs):
         print("warning: upgrade script does not recognize the following "
               "tags in this checkpoint:", ' '.join(unknown_tags))
 
-    # Apply migrations for tags not in checkpoint and tags present for which
-    # downgraders are present, respecting dependences
-    to_apply = (Upgrader.tag_set - tags) | (Upgrader.untag_set & tags)
-    while to_apply:
-        ready = set([ t for t in to_apply if Upgrader.get(t).ready(tags) ])
-        if not ready:
-            print("could not apply these upgrades:", ' '.join(to_apply))
-            print("update dependences impossible to resolve; aborting")
-            exit(1)
-
-        for tag in ready:
-            Upgrader.get(tag).update(cpt, tags)
-            change = True
-
-        to_apply -= ready
+    for tag in Upgrader.plan(tags):
+        Upgrader.get(tag).update(cpt, tags)
+        change = True
 
     if not change:
         verboseprint("...nothing to do")
-        return
+        return False
 
     cpt.set('root.globals', 'version_tags', ' '.join(tags))
 
+    if kwargs.get('backup', True):
+        import shutil
+        shutil.copyfile(path, path + '.bak')
+
     # Write the old data back
     verboseprint("...completed")
-    cpt.write(open(path, 'w'))
+    with open(path, 'w') as f:
+        cpt.write(f)
+    return True
+
+def _init_worker(verbose):
+    global verbose_print
+    verbose_print = verbose
+    # Workers which weren't forked from the main process start without
+    # upgraders
+    if not Upgrader.by_tag:
+        Upgrader.load_all()
+
+def _process_worker(path, kwargs):
+    return process_file(path, **kwargs), osp.getsize(path)
+
+def process_tree(path, jobs=None, **kwargs):
+    """Upgrade all the checkpoints found under path using jobs worker
+    processes, and report how many were upgraded and how fast."""
+    start = time.time()
+    paths = []
+    skipped = 0
+    for root, dirs, files in os.walk(path):
+        if 'm5.cpt' not in files:
+            continue
+        cpt_path = osp.join(root, 'm5.cpt')
+        if is_current(cpt_path):
+            verboseprint("Skipping current checkpoint %s" % cpt_path)
+            skipped += 1
+        else:
+            paths.append(cpt_path)
+
+    upgraded = 0
+    total_bytes = 0
+    if jobs == 1 or len(paths) <= 1:
+        for cpt_path in paths:
+            changed, size = _process_worker(cpt_path, kwargs)
+            upgraded += changed
+            total_bytes += size
+    else:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                                 initargs=(verbose_print,)) as pool:
+            workers = jobs or os.cpu_count() or 1
+            chunksize = max(1, len(paths) // (4 * workers))
+            for changed, size in pool.map(_process_worker, paths,
+                                          [ kwargs ] * len(paths),
+                                          chunksize=chunksize):
+                upgraded += changed
+                total_bytes += size
+
+    elapsed = max(time.time() - start, 1e-6)
+    print("Upgraded {} of {} checkpoints ({} already current) in {:.2f}s: "
+          "{:.1f} checkpoints/s, {:.1f} MB/s".format(
+              upgraded, len(paths) + skipped, skipped, elapsed,
+              (len(paths) + skipped) / elapsed,
+              total_bytes / elapsed / (1 << 20)))
 
 if __name__ == '__main__':
     from argparse import ArgumentParser, SUPPRESS
@@ -277,6 +398,10 @@ if __name__ == '__main__':
     parser.add_argument(
         "-v", "--verbose", action="store_true",
         help="Print out debugging information as")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Number of worker processes used with -r (default: number "\
+             "of CPUs)")
     parser.add_argument(
         "--get-cc-file", action="store_true",
         # used during build; generate src/sim/tags.cc and exit
@@ -318,12 +443,7 @@ if __name__ == '__main__':
         cpt_file = osp.join(path, 'm5.cpt')
         if args.recurse:
             # Visit very file and see if it matches
-            for root,dirs,files in os.walk(path):
-                for name in files:
-                    if name == 'm5.cpt':
-                        process_file(osp.join(root,name), **vars(args))
-                for dir in dirs:
-                    pass
+            process_tree(path, jobs=args.jobs, backup=args.backup)
         # Maybe someone passed a cpt.XXXXXXX directory and not m5.cpt
         elif osp.isfile(cpt_file):
             process_file(cpt_file, **vars(args))
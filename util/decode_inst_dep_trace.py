@@ -85,7 +85,13 @@
 # 7,35666,1,COMP,3000::,4
 # 8,35670,1,STORE,1748748,4,74,0:,6,3:,7
 # 9,35670,1,COMP,500::,7
+#
+# If the trace was written with an index (see encode_inst_dep_trace.py
+# --index) a window of sequence numbers can be decoded without reading the
+# rest of the trace, using --start-seq and --end-seq or read_records().
 
+import argparse
+import os
 import protolib
 import sys
 
@@ -106,24 +112,59 @@ except:
         print("Failed to import proto definitions")
         exit(-1)
 
+def read_records(in_file, start_seq=0, end_seq=None):
+    """
+    Generator yielding the records of a trace with a sequence number in
+    [start_seq, end_seq). Traces with an index only have the blocks
+    overlapping the window decompressed, others are read in full. The
+    same message object is reused for every record.
+    """
+    if end_seq is None:
+        end_seq = float('inf')
+    record = inst_dep_record_pb2.InstDepRecord()
+    if protolib.hasIndex(in_file):
+        trace = protolib.IndexedTrace(in_file)
+        for record in trace.window(record, start_seq, end_seq):
+            yield record
+        return
+    if os.path.exists(protolib.indexPath(in_file)):
+        print("Ignoring out of date index", protolib.indexPath(in_file),
+              file=sys.stderr)
+
+    proto_in = protolib.openFileRd(in_file)
+    try:
+        proto_in.read(4)
+        protolib.decodeMessage(proto_in,
+                               inst_dep_record_pb2.InstDepRecordHeader())
+        for record in protolib.parseMessages(proto_in, record):
+            if start_seq <= record.seq_num < end_seq:
+                yield record
+    finally:
+        proto_in.close()
+
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: ", sys.argv[0], " <protobuf input> <ASCII output>")
-        exit(-1)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', help='protobuf input')
+    parser.add_argument('output', help='ASCII output')
+    parser.add_argument('--start-seq', type=int, default=0,
+        help='only decode records from this sequence number on')
+    parser.add_argument('--end-seq', type=int, default=None,
+        help='only decode records before this sequence number')
+    args = parser.parse_args()
 
     # Open the file on read mode
-    proto_in = protolib.openFileRd(sys.argv[1])
+    proto_in = protolib.openFileRd(args.input)
 
     try:
-        ascii_out = open(sys.argv[2], 'w')
+        ascii_out = open(args.output, 'w')
     except IOError:
-        print("Failed to open ", sys.argv[2], " for writing")
+        print("Failed to open ", args.output, " for writing")
         exit(-1)
 
     # Read the magic number in 4-byte Little Endian
     magic_number = proto_in.read(4)
 
-    if magic_number != "gem5":
+    if magic_number != b"gem5":
         print("Unrecognized file")
         exit(-1)
 
@@ -135,6 +176,7 @@ def main():
 
     print("Object id:", header.obj_id)
     print("Tick frequency:", header.tick_freq)
+    proto_in.close()
 
     print("Parsing packets")
 
@@ -148,10 +190,10 @@ def main():
     num_packets = 0
     num_regdeps = 0
     num_robdeps = 0
-    packet = inst_dep_record_pb2.InstDepRecord()
 
-    # Decode the packet messages until we hit the end of the file
-    while protolib.decodeMessage(proto_in, packet):
+    # Decode the packet messages until we hit the end of the file or the
+    # window
+    for packet in read_records(args.input, args.start_seq, args.end_seq):
         num_packets += 1
 
         # Write to file the seq num
@@ -208,7 +250,6 @@ def main():
 
     # We're done
     ascii_out.close()
-    proto_in.close()
 
 if __name__ == "__main__":
     main()
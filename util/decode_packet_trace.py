@@ -36,8 +36,16 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 # This script is used to dump protobuf packet traces to ASCII
-# format.
+# format, or to columnar NumPy chunk files. It can also be imported, in
+# which case iter_batches() gives access to the packets of a trace as
+# batches of NumPy arrays.
+#
+# If the trace was written with an index (see encode_packet_trace.py
+# --index) a tick window can be decoded without reading the rest of the
+# trace, using --start-tick and --end-tick or read_packets().
 
+import argparse
+import json
 import os
 import protolib
 import subprocess
@@ -48,67 +56,208 @@ util_dir = os.path.dirname(os.path.realpath(__file__))
 subprocess.check_call(['make', '--quiet', '-C', util_dir, 'packet_pb2.py'])
 import packet_pb2
 
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: ", sys.argv[0], " <protobuf input> <ASCII output>")
-        exit(-1)
-
-    # Open the file in read mode
-    proto_in = protolib.openFileRd(sys.argv[1])
+# The columns of a batch of packets and their NumPy types. The optional
+# fields are 0 for packets which don't have them, the has_* columns say
+# which packets do.
+columns = [
+    ('cmd', 'u4'),
+    ('addr', 'u8'),
+    ('size', 'u4'),
+    ('flags', 'u4'),
+    ('tick', 'u8'),
+    ('pc', 'u8'),
+    ('pkt_id', 'u8'),
+    ('has_flags', '?'),
+    ('has_pc', '?'),
+    ('has_pkt_id', '?'),
+]
 
-    try:
-        ascii_out = open(sys.argv[2], 'w')
-    except IOError:
-        print("Failed to open ", sys.argv[2], " for writing")
-        exit(-1)
+def open_trace(in_file):
+    """
+    Open a packet trace (gzipped or not) and read its header. Returns the
+    file, positioned at the first packet, and the header.
+    """
+    proto_in = protolib.openFileRd(in_file)
 
     # Read the magic number in 4-byte Little Endian
     magic_number = proto_in.read(4).decode()
-
     if magic_number != "gem5":
-        print("Unrecognized file", sys.argv[1])
-        exit(-1)
+        proto_in.close()
+        raise ValueError("Unrecognized file %s" % in_file)
 
-    print("Parsing packet header")
-
-    # Add the packet header
     header = packet_pb2.PacketHeader()
     protolib.decodeMessage(proto_in, header)
+    return proto_in, header
 
-    print("Object id:", header.obj_id)
-    print("Tick frequency:", header.tick_freq)
+def read_packets(in_file, start_tick=0, end_tick=None):
+    """
+    Generator yielding the packets of a trace with a tick in
+    [start_tick, end_tick). Traces with an index only have the blocks
+    overlapping the window decompressed, others are read in full. The
+    same message object is reused for every packet.
+    """
+    if end_tick is None:
+        end_tick = float('inf')
+    packet = packet_pb2.Packet()
+    if protolib.hasIndex(in_file):
+        trace = protolib.IndexedTrace(in_file)
+        for packet in trace.window(packet, start_tick, end_tick):
+            yield packet
+        return
+    if os.path.exists(protolib.indexPath(in_file)):
+        print("Ignoring out of date index", protolib.indexPath(in_file),
+              file=sys.stderr)
 
-    for id_string in header.id_strings:
-        print('Master id %d: %s' % (id_string.key, id_string.value))
+    proto_in, _ = open_trace(in_file)
+    try:
+        for packet in protolib.parseMessages(proto_in, packet):
+            if start_tick <= packet.tick < end_tick:
+                yield packet
+    finally:
+        proto_in.close()
 
-    print("Parsing packets")
+def _packet_rows(packets):
+    for packet in packets:
+        yield (packet.cmd, packet.addr, packet.size, packet.flags,
+               packet.tick, packet.pc, packet.pkt_id,
+               packet.HasField('flags'), packet.HasField('pc'),
+               packet.HasField('pkt_id'))
 
-    num_packets = 0
-    packet = packet_pb2.Packet()
+def iter_batches(in_file, batch_size=1 << 16, start_tick=0, end_tick=None):
+    """
+    Generator yielding the packets of a trace, optionally limited to a
+    tick window as for read_packets(), in batches of at most batch_size
+    packets. Each batch is a dict mapping the names in columns to NumPy
+    arrays.
+    """
+    import numpy as np
+
+    dtype = np.dtype(columns)
 
-    # Decode the packet messages until we hit the end of the file
-    while protolib.decodeMessage(proto_in, packet):
+    def to_batch(rows):
+        records = np.array(rows, dtype=dtype)
+        return { name: np.ascontiguousarray(records[name])
+                 for name, _ in columns }
+
+    rows = []
+    for row in _packet_rows(read_packets(in_file, start_tick, end_tick)):
+        rows.append(row)
+        if len(rows) == batch_size:
+            yield to_batch(rows)
+            rows = []
+    if rows:
+        yield to_batch(rows)
+
+def write_ascii(packets, ascii_out):
+    """Write the packets to ascii_out, returning how many"""
+    num_packets = 0
+    lines = []
+    for packet in packets:
         num_packets += 1
         # ReadReq is 1 and WriteReq is 4 in src/mem/packet.hh Command enum
         cmd = 'r' if packet.cmd == 1 else ('w' if packet.cmd == 4 else 'u')
+        line = ''
         if packet.HasField('pkt_id'):
-            ascii_out.write('%s,' % (packet.pkt_id))
+            line = '%s,' % (packet.pkt_id)
         if packet.HasField('flags'):
-            ascii_out.write('%s,%s,%s,%s,%s' % (cmd, packet.addr, packet.size,
-                            packet.flags, packet.tick))
+            line += '%s,%s,%s,%s,%s' % (cmd, packet.addr, packet.size,
+                                        packet.flags, packet.tick)
         else:
-            ascii_out.write('%s,%s,%s,%s' % (cmd, packet.addr, packet.size,
-                                           packet.tick))
+            line += '%s,%s,%s,%s' % (cmd, packet.addr, packet.size,
+                                     packet.tick)
         if packet.HasField('pc'):
-            ascii_out.write(',%s\n' % (packet.pc))
+            line += ',%s\n' % (packet.pc)
         else:
-            ascii_out.write('\n')
+            line += '\n'
+        lines.append(line)
 
-    print("Parsed packets:", num_packets)
+        if len(lines) == 4096:
+            ascii_out.writelines(lines)
+            lines = []
+
+    ascii_out.writelines(lines)
+    return num_packets
+
+def write_columnar(in_file, header, out_dir, batch_size, start_tick=0,
+                   end_tick=None):
+    """
+    Write the packets in the trace to out_dir as a series of NumPy .npz
+    chunk files with one array per column, along with the trace header as
+    header.json. Returns the number of packets written.
+    """
+    import numpy as np
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'header.json'), 'w') as f:
+        json.dump({
+            'obj_id' : header.obj_id,
+            'ver' : header.ver,
+            'tick_freq' : header.tick_freq,
+            'id_strings' : { s.key : s.value for s in header.id_strings },
+            'columns' : [ name for name, _ in columns ],
+        }, f, indent=4)
+
+    num_packets = 0
+    batches = iter_batches(in_file, batch_size, start_tick, end_tick)
+    for i, batch in enumerate(batches):
+        np.savez(os.path.join(out_dir, 'chunk%06d.npz' % i), **batch)
+        num_packets += len(batch['tick'])
+    return num_packets
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', help='protobuf packet trace to decode')
+    parser.add_argument('output',
+        help='ASCII output file, or output directory for --format=npz')
+    parser.add_argument('--format', choices=('ascii', 'npz'),
+        default='ascii', help='output format [default: %(default)s]')
+    parser.add_argument('--batch-size', type=int, default=1 << 16,
+        help='packets per NumPy chunk file [default: %(default)s]')
+    parser.add_argument('--start-tick', type=int, default=0,
+        help='only decode packets from this tick on')
+    parser.add_argument('--end-tick', type=int, default=None,
+        help='only decode packets before this tick')
+    args = parser.parse_args()
+
+    # Open the file in read mode
+    try:
+        proto_in, header = open_trace(args.input)
+    except ValueError as e:
+        print(e)
+        exit(-1)
+
+    print("Parsing packet header")
+
+    print("Object id:", header.obj_id)
+    print("Tick frequency:", header.tick_freq)
+
+    for id_string in header.id_strings:
+        print('Master id %d: %s' % (id_string.key, id_string.value))
+
+    print("Parsing packets")
 
-    # We're done
-    ascii_out.close()
     proto_in.close()
+    if args.format == 'npz':
+        try:
+            import numpy
+        except ImportError:
+            print("Failed to import numpy")
+            exit(-1)
+        num_packets = write_columnar(args.input, header, args.output,
+                                     args.batch_size, args.start_tick,
+                                     args.end_tick)
+    else:
+        try:
+            ascii_out = open(args.output, 'w')
+        except IOError:
+            print("Failed to open ", args.output, " for writing")
+            exit(-1)
+        packets = read_packets(args.input, args.start_tick, args.end_tick)
+        num_packets = write_ascii(packets, ascii_out)
+        # We're done
+        ascii_out.close()
+
+    print("Parsed packets:", num_packets)
 
 if __name__ == "__main__":
     main()
@@ -86,6 +86,12 @@
 # 8,35670,1,STORE,1748748,4,74,0:,6,3:,7
 # 9,35670,1,COMP,500::,7
 
+#
+# With --index the output is written as a series of gzip blocks along
+# with a sidecar index (<protobuf output>.idx) mapping sequence numbers
+# and record numbers to blocks, see IndexedTrace in protolib.py.
+
+import argparse
 import protolib
 import sys
 
@@ -109,31 +115,46 @@ except:
 DepRecord = inst_dep_record_pb2.InstDepRecord
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: ", sys.argv[0], " <ASCII input> <protobuf output>")
-        exit(-1)
+    parser = argparse.ArgumentParser(
+        description="Encode an ASCII instruction dependency trace as a "
+        "gem5 protobuf trace.")
+    parser.add_argument("ascii_in", help="ASCII input")
+    parser.add_argument("proto_out", help="protobuf output")
+    parser.add_argument("--index", action="store_true",
+                        help="write a block compressed, indexed trace")
+    parser.add_argument("--block-size", type=int, default=1 << 16,
+                        help="records per block of an indexed trace "
+                        "(default: %(default)s)")
+    args = parser.parse_args()
 
     # Open the file in write mode
-    proto_out = open(sys.argv[2], 'wb')
+    if args.index:
+        proto_out = protolib.IndexedTraceWriter(args.proto_out, 'seq_num',
+                                                args.block_size)
+    else:
+        proto_out = open(args.proto_out, 'wb')
+        protolib.removeIndex(args.proto_out)
 
     # Open the file in read mode
     try:
-        ascii_in = open(sys.argv[1], 'r')
+        ascii_in = open(args.ascii_in, 'r')
     except IOError:
-        print("Failed to open ", sys.argv[1], " for reading")
+        print("Failed to open ", args.ascii_in, " for reading")
         exit(-1)
 
     # Write the magic number in 4-byte Little Endian, similar to what
     # is done in src/proto/protoio.cc
-    proto_out.write("gem5")
+    proto_out.write(b"gem5")
 
     # Add the packet header
     header = inst_dep_record_pb2.InstDepRecordHeader()
-    header.obj_id = "Converted ASCII trace " + sys.argv[1]
+    header.obj_id = "Converted ASCII trace " + args.ascii_in
     # Assume the default tick rate
     header.tick_freq = 1000000000
     header.window_size = 120
     protolib.encodeMessage(proto_out, header)
+    if args.index:
+        proto_out.endHeader()
 
     print("Creating enum name,value lookup from proto")
     enumValues = {}
@@ -191,7 +212,10 @@ def main():
             if a_dep:
                 dep_record.reg_dep.append(int(a_dep))
 
-        protolib.encodeMessage(proto_out, dep_record)
+        if args.index:
+            proto_out.addRecord(dep_record, dep_record.seq_num)
+        else:
+            protolib.encodeMessage(proto_out, dep_record)
         num_records += 1
 
     print("Converted", num_records, "records.")
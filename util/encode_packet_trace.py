@@ -50,7 +50,13 @@
 #
 # This script can of course also be used as a template to convert
 # other trace formats into the gem5 protobuf format
+#
+# With --index the output is written as a series of gzip blocks along
+# with a sidecar index (<protobuf output>.idx) mapping tick ranges and
+# packet numbers to blocks, see IndexedTrace in protolib.py. The trace
+# can still be read by gem5 as any other gzipped trace.
 
+import argparse
 import protolib
 import sys
 
@@ -79,32 +85,46 @@ except:
         exit(-1)
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: ", sys.argv[0], " <ASCII input> <protobuf output>")
-        exit(-1)
+    parser = argparse.ArgumentParser(
+        description="Encode an ASCII packet trace as a gem5 protobuf trace.")
+    parser.add_argument("ascii_in", help="ASCII input")
+    parser.add_argument("proto_out", help="protobuf output")
+    parser.add_argument("--index", action="store_true",
+                        help="write a block compressed, indexed trace")
+    parser.add_argument("--block-size", type=int, default=1 << 16,
+                        help="packets per block of an indexed trace "
+                        "(default: %(default)s)")
+    args = parser.parse_args()
 
     try:
-        ascii_in = open(sys.argv[1], 'r')
+        ascii_in = open(args.ascii_in, 'r')
     except IOError:
-        print("Failed to open ", sys.argv[1], " for reading")
+        print("Failed to open ", args.ascii_in, " for reading")
         exit(-1)
 
     try:
-        proto_out = open(sys.argv[2], 'wb')
+        if args.index:
+            proto_out = protolib.IndexedTraceWriter(args.proto_out, 'tick',
+                                                    args.block_size)
+        else:
+            proto_out = open(args.proto_out, 'wb')
+            protolib.removeIndex(args.proto_out)
     except IOError:
-        print("Failed to open ", sys.argv[2], " for writing")
+        print("Failed to open ", args.proto_out, " for writing")
         exit(-1)
 
     # Write the magic number in 4-byte Little Endian, similar to what
     # is done in src/proto/protoio.cc
-    proto_out.write("gem5")
+    proto_out.write(b"gem5")
 
     # Add the packet header
     header = packet_pb2.PacketHeader()
-    header.obj_id = "Converted ASCII trace " + sys.argv[1]
+    header.obj_id = "Converted ASCII trace " + args.ascii_in
     # Assume the default tick rate
     header.tick_freq = 1000000000000
     protolib.encodeMessage(proto_out, header)
+    if args.index:
+        proto_out.endHeader()
 
     # For each line in the ASCII trace, create a packet message and
     # write it to the encoded output
@@ -116,7 +136,10 @@ def main():
         packet.cmd = 1 if cmd == 'r' else 4
         packet.addr = int(addr)
         packet.size = int(size)
-        protolib.encodeMessage(proto_out, packet)
+        if args.index:
+            proto_out.addRecord(packet, packet.tick)
+        else:
+            protolib.encodeMessage(proto_out, packet)
 
     # We're done
     ascii_in.close()
@@ -37,11 +37,14 @@ Some common queries can be found in common_queries.py
 from abc import ABC, abstractmethod
 
 import copy
+import fcntl
 import json
 import os
 from pathlib import Path
+import re
 import shutil
-from typing import Any, Dict, Iterable, Union, Type, List, Tuple
+import threading
+from typing import Any, Dict, Iterable, Optional, Union, Type, List, Tuple
 from urllib.parse import urlparse
 from uuid import UUID
 
@@ -252,6 +255,13 @@ class ArtifactFileDB(ArtifactDB):
         #           (netloc='path', path='/to/file')
         # so, the filepath would be netloc+path for both cases
         self._json_file = Path(parsed_uri.netloc) / Path(parsed_uri.path)
+        self._init_storage()
+
+        self._uuid_artifact_map, self._hash_uuid_map = self._load_from_file(
+            self._json_file
+        )
+
+    def _init_storage(self) -> None:
         storage_path = os.environ.get("GEM5ART_STORAGE", "")
         self._storage_enabled = True if storage_path else False
         self._storage_path = Path(storage_path)
@@ -266,10 +276,6 @@ class ArtifactFileDB(ArtifactDB):
         if self._storage_enabled:
             os.makedirs(self._storage_path, exist_ok=True)
 
-        self._uuid_artifact_map, self._hash_uuid_map = self._load_from_file(
-            self._json_file
-        )
-
     def put(self, key: UUID, artifact: Dict[str, Union[str, UUID]]) -> None:
         """Insert the artifact into the database with the key."""
         assert artifact["_id"] == key
@@ -393,6 +399,289 @@ class ArtifactFileDB(ArtifactDB):
                 yield artifact
 
 
+class ArtifactLogFileDB(ArtifactFileDB):
+    """
+    This is a file-based database where Artifacts are appended to a log
+    instead of rewriting the whole database on every insert.
+
+    The database is made of a snapshot, a JSON file in the same format as
+    ArtifactFileDB, and a log next to it (the snapshot path with ".log"
+    appended) with one serialized artifact per line. Inserting an artifact
+    only appends a line to the log. Once the log is large enough compared
+    to the snapshot, it is merged into a new snapshot by a background
+    thread.
+
+    All accesses to the files are serialized with an flock() on a lock
+    file (the snapshot path with ".lock" appended), so several processes
+    can use the same database at once. Every query first reads any
+    artifacts other processes appended since the last query. The lock file
+    also holds the number of compactions done so far, which tells the
+    other processes to reload the database.
+
+    Besides the UUID and hash maps of ArtifactFileDB, this database keeps
+    indexes on the name and type of the artifacts to answer the searchBy*
+    queries without scanning the whole database.
+
+    Like ArtifactFileDB, artifacts can be copied to the directory in
+    GEM5ART_STORAGE.
+    """
+
+    _log_file: Path
+    _lock_file: Path
+    _name_uuid_map: Dict[str, List[str]]
+    _type_uuid_map: Dict[str, List[str]]
+
+    # The log is compacted once it has at least this many artifacts and as
+    # many as the snapshot.
+    compact_threshold = 1024
+
+    def __init__(self, uri: str) -> None:
+        """Initialize the database from the snapshot and log files, which
+        are created if they don't exist.
+        """
+        parsed_uri = urlparse(uri)
+        # See ArtifactFileDB.__init__()
+        self._json_file = Path(parsed_uri.netloc) / Path(parsed_uri.path)
+        self._log_file = Path(str(self._json_file) + ".log")
+        self._lock_file = Path(str(self._json_file) + ".lock")
+        self._init_storage()
+
+        # Protects the in-memory state from the compaction thread
+        self._mutex = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        self._generation: Optional[str] = None
+        self._log_offset = 0
+        self._snapshot_count = 0
+        self._log_count = 0
+        self.refresh()
+
+    def _reset(self) -> None:
+        self._uuid_artifact_map = {}
+        self._hash_uuid_map = {}
+        self._name_uuid_map = {}
+        self._type_uuid_map = {}
+        self._log_offset = 0
+        self._snapshot_count = 0
+        self._log_count = 0
+
+    def _lock(self, operation: int) -> Any:
+        f = open(self._lock_file, "a+")
+        fcntl.flock(f, operation)
+        return f
+
+    @staticmethod
+    def _read_generation(lock: Any) -> str:
+        lock.seek(0)
+        return lock.read()
+
+    def _index(self, artifact: Dict[str, str]) -> bool:
+        uuid_str = artifact["_id"]
+        if uuid_str in self._uuid_artifact_map:
+            return False
+        self._uuid_artifact_map[uuid_str] = artifact
+        for mapping, key in (
+            (self._hash_uuid_map, artifact["hash"]),
+            (self._name_uuid_map, artifact.get("name")),
+            (self._type_uuid_map, artifact.get("type")),
+        ):
+            mapping.setdefault(key, []).append(uuid_str)
+        return True
+
+    def _read_log(self) -> None:
+        try:
+            f = open(self._log_file, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # A writer may have died in the middle of a line, skip it
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip() and self._index(json.loads(line)):
+                self._log_count += 1
+        self._log_offset += end
+
+    def _refresh(self, lock: Any) -> None:
+        """Load the artifacts added since the last refresh. Must be called
+        with the lock file held."""
+        with self._mutex:
+            generation = self._read_generation(lock)
+            if generation != self._generation:
+                # The database was compacted, start over
+                self._reset()
+                self._generation = generation
+                uuids, _ = self._load_from_file(self._json_file)
+                for artifact in uuids.values():
+                    self._index(artifact)
+                self._snapshot_count = len(uuids)
+            self._read_log()
+
+    def refresh(self) -> None:
+        """Read the artifacts other processes added to the database."""
+        with self._lock(fcntl.LOCK_SH) as lock:
+            self._refresh(lock)
+
+    def insert_artifact(
+        self,
+        the_uuid: UUID,
+        the_hash: str,
+        the_artifact: Dict[str, Union[str, UUID]],
+    ) -> bool:
+        """
+        Append the artifact to the database.
+
+        Return True if the artifact uuid does not exist in the database prior
+        to calling this function; return False otherwise.
+        """
+        line = json.dumps(the_artifact, cls=ArtifactFileDB.ArtifactEncoder)
+        with self._lock(fcntl.LOCK_EX) as lock:
+            self._refresh(lock)
+            if str(the_uuid) in self._uuid_artifact_map:
+                return False
+            fd = os.open(
+                self._log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+            try:
+                os.write(fd, (line + "\n").encode())
+            finally:
+                os.close(fd)
+            self._refresh(lock)
+        self._maybe_compact()
+        return True
+
+    def _maybe_compact(self) -> None:
+        with self._mutex:
+            if self._log_count < max(
+                self.compact_threshold, self._snapshot_count
+            ):
+                return
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+            self._compaction = threading.Thread(
+                target=self.compact, daemon=True
+            )
+            self._compaction.start()
+
+    def compact(self) -> None:
+        """Merge the log into a new snapshot."""
+        with self._lock(fcntl.LOCK_EX) as lock:
+            with self._mutex:
+                self._refresh(lock)
+                if not self._log_count:
+                    return
+                tmp_file = Path(str(self._json_file) + ".tmp")
+                self._save_to_file(tmp_file)
+                os.replace(tmp_file, self._json_file)
+                # Bump the generation before removing the log so that a
+                # crash in between leaves duplicates, not missing entries
+                generation = str(int(self._generation or "0") + 1)
+                lock.truncate(0)
+                lock.write(generation)
+                lock.flush()
+                os.unlink(self._log_file)
+                # Our own state is already up to date
+                self._generation = generation
+                self._snapshot_count = len(self._uuid_artifact_map)
+                self._log_offset = 0
+                self._log_count = 0
+
+    def wait_for_compaction(self) -> None:
+        """Wait for a background compaction to finish, if there is one."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def has_uuid(self, the_uuid: UUID) -> bool:
+        self.refresh()
+        return super().has_uuid(the_uuid)
+
+    def has_hash(self, the_hash: str) -> bool:
+        self.refresh()
+        return super().has_hash(the_hash)
+
+    def get_artifact_by_uuid(self, the_uuid: UUID) -> Iterable[Dict[str, str]]:
+        self.refresh()
+        return super().get_artifact_by_uuid(the_uuid)
+
+    def get_artifact_by_hash(self, the_hash: str) -> Iterable[Dict[str, str]]:
+        self.refresh()
+        return super().get_artifact_by_hash(the_hash)
+
+    def find_exact(
+        self, attr: Dict[str, str], limit: int
+    ) -> Iterable[Dict[str, Any]]:
+        """
+        Return all artifacts such that, for every yielded artifact,
+        and for every (k,v) in attr, the attribute `k` of the artifact has
+        the value of `v`.
+        """
+        self.refresh()
+        # Start from the smallest index that applies
+        candidates: Iterable[str] = self._uuid_artifact_map.keys()
+        for key, mapping in (
+            ("_id", None),
+            ("hash", self._hash_uuid_map),
+            ("name", self._name_uuid_map),
+            ("type", self._type_uuid_map),
+        ):
+            if key not in attr:
+                continue
+            if mapping is None:
+                uuids = [attr[key]] if attr[key] in self._uuid_artifact_map \
+                    else []
+            else:
+                uuids = mapping.get(attr[key], [])
+            if len(uuids) < len(candidates):  # type: ignore
+                candidates = uuids
+        artifacts = (self._uuid_artifact_map[u] for u in list(candidates))
+        return self._limit(
+            (a for a in artifacts if attr.items() <= a.items()), limit
+        )
+
+    @staticmethod
+    def _limit(
+        artifacts: Iterable[Dict[str, Any]], limit: int
+    ) -> Iterable[Dict[str, Any]]:
+        # Like MongoDB, a limit of 0 means no limit
+        for count, artifact in enumerate(artifacts, 1):
+            yield artifact
+            if count == limit:
+                return
+
+    def searchByName(self, name: str, limit: int) -> Iterable[Dict[str, Any]]:
+        """Returns an iterable of all artifacts in the database that match
+        some name."""
+        return self.find_exact({"name": name}, limit)
+
+    def searchByType(self, typ: str, limit: int) -> Iterable[Dict[str, Any]]:
+        """Returns an iterable of all artifacts in the database that match
+        some type."""
+        return self.find_exact({"type": typ}, limit)
+
+    def searchByNameType(
+        self, name: str, typ: str, limit: int
+    ) -> Iterable[Dict[str, Any]]:
+        """Returns an iterable of all artifacts in the database that match
+        some name and type."""
+        return self.find_exact({"type": typ, "name": name}, limit)
+
+    def searchByLikeNameType(
+        self, name: str, typ: str, limit: int
+    ) -> Iterable[Dict[str, Any]]:
+        """Returns an iterable of all artifacts in the database that match
+        some type and a regex name."""
+        self.refresh()
+        regex = re.compile(name)
+        artifacts = (
+            self._uuid_artifact_map[u]
+            for u in list(self._type_uuid_map.get(typ, []))
+        )
+        return self._limit(
+            (a for a in artifacts if regex.search(a["name"])), limit
+        )
+
+
 _db = None
 
 if MONGO_SUPPORT:
@@ -400,7 +689,10 @@ if MONGO_SUPPORT:
 else:
     _default_uri = "file://db.json"
 
-_db_schemes: Dict[str, Type[ArtifactDB]] = {"file": ArtifactFileDB}
+_db_schemes: Dict[str, Type[ArtifactDB]] = {
+    "file": ArtifactFileDB,
+    "filelog": ArtifactLogFileDB,
+}
 if MONGO_SUPPORT:
     _db_schemes["mongodb"] = ArtifactMongoDB
 
@@ -417,6 +709,10 @@ def _getDBType(uri: str) -> Type[ArtifactDB]:
             A simple flat file database with optional storage for the binary
             artifacts. The filepath is where the json file is stored and the
             data storage can be specified with GEM5ART_STORAGE
+        **ArtifactLogFileDB**: filelog://...
+            Like file://, but inserting an artifact appends it to a log
+            instead of rewriting the database, and several processes can
+            use the database at once.
     """
     result = urlparse(uri)
     if result.scheme in _db_schemes:
@@ -0,0 +1,128 @@
+# Copyright (c) 2022 The Regents of the University of California
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for ArtifactLogFileDB"""
+
+
+import json
+import multiprocessing
+from pathlib import Path
+import tempfile
+import unittest
+from uuid import uuid4
+
+from gem5art.artifact._artifactdb import ArtifactLogFileDB, getDBConnection
+
+
+def _make_artifact(name, typ="text"):
+    the_uuid = uuid4()
+    return the_uuid, {
+        "_id": the_uuid,
+        "hash": f"hash-{name}",
+        "name": name,
+        "type": typ,
+    }
+
+
+def _insert_many(uri, prefix, count):
+    db = ArtifactLogFileDB(uri)
+    for i in range(count):
+        the_uuid, an_artifact = _make_artifact(f"{prefix}-{i}")
+        db.put(the_uuid, an_artifact)
+
+
+class TestArtifactLogFileDB(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.dir.name) / "db.json"
+        self.uri = f"filelog://{self.path}"
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_scheme(self):
+        self.assertIsInstance(getDBConnection(self.uri), ArtifactLogFileDB)
+
+    def test_put_get(self):
+        db = ArtifactLogFileDB(self.uri)
+        the_uuid, an_artifact = _make_artifact("a")
+        db.put(the_uuid, an_artifact)
+        self.assertIn(the_uuid, db)
+        self.assertIn("hash-a", db)
+        self.assertEqual(db.get(the_uuid)["name"], "a")
+        self.assertEqual(db.get("hash-a")["_id"], str(the_uuid))
+        # Inserting only appends to the log
+        self.assertFalse(self.path.exists())
+        with open(str(self.path) + ".log") as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    def test_search(self):
+        db = ArtifactLogFileDB(self.uri)
+        for name, typ in [("a", "x"), ("b", "x"), ("ab", "y")]:
+            db.put(*_make_artifact(name, typ))
+        self.assertEqual(len(list(db.searchByType("x", limit=0))), 2)
+        self.assertEqual(len(list(db.searchByType("x", limit=1))), 1)
+        self.assertEqual(len(list(db.searchByName("ab", limit=0))), 1)
+        self.assertEqual(len(list(db.searchByNameType("a", "y", 0))), 0)
+        names = [a["name"] for a in db.searchByLikeNameType("^a", "x", 0)]
+        self.assertEqual(names, ["a"])
+
+    def test_other_process(self):
+        db = ArtifactLogFileDB(self.uri)
+        _insert_many(self.uri, "other", 3)
+        self.assertEqual(len(list(db.searchByType("text", limit=0))), 3)
+
+    def test_compaction(self):
+        db = ArtifactLogFileDB(self.uri)
+        db.compact_threshold = 4
+        for i in range(4):
+            db.put(*_make_artifact(str(i)))
+        db.wait_for_compaction()
+        self.assertFalse(Path(str(self.path) + ".log").exists())
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 4)
+        db.put(*_make_artifact("4"))
+        self.assertEqual(len(list(ArtifactLogFileDB(self.uri).find_exact(
+            {"type": "text"}, limit=0
+        ))), 5)
+
+    def test_concurrent_writers(self):
+        ArtifactLogFileDB.compact_threshold = 16
+        try:
+            procs = [
+                multiprocessing.Process(
+                    target=_insert_many, args=(self.uri, f"p{i}", 25)
+                )
+                for i in range(4)
+            ]
+            for p in procs:
+                p.start()
+            for p in procs:
+                p.join()
+        finally:
+            ArtifactLogFileDB.compact_threshold = 1024
+        db = ArtifactLogFileDB(self.uri)
+        self.assertEqual(len(list(db.searchByType("text", limit=0))), 100)
@@ -38,7 +38,13 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.font_manager import FontProperties
 import numpy as np
+import math
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', '..', 'src', 'python'))
+from m5.ext.pystats.textloader import TextLoader
 
 # global results dict
 results = {}
@@ -122,7 +128,7 @@ def plotLowPStates(plot_dir, stats_fname, bank_util_list, seqbytes_list,
     @param delay_list: list of itt max multipliers (e.g. [1, 20, 200])
 
     """
-    stats_file = open(stats_fname, 'r')
+    stats = TextLoader(stats_fname)
 
     global bankUtilValues
     bankUtilValues = bank_util_list
@@ -134,59 +140,41 @@ def plotLowPStates(plot_dir, stats_fname, bank_util_list, seqbytes_list,
     delayValues = delay_list
     initResults()
 
-    # throw away the first two lines of the stats file
-    stats_file.readline()
-    stats_file.readline() # the 'Begin' line
-
     #######################################
     # Parse stats file and gather results
     ########################################
 
+    # Example format:
+    # 'system.mem_ctrls_0.memoryStateTime::ACT    1000000'
+    # Now grab the state, i.e. 'ACT'
+    state_times = { name.split('::')[1] : values for name, values in
+        stats.query('system.mem_ctrls_0.memoryStateTime::*').items() }
+    # Example format:
+    # system.mem_ctrls_0.actEnergy                 35392980
+    state_energies = { StatToKey[name] : stats.values(name)
+                       for name in StatToKey }
+    stats.close()
+
+    # There is a stats dump per experiment
+    dump = 0
     for delay in delayValues:
         for bank_util in bankUtilValues:
             for seq_bytes in seqBytesValues:
-
-                for line in stats_file:
-                    if 'Begin' in line:
-                        break
-
-                    if len(line.strip()) == 0:
-                        continue
-
-                    #### state time values ####
-                    if 'system.mem_ctrls_0.memoryStateTime' in line:
-                        # remove leading and trailing white spaces
-                        line = line.strip()
-                        # Example format:
-                        # 'system.mem_ctrls_0.memoryStateTime::ACT    1000000'
-                        statistic, stime = line.split()[0:2]
-                        # Now grab the state, i.e. 'ACT'
-                        state = statistic.split('::')[1]
+                for state, values in state_times.items():
+                    if not math.isnan(values[dump]):
                         # store the value of the stat in the results dict
                         results[delay][bank_util][seq_bytes][state] = \
-                            int(stime)
-                    #### state energy values ####
-                    elif line.strip().split()[0] in list(StatToKey.keys()):
-                        # Example format:
-                        # system.mem_ctrls_0.actEnergy                 35392980
-                        statistic, e_val = line.strip().split()[0:2]
-                        senergy = int(float(e_val))
-                        state = StatToKey[statistic]
-                        # store the value of the stat in the results dict
-                        results[delay][bank_util][seq_bytes][state] = senergy
+                            int(values[dump])
+                for state, values in state_energies.items():
+                    if not math.isnan(values[dump]):
+                        results[delay][bank_util][seq_bytes][state] = \
+                            int(values[dump])
+                dump += 1
 
     # To add last traffic gen idle period stats to the results dict
-    for line in stats_file:
-        if 'system.mem_ctrls_0.memoryStateTime' in line:
-            line = line.strip() # remove leading and trailing white spaces
-            # Example format:
-            # 'system.mem_ctrls_0.memoryStateTime::ACT    1000000'
-            statistic, stime = line.split()[0:2]
-            # Now grab the state energy, .e.g 'ACT'
-            state = statistic.split('::')[1]
-            idleResults[state] = int(stime)
-            if state == 'ACT_PDN':
-                break
+    for state, values in state_times.items():
+        if not math.isnan(values[dump]):
+            idleResults[state] = int(values[dump])
 
     ########################################
     # Call plot functions
@@ -44,8 +44,14 @@ except ImportError:
     print("Failed to import matplotlib and numpy")
     exit(-1)
 
-import sys
+import math
+import os
 import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', '..', 'src', 'python'))
+from m5.ext.pystats.textloader import TextLoader
 
 # Determine the parameters of the sweep from the simout output, and
 # then parse the stats and plot the 3D surface corresponding to the
@@ -68,7 +74,7 @@ def main():
     mode = sys.argv[1][1]
 
     try:
-        stats = open(sys.argv[2] + '/stats.txt', 'r')
+        stats = TextLoader(sys.argv[2] + '/stats.txt')
     except IOError:
         print("Failed to open ", sys.argv[2] + '/stats.txt', " for reading")
         exit(-1)
@@ -98,23 +104,15 @@ def main():
         print("Failed to establish sweep details, ensure simout is up-to-date")
         exit(-1)
 
-    # Now parse the stats
-    peak_bw = []
-    bus_util = []
-    avg_pwr = []
-
-    for line in stats:
-        match = re.match(".*busUtil\s+(\d+\.\d+)\s+#.*", line)
-        if match:
-            bus_util.append(float(match.groups(0)[0]))
-
-        match = re.match(".*peakBW\s+(\d+\.\d+)\s+#.*", line)
-        if match:
-            peak_bw.append(float(match.groups(0)[0]))
+    # Now parse the stats, in the order they are dumped
+    def dumped(pattern):
+        matches = list(stats.query(pattern).values())
+        return [ values[i] for i in range(len(stats)) for values in matches
+                 if not math.isnan(values[i]) ]
 
-        match = re.match(".*averagePower\s+(\d+\.?\d*)\s+#.*", line)
-        if match:
-            avg_pwr.append(float(match.groups(0)[0]))
+    peak_bw = dumped('*peakBW')
+    bus_util = dumped('*busUtil')
+    avg_pwr = dumped('*averagePower')
     stats.close()
 
 
@@ -68,7 +68,11 @@
 # with protobuf python messages. For eg, the decode scripts for different
 # types of proto objects can use the same function to decode a single message
 
+import bisect
 import gzip
+import io
+import json
+import os
 import struct
 
 def openFileRd(in_file):
@@ -125,6 +129,72 @@ def _DecodeVarint32(in_file):
         if shift >= 64:
             raise IOError('Too many bytes when decoding varint.')
 
+def _DecodeVarint32FromBuffer(buf, pos):
+    """
+    Decode a Varint32 starting at offset pos of a bytes-like buffer. This
+    is the same decoding as _DecodeVarint32, but working on data that has
+    already been read. Returns the value and the offset of the first byte
+    after it. Raises IndexError if the buffer ends before the varint does.
+    """
+    result = 0
+    shift = 0
+    # Use a 32-bit mask
+    mask = 0xffffffff
+    while 1:
+        b = buf[pos]
+        pos += 1
+        result |= ((b & 0x7f) << shift)
+        if not (b & 0x80):
+            if result > 0x7fffffffffffffff:
+                result -= (1 << 64)
+                result |= ~mask
+            else:
+                result &= mask
+            return (result, pos)
+        shift += 7
+        if shift >= 64:
+            raise IOError('Too many bytes when decoding varint.')
+
+def readMessages(in_file, chunk_size=1 << 20):
+    """
+    Generator yielding the serialized form of each length prefixed
+    message in the file, starting at the current position. The file is
+    read in chunks of chunk_size bytes rather than a byte at a time, which
+    makes it much faster than repeated calls to decodeMessage. Like
+    decodeMessage, a message length of zero is treated as the end of the
+    stream.
+    """
+    buf = b''
+    pos = 0
+    while True:
+        try:
+            size, start = _DecodeVarint32FromBuffer(buf, pos)
+        except IndexError:
+            size, start = None, None
+
+        if size is not None and start + size <= len(buf):
+            if size == 0:
+                return
+            yield buf[start:start + size]
+            pos = start + size
+            continue
+
+        # Not enough buffered for the next message, read some more
+        data = in_file.read(chunk_size)
+        if not data:
+            return
+        buf = buf[pos:] + data
+        pos = 0
+
+def parseMessages(in_file, message, chunk_size=1 << 20):
+    """
+    Generator which parses each message in the file into message (which
+    is reused, so copy it if it needs to be kept) and yields it.
+    """
+    for buf in readMessages(in_file, chunk_size):
+        message.ParseFromString(buf)
+        yield message
+
 def decodeMessage(in_file, message):
     """
     Attempt to read a message from the file and decode it. Return
@@ -161,3 +231,190 @@ def encodeMessage(out_file, message):
     out = message.SerializeToString()
     _EncodeVarint32(out_file, len(out))
     out_file.write(out)
+
+# Indexed traces
+#
+# An indexed trace is a gzip file made up of a series of independently
+# compressed gzip members, or blocks. The first block holds the magic
+# number and the header and each following block holds a fixed number of
+# records. Since a gzip file can consist of several members, indexed
+# traces can be read like any other trace, by gem5 or the tools above.
+#
+# The index is kept in a sidecar JSON file (the trace's name with ".idx"
+# appended) listing, for every block of records, its offset in the trace
+# file, the number of its first record, how many records it has and the
+# smallest and largest key (e.g., tick or sequence number) of those
+# records. This is enough to seek to a record number or key window
+# without decompressing the blocks before it. The index also records the
+# size and modification time of the trace, so an index left behind when
+# the trace is rewritten is not used.
+
+def indexPath(trace_path):
+    """Return the path of the sidecar index for a trace file."""
+    return trace_path + '.idx'
+
+def _traceFingerprint(trace_path):
+    st = os.stat(trace_path)
+    return st.st_size, st.st_mtime_ns
+
+def _indexMatches(trace_path, index):
+    return (index.get('trace_size'), index.get('trace_mtime_ns')) == \
+        _traceFingerprint(trace_path)
+
+def hasIndex(trace_path):
+    """
+    Return True if the trace has an index which is up to date, i.e. the
+    trace has not been rewritten since the index was written.
+    """
+    try:
+        with open(indexPath(trace_path), 'r') as f:
+            index = json.load(f)
+        return _indexMatches(trace_path, index)
+    except (IOError, ValueError):
+        return False
+
+def removeIndex(trace_path):
+    """Remove the index of a trace, e.g. as it is rewritten without one."""
+    try:
+        os.remove(indexPath(trace_path))
+    except FileNotFoundError:
+        pass
+
+class IndexedTraceWriter(object):
+    """
+    Writer for indexed traces. Write the magic number and the header with
+    write() (e.g., through encodeMessage()), call endHeader() and then add
+    the records one at a time with addRecord(). The index is written when
+    the writer is closed.
+    """
+
+    def __init__(self, path, key_name, records_per_block=1 << 16,
+                 compresslevel=6):
+        self.path = path
+        self.key_name = key_name
+        self.records_per_block = records_per_block
+        self.compresslevel = compresslevel
+        self.out = open(path, 'wb')
+        self.buf = io.BytesIO()
+        self.blocks = []
+        self.num_records = 0
+        self._startBlock()
+
+    def _startBlock(self):
+        self.block_offset = self.out.tell()
+        self.block_first = self.num_records
+        self.block_records = 0
+        self.block_min = None
+        self.block_max = None
+
+    def _flushBlock(self):
+        self.out.write(gzip.compress(self.buf.getvalue(), self.compresslevel))
+        self.buf = io.BytesIO()
+        if self.block_records:
+            self.blocks.append([self.block_offset, self.block_first,
+                                self.block_records, self.block_min,
+                                self.block_max])
+        self._startBlock()
+
+    def write(self, data):
+        self.buf.write(data)
+
+    def endHeader(self):
+        """Put everything written so far in a block of its own."""
+        assert not self.num_records, "Header must come before the records"
+        self._flushBlock()
+
+    def addRecord(self, message, key):
+        encodeMessage(self.buf, message)
+        self.num_records += 1
+        self.block_records += 1
+        if self.block_min is None or key < self.block_min:
+            self.block_min = key
+        if self.block_max is None or key > self.block_max:
+            self.block_max = key
+        if self.block_records == self.records_per_block:
+            self._flushBlock()
+
+    def close(self):
+        if self.block_records:
+            self._flushBlock()
+        self.out.close()
+        trace_size, trace_mtime_ns = _traceFingerprint(self.path)
+        with open(indexPath(self.path), 'w') as f:
+            json.dump({
+                'version' : 1,
+                'trace_size' : trace_size,
+                'trace_mtime_ns' : trace_mtime_ns,
+                'key' : self.key_name,
+                'num_records' : self.num_records,
+                # offset, first record, records, min key, max key
+                'blocks' : self.blocks,
+            }, f)
+
+class IndexedTrace(object):
+    """
+    Random access to the records of an indexed trace. The message passed
+    to the generators is reused for every record, copy it if it needs to
+    be kept.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(indexPath(path), 'r') as f:
+            index = json.load(f)
+        if index.get('version') != 1:
+            raise IOError("Unsupported trace index version in %s" %
+                          indexPath(path))
+        if not _indexMatches(path, index):
+            raise IOError("The trace index %s is out of date" %
+                          indexPath(path))
+        self.key_name = index['key']
+        self.num_records = index['num_records']
+        self.blocks = index['blocks']
+        self._firsts = [ block[1] for block in self.blocks ]
+
+    def _blockMessages(self, block, message):
+        offset, first, count, _, _ = block
+        with open(self.path, 'rb') as raw:
+            raw.seek(offset)
+            with gzip.GzipFile(fileobj=raw, mode='rb') as block_in:
+                for i, msg in enumerate(parseMessages(block_in, message)):
+                    if i == count:
+                        break
+                    yield msg
+
+    def records(self, message, start=0, end=None):
+        """
+        Generator yielding records start (inclusive) to end (exclusive),
+        numbered from 0.
+        """
+        if end is None or end > self.num_records:
+            end = self.num_records
+        if start >= end:
+            return
+        i = bisect.bisect_right(self._firsts, start) - 1
+        for block in self.blocks[i:]:
+            first = block[1]
+            if first >= end:
+                return
+            for n, msg in enumerate(self._blockMessages(block, message),
+                                    first):
+                if n >= end:
+                    return
+                if n >= start:
+                    yield msg
+
+    def window(self, message, low, high):
+        """
+        Generator yielding the records whose key is at least low and less
+        than high, in trace order. Only blocks whose key range overlaps
+        the window are decompressed.
+        """
+        for block in self.blocks:
+            if block[4] < low or block[3] >= high:
+                continue
+            for msg in self._blockMessages(block, message):
+                key = getattr(msg, self.key_name)
+                if low <= key < high:
+                    yield msg
+
@@ -61,6 +61,7 @@
 import re, sys, os
 from configparser import ConfigParser
 import gzip
+import math
 import xml.etree.ElementTree as ET
 import xml.dom.minidom as minidom
 import shutil
@@ -68,6 +69,10 @@ import zlib
 
 import argparse
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', '..', 'src', 'python'))
+from m5.ext.pystats.textloader import TextLoader
+
 parser = argparse.ArgumentParser(
         formatter_class=argparse.RawDescriptionHelpFormatter,
         description="""
@@ -726,9 +731,6 @@ class StatsEntry(object):
         self.short_name = re.sub("system\.", "", name)
         self.short_name = re.sub(":", "_", name)
 
-        # Regex for this stat (string version used to construct union regex)
-        self.regex_string = "^" + name + "\s+([\d\.]+)"
-        self.regex = re.compile("^" + name + "\s+([\d\.e\-]+)\s+# (.*)$", re.M)
         self.description = ""
 
         # Whether this stat is use per CPU or not
@@ -740,9 +742,6 @@ class StatsEntry(object):
         # List of values of stat per timestamp
         self.values = []
 
-        # Whether this stat has been found for the current timestamp
-        self.found = False
-
         # Whether this stat has been found at least once
         # (to suppress too many warnings)
         self.not_found_at_least_once = False
@@ -750,12 +749,9 @@ class StatsEntry(object):
         # Field used to hold ElementTree subelement for this stat
         self.ET_element = None
 
-        # Create per-CPU stat name and regex, etc.
+        # Create per-CPU stat name, etc.
         if self.per_cpu:
-            self.per_cpu_regex_string = []
-            self.per_cpu_regex = []
             self.per_cpu_name = []
-            self.per_cpu_found = []
             for i in range(num_cpus):
                 if num_cpus > 1:
                     per_cpu_name = re.sub("#", str(i), self.name)
@@ -765,12 +761,7 @@ class StatsEntry(object):
                 self.per_cpu_name.append(per_cpu_name)
                 print("\t", per_cpu_name)
 
-                self.per_cpu_regex_string.\
-                    append("^" + per_cpu_name + "\s+[\d\.]+")
-                self.per_cpu_regex.append(re.compile("^" + per_cpu_name + \
-                    "\s+([\d\.e\-]+)\s+# (.*)$", re.M))
                 self.values.append([])
-                self.per_cpu_found.append(False)
 
     def append_value(self, val, per_cpu_index = None):
         if self.per_cpu:
@@ -792,19 +783,6 @@ class Stats(object):
             self.next_key))
         self.next_key += 1
 
-    # Union of all stats to accelerate parsing speed
-    def createStatsRegex(self):
-        regex_strings = [];
-        print("\nnum entries in stats_list", len(self.stats_list))
-        for entry in self.stats_list:
-            if entry.per_cpu:
-                for i in range(num_cpus):
-                    regex_strings.append(entry.per_cpu_regex_string[i])
-            else:
-                regex_strings.append(entry.regex_string)
-
-        self.regex = re.compile('|'.join(regex_strings))
-
 
 def registerStats(config_file):
     print("===============================")
@@ -853,8 +831,6 @@ def registerStats(config_file):
                 stats.register(item, group, i, False)
                 i += 1
 
-    stats.createStatsRegex()
-
     return stats
 
 # Parse and read in gem5 stats file
@@ -864,125 +840,67 @@ def readGem5Stats(stats, gem5_stats_file):
     print("Parsing gem5 stats file...")
     print(gem5_stats_file)
     print("===============================\n")
-    ext = os.path.splitext(gem5_stats_file)[1]
-
-    window_start_regex = \
-        re.compile("^---------- Begin Simulation Statistics ----------")
-    window_end_regex = \
-        re.compile("^---------- End Simulation Statistics   ----------")
-    final_tick_regex = re.compile("^final_tick\s+(\d+)")
 
     global ticks_in_ns
-    sim_freq_regex = re.compile("^sim_freq\s+(\d+)")
-    sim_freq = -1
 
     try:
-        if ext == ".gz":
-            f = gzip.open(gem5_stats_file, "r")
-        else:
-            f = open(gem5_stats_file, "r")
-    except:
+        gem5_stats = TextLoader(gem5_stats_file)
+    except IOError:
         print("ERROR opening stats file", gem5_stats_file, "!")
         sys.exit(1)
 
-    stats_not_found_list = stats.stats_list[:]
-    window_num = 0
-
-    while (True):
-        error = False
-        try:
-            line = f.readline()
-        except IOError:
-            print("")
-            print("WARNING: IO error in stats file")
-            print("(gzip stream not closed properly?)...continuing for now")
-            error = True
-        if not line:
+    # The values of the first of the stats which is in the stats file
+    def findStat(*names):
+        for name in names:
+            values = gem5_stats.values(name)
+            if not all(math.isnan(v) for v in values):
+                return values
+        return []
+
+    # Find out how many gem5 ticks in 1ns
+    for value in findStat("simFreq", "sim_freq"):
+        if not math.isnan(value):
+            sim_freq = int(value) # ticks in 1 sec
+            ticks_in_ns = int(sim_freq / 1e9)
+            print("Simulation frequency found! 1 tick == %e sec\n" \
+                    % (1.0 / sim_freq))
             break
 
-        # Find out how many gem5 ticks in 1ns
-        if sim_freq < 0:
-            m = sim_freq_regex.match(line)
-            if m:
-                sim_freq = int(m.group(1)) # ticks in 1 sec
-                ticks_in_ns = int(sim_freq / 1e9)
-                print("Simulation frequency found! 1 tick == %e sec\n" \
-                        % (1.0 / sim_freq))
-
-        # Final tick in gem5 stats: current absolute timestamp
-        m = final_tick_regex.match(line)
-        if m:
-            tick = int(m.group(1))
-            if tick > end_tick:
-                break
-            stats.tick_list.append(tick)
-
-
-        if (window_end_regex.match(line) or error):
+    # Final tick in gem5 stats: current absolute timestamp
+    for tick in findStat("finalTick", "final_tick"):
+        if tick > end_tick:
+            break
+        stats.tick_list.append(int(tick))
+    num_windows = len(stats.tick_list)
+
+    def addValues(stat, name, per_cpu_index = None):
+        values = gem5_stats.values(name)
+        for window_num in range(num_windows):
+            if math.isnan(values[window_num]):
+                if not stat.not_found_at_least_once:
+                    print("WARNING: stat not found in window #", \
+                        window_num, ":", name)
+                    print("suppressing further warnings for this stat")
+                    stat.not_found_at_least_once = True
+                value = str(0)
+            elif per_cpu_index is not None and stat.name == "ipc":
+                value = str(int(values[window_num] * 1000))
+            else:
+                value = str(int(values[window_num]))
             if args.verbose:
-                print("new window")
-            for stat in stats.stats_list:
-                if stat.per_cpu:
-                    for i in range(num_cpus):
-                        if not stat.per_cpu_found[i]:
-                            if not stat.not_found_at_least_once:
-                                print("WARNING: stat not found in window #", \
-                                    window_num, ":", stat.per_cpu_name[i])
-                                print("suppressing further warnings for " + \
-                                    "this stat")
-                                stat.not_found_at_least_once = True
-                            stat.values[i].append(str(0))
-                        stat.per_cpu_found[i] = False
-                else:
-                    if not stat.found:
-                        if not stat.not_found_at_least_once:
-                            print("WARNING: stat not found in window #", \
-                                window_num, ":", stat.name)
-                            print("suppressing further warnings for this stat")
-                            stat.not_found_at_least_once = True
-                        stat.values.append(str(0))
-                    stat.found = False
-            stats_not_found_list = stats.stats_list[:]
-            window_num += 1
-            if error:
-                break
+                print(name, value)
+            stat.append_value(value, per_cpu_index)
+        if stat.description == "":
+            stat.description = gem5_stats.description(name) or ""
 
-        # Do a single regex of the union of all stats first for speed
-        if stats.regex.match(line):
-            # Then loop through only the stats we haven't seen in this window
-            for stat in stats_not_found_list[:]:
-                if stat.per_cpu:
-                    for i in range(num_cpus):
-                        m = stat.per_cpu_regex[i].match(line)
-                        if m:
-                            if stat.name == "ipc":
-                                value = str(int(float(m.group(1)) * 1000))
-                            else:
-                                value = str(int(float(m.group(1))))
-                            if args.verbose:
-                                print(stat.per_cpu_name[i], value)
-                            stat.values[i].append(value)
-                            stat.per_cpu_found[i] = True
-                            all_found = True
-                            for j in range(num_cpus):
-                                if not stat.per_cpu_found[j]:
-                                    all_found = False
-                            if all_found:
-                                stats_not_found_list.remove(stat)
-                            if stat.description == "":
-                                stat.description = m.group(2)
-                else:
-                    m = stat.regex.match(line)
-                    if m:
-                        value = str(int(float(m.group(1))))
-                        if args.verbose:
-                            print(stat.name, value)
-                        stat.values.append(value)
-                        stat.found = True
-                        stats_not_found_list.remove(stat)
-                        if stat.description == "":
-                            stat.description = m.group(2)
-    f.close()
+    for stat in stats.stats_list:
+        if stat.per_cpu:
+            for i in range(num_cpus):
+                addValues(stat, stat.per_cpu_name[i], i)
+        else:
+            addValues(stat, stat.name)
+
+    gem5_stats.close()
 
 
 # Create session.xml file in .apc folder